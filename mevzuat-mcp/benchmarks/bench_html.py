@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# bench_html.py
+"""
+Parity check and throughput benchmark for the lxml HTML fast path (mevzuat_html) against the
+MarkItDown path it replaces, over the HTML payloads of a fixture set (default: synthetic).
+--fixtures takes a directory recorded with fake_bedesten.py or a directory of .html files.
+
+Parity: every payload the fast path accepts must produce exactly the Markdown of
+markdown_from_html(), from the bytes and from a file (markdown_from_bedesten_html_file); payloads
+it declines are counted as fallbacks. With --save-golden the previous pipeline's output is written
+to a JSON file once (e.g. next to recorded fixtures), and --golden compares against that file
+instead of re-running MarkItDown; markdown_from_payload() must then match it for every payload,
+fallbacks and undecodable ones included.
+
+benchmarks/fixtures/word_export holds Word-exported HTML in the shape bedesten serves (CRLF,
+conditional comments, <o:p>, mso- spans, a table, a supportLists list, a windows-1254 file) with
+its golden output. Replace or extend it with recorded payloads when the live API is reachable.
+
+Throughput: base64 payload → Markdown per payload, the previous pipeline (decode to str,
+MarkItDown) vs. markdown_from_payload() with the fast path.
+
+    python benchmarks/bench_html.py
+    python benchmarks/bench_html.py --fixtures benchmarks/fixtures --save-golden benchmarks/fixtures/golden.json
+    python benchmarks/bench_html.py --fixtures benchmarks/fixtures --golden benchmarks/fixtures/golden.json --check
+    python benchmarks/bench_html.py --fixtures benchmarks/fixtures/word_export \
+        --golden benchmarks/fixtures/word_export/golden.json --check --skip-throughput
+"""
+
+import argparse
+import base64
+import difflib
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, ".."))
+sys.path.insert(0, BENCH_DIR)
+
+from fake_bedesten import Fixtures, synthetic
+from mevzuat_convert import PDF_BASE64_PREFIX, html_from_base64, markdown_from_html, markdown_from_payload, prewarm_converters
+from mevzuat_html import markdown_from_bedesten_html, markdown_from_bedesten_html_file
+
+def load_fixtures(directory: str) -> Fixtures:
+    """A recorded fixture directory, or a directory of .html files served as articles named after the file."""
+    if os.path.exists(os.path.join(directory, "fixtures.json")):
+        return Fixtures.load(directory)
+    fixtures = Fixtures()
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".html"):
+            with open(os.path.join(directory, name), "rb") as f:
+                fixtures.contents[(name[:-len(".html")], "MADDE")] = base64.b64encode(f.read()).decode("ascii")
+    return fixtures
+
+def _payloads(fixtures: Fixtures, limit: int) -> List[Tuple[str, str]]:
+    """(key, base64 payload) for the HTML contents, articles first."""
+    items = [
+        (f"{document_type}:{doc_id}", content) for (doc_id, document_type), content in fixtures.contents.items()
+        if content and not content.startswith(PDF_BASE64_PREFIX)
+    ]
+    items.sort(key=lambda item: not item[0].startswith("MADDE:"))
+    return items[:limit] if limit else items
+
+def _first_difference(expected: str, actual: str) -> str:
+    diff = difflib.unified_diff(expected.splitlines(), actual.splitlines(), "markitdown", "fast", lineterm="", n=1)
+    return "\n".join(list(diff)[:12])
+
+def _from_file(data: bytes):
+    with tempfile.NamedTemporaryFile(suffix=".html") as f:
+        f.write(data)
+        f.flush()
+        return markdown_from_bedesten_html_file(f.name)
+
+def check_parity(payloads: List[Tuple[str, str]], golden: Dict[str, str]) -> Dict[str, object]:
+    accepted, fallbacks, mismatches = 0, [], []
+    for key, content in payloads:
+        data = base64.b64decode(content)
+        expected = golden[key] if key in golden else markdown_from_html(html_from_base64(content))
+        if key in golden:
+            pipeline = markdown_from_payload(content, key)
+            if pipeline != expected:
+                mismatches.append({"key": f"{key} (pipeline)", "diff": _first_difference(expected, pipeline)})
+        fast = markdown_from_bedesten_html(data)
+        if fast is None:
+            fallbacks.append(key)
+            continue
+        accepted += 1
+        for path, actual in (("", fast), (" (file)", _from_file(data))):
+            if actual is None:
+                mismatches.append({"key": f"{key}{path}", "diff": "declined by the file path only"})
+            elif actual != expected:
+                mismatches.append({"key": f"{key}{path}", "diff": _first_difference(expected, actual)})
+    return {"payloads": len(payloads), "accepted": accepted, "fallbacks": len(fallbacks),
+            "fallback_keys": fallbacks[:20], "mismatches": mismatches}
+
+def _timed(fn, payloads: List[Tuple[str, str]], repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        for key, content in payloads:
+            started = time.perf_counter()
+            fn(key, content)
+            samples.append(time.perf_counter() - started)
+    return samples
+
+def throughput(payloads: List[Tuple[str, str]], repeat: int) -> Dict[str, Dict[str, float]]:
+    prewarm_converters()
+    total_bytes = repeat * sum(len(content) * 3 // 4 for _, content in payloads)
+    pipelines = {
+        "markitdown (previous)": lambda key, content: markdown_from_html(html_from_base64(content)),
+        "fast path": lambda key, content: markdown_from_payload(content, key),
+    }
+    results = {}
+    for name, fn in pipelines.items():
+        samples = _timed(fn, payloads, repeat)
+        results[name] = {
+            "mb_per_s": round(total_bytes / sum(samples) / 1e6, 2),
+            "mean_ms": round(1000 * statistics.fmean(samples), 3),
+            "p50_ms": round(1000 * statistics.median(samples), 3),
+        }
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", help="Fixture directory recorded with fake_bedesten.py, or of .html files (default: synthetic)")
+    parser.add_argument("--documents", type=int, default=20, help="Synthetic documents")
+    parser.add_argument("--limit", type=int, default=0, help="At most this many payloads (0 = all)")
+    parser.add_argument("--repeat", type=int, default=3, help="Throughput passes")
+    parser.add_argument("--golden", help="Compare against MarkItDown output saved with --save-golden")
+    parser.add_argument("--save-golden", help="Write the previous pipeline's output for every payload to this JSON file")
+    parser.add_argument("--check", action="store_true", help="Exit with status 1 on any parity mismatch")
+    parser.add_argument("--skip-throughput", action="store_true")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.fixtures) if args.fixtures else synthetic(documents=args.documents)
+    payloads = _payloads(fixtures, args.limit)
+    if args.save_golden:
+        golden = {key: markdown_from_html(html_from_base64(content)) for key, content in payloads}
+        with open(args.save_golden, "w", encoding="utf-8") as f:
+            json.dump(golden, f, ensure_ascii=False, indent=1)
+        print(f"Saved MarkItDown output of {len(golden)} payloads to {args.save_golden}")
+    golden: Dict[str, str] = {}
+    if args.golden:
+        with open(args.golden, encoding="utf-8") as f:
+            golden = json.load(f)
+
+    report = {"parity": check_parity(payloads, golden)}
+    if not args.skip_throughput:
+        report["throughput"] = throughput(payloads, args.repeat)
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        parity = report["parity"]
+        print(f"parity: {parity['accepted']}/{parity['payloads']} payloads on the fast path, "
+              f"{parity['fallbacks']} fallbacks, {len(parity['mismatches'])} mismatches")
+        for mismatch in parity["mismatches"][:5]:
+            print(f"  {mismatch['key']}:\n{mismatch['diff']}")
+        for name, values in report.get("throughput", {}).items():
+            print(f"{name:>22}: {values['mb_per_s']:7.2f} MB/s, mean {values['mean_ms']:8.3f} ms, p50 {values['p50_ms']:8.3f} ms")
+    if args.check and report["parity"]["mismatches"]:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# bench_logging.py
+"""
+Per-call logging overhead on the event loop: the previous synchronous FileHandler + StreamHandler
+setup vs. mevzuat_logging's queue mode, with and without DEBUG sampling.
+
+Each simulated tool call logs one INFO line and --debug DEBUG lines (as the MCP, httpcore and tool
+loggers do at DEBUG level) from inside a coroutine; the time spent in those calls is what the event
+loop loses per tool call.
+
+    python benchmarks/bench_logging.py --calls 5000 --debug 8
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from mevzuat_logging import configure_logging, stop_logging
+
+SETUPS = {
+    # name: configure_logging keyword arguments
+    "sync (previous)": dict(mode="sync", max_bytes=0, debug_rate=0, debug_sample=1.0),
+    "queue": dict(mode="queue", debug_rate=0, debug_sample=1.0),
+    "queue + rate limit": dict(mode="queue", debug_rate=20, debug_sample=1.0),
+    "queue + rate limit + 10% sample": dict(mode="queue", debug_rate=20, debug_sample=0.1),
+}
+
+class SlowStream:
+    """A stderr stand-in whose writes block for `latency` seconds, like a pipe the MCP client drains slowly."""
+
+    def __init__(self, target, latency: float):
+        self.target = target
+        self.latency = latency
+
+    def write(self, text: str) -> int:
+        time.sleep(self.latency)
+        return self.target.write(text)
+
+    def flush(self) -> None:
+        self.target.flush()
+
+async def simulate(calls: int, debug: int) -> float:
+    logger = logging.getLogger("bench.tool")
+    started = time.perf_counter()
+    for i in range(calls):
+        logger.info(f"Tool 'search_mevzuat' called with parameters: {{'phrase': 'vergi {i}', 'page_size': 5}}")
+        for j in range(debug):
+            logger.debug(f"send_request_headers.complete return_value=None call={i} step={j}")
+        if i % 100 == 0:
+            await asyncio.sleep(0)
+    return time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=5000)
+    parser.add_argument("--debug", type=int, default=8, help="DEBUG records per call")
+    parser.add_argument("--stderr", action="store_true", help="Write the stream handler to the real stderr instead of /dev/null")
+    parser.add_argument("--stream-latency-us", type=float, default=0.0, help="Simulated blocking time per stderr write")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, "w") as devnull:
+        results = {}
+        for name, options in SETUPS.items():
+            log_file = os.path.join(tmp, f"{len(results)}.log")
+            stream = sys.stderr if args.stderr else devnull
+            if args.stream_latency_us:
+                stream = SlowStream(stream, args.stream_latency_us / 1e6)
+            configure_logging(log_file, level="DEBUG", stream=stream, **options)
+            elapsed = asyncio.run(simulate(args.calls, args.debug))
+            drain_started = time.perf_counter()
+            stop_logging()
+            drain = time.perf_counter() - drain_started
+            results[name] = elapsed
+            print(f"{name:>34}: {1e6 * elapsed / args.calls:8.1f} µs/call on the loop"
+                  f" (background drain {1000 * drain:.0f} ms, log {os.path.getsize(log_file) / 1024:.0f} KB)")
+        configure_logging(None, level="WARNING", mode="sync", stream=devnull)
+
+    baseline = results["sync (previous)"]
+    for name, elapsed in results.items():
+        print(f"{name:>34}: {baseline / elapsed:.1f}x")
+
+if __name__ == "__main__":
+    main()
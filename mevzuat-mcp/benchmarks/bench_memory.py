@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# bench_memory.py
+"""
+Memory benchmark for full-document downloads: --documents concurrent get_full_document_content calls
+for distinct --size-mb Word-style HTML laws, served over HTTP by benchmarks/fake_bedesten.py in a
+separate process.
+
+Each configuration runs in a fresh interpreter, so peak RSS (VmHWM) belongs to that run alone:
+the buffered path (stream_documents=False: response.json(), the base64 string, the decoded bytes)
+and the streaming path (mevzuat_stream) at each --chunk-kb. Two phases are measured with tracemalloc:
+
+    download  fetch + decode of the payloads, released right away
+    e2e       get_full_document_content(), conversion included (the Markdown is discarded)
+
+Conversion runs in worker processes; their peak RSS is reported separately. RSS figures need Linux's /proc.
+
+    python benchmarks/bench_memory.py
+    python benchmarks/bench_memory.py --documents 8 --size-mb 30 --chunk-kb 16,64,256 --json
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PACKAGE_DIR = os.path.join(BENCH_DIR, "..")
+sys.path.insert(0, PACKAGE_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from fake_bedesten import Fixtures, _SENTENCES, word_html
+
+MB = 1024 * 1024
+
+def large_fixtures(documents: int, size_mb: float) -> Fixtures:
+    """`documents` full-document HTML payloads of about `size_mb` MB each (decoded)."""
+    fixtures = Fixtures()
+    paragraphs, size = [], 0
+    while size < size_mb * MB:
+        text = f"MADDE {len(paragraphs) + 1} - {_SENTENCES[len(paragraphs) % len(_SENTENCES)]}"
+        paragraphs.append(text)
+        size += len(text) + 160    # markup around each paragraph in word_html
+    for d in range(documents):
+        mevzuat_id = str(900000 + d)
+        fixtures.documents.append({
+            "mevzuatId": mevzuat_id, "mevzuatNo": 9000 + d, "mevzuatAdi": f"Büyük Kanun {d}",
+            "mevzuatTur": {"id": 1, "name": "KANUN", "description": "Kanun"},
+            "resmiGazeteTarihi": "2004-10-12T00:00:00", "resmiGazeteSayisi": str(29000 + d),
+            "kayitTarihi": "2004-10-12T00:00:00", "url": None,
+        })
+        html = word_html(f"Büyük Kanun {d}", paragraphs).encode("utf-8")
+        fixtures.contents[(mevzuat_id, "MEVZUAT")] = base64.b64encode(html).decode("ascii")
+    return fixtures
+
+def _serve(fixtures_dir: str) -> subprocess.Popen:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(BENCH_DIR, "fake_bedesten.py"), "serve", "--dir", fixtures_dir, "--port", str(port)],
+        stdout=subprocess.DEVNULL,
+    )
+    process.base_url = f"http://127.0.0.1:{port}/mevzuat"
+    while True:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.1):
+                return process
+        except OSError:
+            if process.poll() is not None:
+                raise RuntimeError("fake_bedesten.py exited")
+            time.sleep(0.1)
+
+def _peak_rss_mb(pid: Any = "self") -> Optional[float]:
+    # VmHWM rather than ru_maxrss, which a child inherits from the (fixture-holding) parent across fork/exec.
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            return next(round(int(line.split()[1]) / 1024, 1) for line in f if line.startswith("VmHWM:"))
+    except (OSError, StopIteration):
+        return None
+
+def _worker_peak_rss_mb(pool: Any) -> Optional[float]:
+    peaks = [_peak_rss_mb(pid) for pid in getattr(pool._executor, "_processes", None) or {}]
+    return max((peak for peak in peaks if peak is not None), default=None)
+
+async def _measure(base_url: str, ids: List[str], stream: bool, chunk_kb: int, spool_kb: int) -> Dict[str, Any]:
+    from mevzuat_client import MevzuatApiClient
+    from mevzuat_convert import ConversionPool
+    client = MevzuatApiClient(
+        base_url=base_url, timeout=120.0, hedged_endpoints=(), conversion_pool=ConversionPool(kind="process"),
+        stream_documents=stream, stream_chunk_size=chunk_kb * 1024, stream_spool_bytes=spool_kb * 1024,
+    )
+    client.start_conversion_workers()
+    await client._conversion_pool.prewarm()
+    result: Dict[str, Any] = {"rss_start_mb": _peak_rss_mb()}
+    try:
+        async def download(mevzuat_id: str) -> int:
+            content, error_message = await client._fetch_content(mevzuat_id, "MEVZUAT")
+            if error_message:
+                raise RuntimeError(error_message)
+            try:
+                return content.size if stream else len(content)
+            finally:
+                if stream:
+                    content.close()
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        await asyncio.gather(*(download(mevzuat_id) for mevzuat_id in ids))
+        result["download_s"] = round(time.perf_counter() - started, 2)
+        result["download_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / MB, 1)
+        tracemalloc.reset_peak()
+
+        async def convert(mevzuat_id: str) -> int:
+            content = await client.get_full_document_content(mevzuat_id)
+            if content.error_message:
+                raise RuntimeError(content.error_message)
+            return len(content.markdown_content)
+
+        started = time.perf_counter()
+        output = await asyncio.gather(*(convert(mevzuat_id) for mevzuat_id in ids))
+        result["e2e_s"] = round(time.perf_counter() - started, 2)
+        result["e2e_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / MB, 1)
+        result["markdown_mb"] = round(sum(output) / MB, 1)
+        tracemalloc.stop()
+        result["worker_rss_peak_mb"] = _worker_peak_rss_mb(client._conversion_pool)
+    finally:
+        await client.close()
+    result["rss_peak_mb"] = _peak_rss_mb()
+    return result
+
+def _run_config(base_url: str, ids: List[str], stream: bool, chunk_kb: int, spool_kb: int) -> Dict[str, Any]:
+    env = {**os.environ, "MEVZUAT_CONTENT_STORE_PATH": "", "MEVZUAT_LOG_LEVEL": "WARNING"}
+    command = [sys.executable, __file__, "--measure", base_url, "--ids", ",".join(ids),
+               "--chunk-kb", str(chunk_kb), "--spool-kb", str(spool_kb)] + ([] if stream else ["--buffered"])
+    output = subprocess.run(command, env=env, cwd=PACKAGE_DIR, capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=4, help="Concurrent full-document requests (distinct documents)")
+    parser.add_argument("--size-mb", type=float, default=20.0, help="Decoded size of each document")
+    parser.add_argument("--chunk-kb", default="16,64,256", help="Comma-separated stream chunk sizes to compare")
+    parser.add_argument("--spool-kb", type=int, default=1024, help="Payloads beyond this are spooled to a temporary file")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument("--measure", metavar="BASE_URL", help=argparse.SUPPRESS)
+    parser.add_argument("--ids", help=argparse.SUPPRESS)
+    parser.add_argument("--buffered", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        result = asyncio.run(_measure(args.measure, args.ids.split(","), not args.buffered, int(args.chunk_kb), args.spool_kb))
+        print(json.dumps(result))
+        return
+
+    fixtures = large_fixtures(args.documents, args.size_mb)
+    ids = [doc["mevzuatId"] for doc in fixtures.documents]
+    report: Dict[str, Any] = {"documents": args.documents, "size_mb": args.size_mb, "spool_kb": args.spool_kb, "runs": {}}
+    with tempfile.TemporaryDirectory() as fixtures_dir:
+        fixtures.save(fixtures_dir)
+        del fixtures
+        server = _serve(fixtures_dir)
+        try:
+            report["runs"]["buffered"] = _run_config(server.base_url, ids, False, 64, args.spool_kb)
+            for chunk_kb in (int(size) for size in args.chunk_kb.split(",")):
+                report["runs"][f"streamed {chunk_kb} KB"] = _run_config(server.base_url, ids, True, chunk_kb, args.spool_kb)
+        finally:
+            server.terminate()
+            server.wait()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"{args.documents} concurrent documents of {args.size_mb:g} MB, spool threshold {args.spool_kb} KB (MB; peaks from tracemalloc / RSS)")
+    print(f"{'':>18} {'download':>9} {'e2e':>7} {'markdown':>9} {'rss start':>10} {'rss':>7} {'workers':>8} {'download s':>11} {'e2e s':>7}")
+    for name, run in report["runs"].items():
+        print(f"{name:>18} {run['download_peak_mb']:9.1f} {run['e2e_peak_mb']:7.1f} {run['markdown_mb']:9.1f} "
+              f"{run['rss_start_mb'] or 0:10.1f} {run['rss_peak_mb'] or 0:7.1f} {run['worker_rss_peak_mb'] or 0:8.1f} "
+              f"{run['download_s']:11.2f} {run['e2e_s']:7.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# bench_startup.py
+"""
+Cold-start benchmark: module import times in fresh interpreters, and time-to-first-tool-response of
+the stdio MCP server launched the way desktop clients launch it, against benchmarks/fake_bedesten.py.
+
+For every run it reports the time from spawn to a completed MCP handshake and to the first
+search_mevzuat response, and how long the first get_mevzuat_article_content call (the first one
+that needs the content converters) takes after --idle seconds.
+
+    python benchmarks/bench_startup.py --runs 5
+    python benchmarks/bench_startup.py --runs 5 --prewarm --idle 3 --json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PACKAGE_DIR = os.path.join(BENCH_DIR, "..")
+sys.path.insert(0, PACKAGE_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from fake_bedesten import FakeBedesten, synthetic
+
+IMPORT_TARGETS = (
+    "mevzuat_client",
+    "mevzuat_mcp_server",
+    "mcp_server_web",
+    "markitdown",           # deferred until the first content request
+    "markitdown:MarkItDown()",
+)
+
+def _import_time(target: str) -> float:
+    module, _, expression = target.partition(":")
+    code = (
+        "import time; started = time.perf_counter(); import " + module
+        + (f"; from {module} import *; {expression}" if expression else "")
+        + "; print(time.perf_counter() - started)"
+    )
+    env = {**os.environ, "MEVZUAT_CONTENT_STORE_PATH": "", "MEVZUAT_LOG_FILE": "", "MEVZUAT_LOG_LEVEL": "WARNING"}
+    output = subprocess.run([sys.executable, "-c", code], cwd=PACKAGE_DIR, env=env, capture_output=True, text=True, check=True)
+    return float(output.stdout.strip().splitlines()[-1])
+
+def _serve_fake() -> str:
+    """Starts the fake bedesten API on a free local port in a daemon thread and returns its base URL."""
+    import uvicorn
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(FakeBedesten(synthetic(documents=5)).app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return f"http://127.0.0.1:{port}/mevzuat"
+
+async def _first_responses(base_url: str, prewarm: bool, idle: float) -> Dict[str, float]:
+    from fastmcp import Client
+    from fastmcp.client.transports import PythonStdioTransport
+
+    env = {
+        **os.environ, "MEVZUAT_BASE_URL": base_url, "MEVZUAT_CONTENT_STORE_PATH": "", "MEVZUAT_LOG_FILE": "",
+        "MEVZUAT_LOG_LEVEL": "WARNING", "MEVZUAT_PREWARM_CONVERTERS": "1" if prewarm else "0", "MEVZUAT_PREWARM_DELAY": "0",
+    }
+    transport = PythonStdioTransport(os.path.join(PACKAGE_DIR, "mevzuat_mcp_server.py"), env=env, cwd=PACKAGE_DIR, keep_alive=False)
+    started = time.perf_counter()
+    timings: Dict[str, float] = {}
+    async with Client(transport) as client:
+        timings["handshake_ms"] = 1000 * (time.perf_counter() - started)
+        await client.call_tool("search_mevzuat", {"phrase": "Kanunu"})
+        timings["first_search_ms"] = 1000 * (time.perf_counter() - started)
+        await asyncio.sleep(idle)
+        call_started = time.perf_counter()
+        await client.call_tool("get_mevzuat_article_content", {"mevzuat_id": "100000", "madde_id": "100000-m1"})
+        timings["first_content_call_ms"] = 1000 * (time.perf_counter() - call_started)
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--prewarm", action="store_true", help="Start the server with MEVZUAT_PREWARM_CONVERTERS=1")
+    parser.add_argument("--idle", type=float, default=0.0, help="Seconds between the first search and the first content call")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    report: Dict[str, Any] = {"runs": args.runs, "prewarm": args.prewarm, "idle": args.idle, "import_ms": {}, "stdio_server": {}}
+    for target in IMPORT_TARGETS:
+        samples = [_import_time(target) for _ in range(args.runs)]
+        report["import_ms"][target] = round(1000 * statistics.median(samples), 1)
+
+    base_url = _serve_fake()
+    runs: List[Dict[str, float]] = [asyncio.run(_first_responses(base_url, args.prewarm, args.idle)) for _ in range(args.runs)]
+    for key in runs[0]:
+        report["stdio_server"][key] = round(statistics.median(run[key] for run in runs), 1)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print("Import time (median of fresh interpreters):")
+    for target, ms in report["import_ms"].items():
+        print(f"  {target:>26}: {ms:8.1f} ms")
+    print(f"stdio MCP server (median of {args.runs}, prewarm={args.prewarm}, idle={args.idle}s):")
+    for key, ms in report["stdio_server"].items():
+        print(f"  {key:>26}: {ms:8.1f} ms")
+
+if __name__ == "__main__":
+    main()
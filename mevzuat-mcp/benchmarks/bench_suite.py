@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+# bench_suite.py
+"""
+Offline benchmark suite for MevzuatApiClient and the MCP tools, run against benchmarks/fake_bedesten.py.
+
+Measures search throughput (cache miss and hit), article tree validation cost (full pydantic models
+vs. the compact ArticleTree), HTML/PDF conversion time per KB, PDF page-range extraction against
+whole-document extraction, and end-to-end MCP tool latency
+through an in-memory fastmcp client. Results are printed, and with --json/--output written as JSON
+tagged with the git commit so runs can be compared across commits.
+
+    python benchmarks/bench_suite.py --output bench-$(git rev-parse --short HEAD).json
+    python benchmarks/bench_suite.py --fixtures benchmarks/fixtures --latency 0.03 --only search,e2e
+"""
+
+import argparse
+import asyncio
+import base64
+import datetime
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, ".."))
+sys.path.insert(0, BENCH_DIR)
+
+# Measure upstream and conversion work, not the persistent store or background features.
+os.environ.setdefault("MEVZUAT_CONTENT_STORE_PATH", "")
+os.environ.setdefault("MEVZUAT_PREFETCH_TOP_K", "0")
+
+from fake_bedesten import FAKE_BASE_URL, FakeBedesten, Faults, Fixtures, simple_pdf, synthetic
+from mevzuat_client import MevzuatApiClient
+from mevzuat_convert import PDF_BASE64_PREFIX, ConversionPool, markdown_from_payload, markdown_from_pdf_pages, pdf_pages_supported, prewarm_converters
+from mevzuat_models import MevzuatArticleNode, MevzuatSearchRequest
+from mevzuat_tree import ArticleTree
+
+BENCHMARKS = ("search", "tree", "conversion", "pdf_pages", "e2e")
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    """Latency summary in milliseconds."""
+    ordered = sorted(samples)
+    def pct(p: float) -> float:
+        return round(1000 * ordered[min(len(ordered) - 1, int(p * len(ordered)))], 3)
+    return {
+        "count": len(ordered), "mean_ms": round(1000 * statistics.fmean(ordered), 3),
+        "p50_ms": pct(0.5), "p95_ms": pct(0.95), "max_ms": round(1000 * ordered[-1], 3),
+    }
+
+def _client(fake: FakeBedesten) -> MevzuatApiClient:
+    # Rate limiting would dominate throughput numbers against a local fake.
+    return MevzuatApiClient(transport=fake.transport(), base_url=FAKE_BASE_URL, upstream_rate=1e6, upstream_burst=1_000_000)
+
+async def bench_search(fake: FakeBedesten, requests: int, concurrency: int) -> Dict[str, Any]:
+    """Distinct queries (cache misses), then the same queries again (cache hits)."""
+    client = _client(fake)
+    words = sorted({w for doc in fake.fixtures.documents for w in doc["mevzuatAdi"].split() if not w.isdigit()})
+    phrases = [f"{words[i % len(words)]} {i}" if i >= len(words) else words[i] for i in range(requests)]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(phrase: str, samples: List[float]) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            result = await client.search_documents(MevzuatSearchRequest(phrase=phrase, page_size=10))
+            samples.append(time.perf_counter() - started)
+            if result.error_message:
+                errors.append(result.error_message)
+
+    results: Dict[str, Any] = {"requests": requests, "concurrency": concurrency}
+    errors: List[str] = []
+    try:
+        for label in ("miss", "hit"):
+            samples: List[float] = []
+            started = time.perf_counter()
+            await asyncio.gather(*(one(phrase, samples) for phrase in phrases))
+            elapsed = time.perf_counter() - started
+            results[label] = {"requests_per_second": round(requests / elapsed, 1), **_summary(samples)}
+    finally:
+        await client.close()
+    results["errors"] = len(errors)
+    return results
+
+def bench_tree(fixtures: Fixtures, repeat: int) -> Dict[str, Any]:
+    """Per-tree cost of validating the whole payload into MevzuatArticleNode vs. the compact tree plus a depth-1 slice."""
+    trees = [(mevzuat_id, children) for mevzuat_id, children in fixtures.trees.items() if children]
+    nodes = sum(len(ArticleTree.from_payload(mevzuat_id, children)) for mevzuat_id, children in trees)
+
+    def timed(fn: Callable[[str, list], Any]) -> float:
+        started = time.perf_counter()
+        for _ in range(repeat):
+            for mevzuat_id, children in trees:
+                fn(mevzuat_id, children)
+        return time.perf_counter() - started
+
+    def pydantic_models(mevzuat_id: str, children: list) -> Any:
+        return [MevzuatArticleNode.model_validate(child) for child in children]
+
+    def compact(mevzuat_id: str, children: list) -> Any:
+        return ArticleTree.from_payload(mevzuat_id, children)
+
+    def compact_slice(mevzuat_id: str, children: list) -> Any:
+        tree = ArticleTree.from_payload(mevzuat_id, children)
+        return tree.to_models(tree.select(max_depth=1))
+
+    results: Dict[str, Any] = {"trees": len(trees), "nodes": nodes, "repeat": repeat}
+    for label, fn in (("pydantic", pydantic_models), ("compact", compact), ("compact_depth1_models", compact_slice)):
+        elapsed = timed(fn)
+        results[label] = {
+            "ms_per_tree": round(1000 * elapsed / (repeat * len(trees)), 3),
+            "us_per_node": round(1e6 * elapsed / (repeat * nodes), 3),
+        }
+    return results
+
+def bench_conversion(fixtures: Fixtures, limit: int) -> Dict[str, Any]:
+    """Synchronous markdown_from_payload over article HTML, full-document HTML and PDF payloads."""
+    prewarm_converters()    # measure conversion, not the one-off converter import
+    groups: Dict[str, List[str]] = {"html_article": [], "html_document": [], "pdf": []}
+    for (_, document_type), content in fixtures.contents.items():
+        if content.startswith(PDF_BASE64_PREFIX):
+            groups["pdf"].append(content)
+        else:
+            groups["html_article" if document_type == "MADDE" else "html_document"].append(content)
+
+    results: Dict[str, Any] = {}
+    for kind, payloads in groups.items():
+        payloads = payloads[:limit]
+        if not payloads:
+            continue
+        samples, total_bytes, failed = [], 0, 0
+        for payload in payloads:
+            started = time.perf_counter()
+            markdown = markdown_from_payload(payload, kind)
+            samples.append(time.perf_counter() - started)
+            total_bytes += len(base64.b64decode(payload))
+            failed += markdown.startswith("PDF content available but could not be extracted")
+        results[kind] = {
+            "kb": round(total_bytes / 1024, 1), "ms_per_kb": round(1000 * sum(samples) / (total_bytes / 1024), 3),
+            "failed": failed, **_summary(samples),
+        }
+    return results
+
+async def bench_pdf_pages(pages: int, page_range: str) -> Dict[str, Any]:
+    """
+    A `pages`-page PDF served as a full document: every page in one process, every page through the
+    client's page chunks, and `page_range` alone (then again, from the page cache).
+    """
+    if not pdf_pages_supported():
+        return {"skipped": "pdfminer.six is not installed"}
+    pdf = simple_pdf([[f"Sayfa {p + 1}, satir {i + 1}: Resmi Gazete eki cetvel metni" for i in range(50)] for p in range(pages)])
+    fixtures = Fixtures()
+    fixtures.contents[("900000", "MEVZUAT")] = base64.b64encode(pdf).decode("ascii")
+    results: Dict[str, Any] = {"pages": pages, "kb": round(len(pdf) / 1024, 1), "page_range": page_range}
+
+    started = time.perf_counter()
+    markdown_from_pdf_pages(pdf, list(range(pages)))
+    results["all_pages_single_process_ms"] = round(1000 * (time.perf_counter() - started), 1)
+
+    errors: List[str] = []
+    async def timed(client: MevzuatApiClient, selection: Optional[str]) -> float:
+        started = time.perf_counter()
+        content = await client.get_full_document_content("900000", page_range=selection)
+        if content.error_message:
+            errors.append(content.error_message)
+        return round(1000 * (time.perf_counter() - started), 1)
+
+    def fresh_client() -> MevzuatApiClient:
+        client = MevzuatApiClient(transport=FakeBedesten(fixtures).transport(), base_url=FAKE_BASE_URL, conversion_pool=ConversionPool())
+        client.start_conversion_workers()
+        return client
+
+    client = fresh_client()
+    try:
+        results["all_pages_chunked_ms"] = await timed(client, None)
+        results["workers"] = client._conversion_pool.max_workers
+    finally:
+        await client.close()
+    client = fresh_client()
+    try:
+        results["page_range_ms"] = await timed(client, page_range)
+        results["page_range_cached_ms"] = await timed(client, page_range)
+    finally:
+        await client.close()
+    results["errors"] = len(errors)
+    return results
+
+async def bench_e2e(fake: FakeBedesten, iterations: int) -> Dict[str, Any]:
+    """MCP tool latency through fastmcp's in-memory client, with the server's client pointed at the fake."""
+    from fastmcp import Client
+    import mevzuat_mcp_server as server
+    logging.getLogger().setLevel(logging.WARNING)
+
+    original = server.mevzuat_client
+    server.mevzuat_client = _client(fake)
+    documents = fake.fixtures.documents
+    results: Dict[str, Any] = {"iterations": iterations}
+    try:
+        async with Client(server.app) as mcp:
+            samples: Dict[str, List[float]] = {}
+
+            async def call(tool: str, arguments: Dict[str, Any]) -> None:
+                started = time.perf_counter()
+                await mcp.call_tool(tool, arguments, raise_on_error=False)
+                samples.setdefault(tool, []).append(time.perf_counter() - started)
+
+            for i in range(iterations):
+                doc = documents[i % len(documents)]
+                mevzuat_id = str(doc["mevzuatId"])
+                article_ids = fake.fixtures.article_ids(mevzuat_id)
+                await call("search_mevzuat", {"phrase": doc["mevzuatAdi"].split()[0], "page_size": 10})
+                await call("get_mevzuat_article_tree", {"mevzuat_id": mevzuat_id, "max_depth": 2})
+                if article_ids:
+                    await call("get_mevzuat_article_content", {"mevzuat_id": mevzuat_id, "madde_id": article_ids[i % len(article_ids)]})
+                    await call("get_article_by_number", {"mevzuat_no_or_id": mevzuat_id, "madde_no": "1"})
+            results.update({tool: _summary(values) for tool, values in samples.items()})
+    finally:
+        await server.mevzuat_client.close()
+        server.mevzuat_client = original
+    return results
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=BENCH_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    fixtures = Fixtures.load(args.fixtures) if args.fixtures else synthetic(documents=args.documents)
+    faults = Faults(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, throttle_rate=args.throttle_rate, seed=1)
+    selected = args.only.split(",") if args.only else BENCHMARKS
+    report: Dict[str, Any] = {
+        "meta": {
+            "commit": _git_commit(), "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(), "platform": platform.platform(),
+            "fixtures": args.fixtures or f"synthetic({args.documents})", "faults": vars(faults),
+        },
+    }
+    if "search" in selected:
+        report["search"] = await bench_search(FakeBedesten(fixtures, faults), args.requests, args.concurrency)
+    if "tree" in selected:
+        report["tree"] = bench_tree(fixtures, args.repeat)
+    if "conversion" in selected:
+        report["conversion"] = bench_conversion(fixtures, args.conversion_limit)
+    if "pdf_pages" in selected:
+        report["pdf_pages"] = await bench_pdf_pages(args.pdf_pages, args.page_range)
+    if "e2e" in selected:
+        fake = FakeBedesten(fixtures, faults)
+        report["e2e"] = await bench_e2e(fake, args.iterations)
+        report["e2e"]["upstream_requests"] = fake.requests
+    return report
+
+def _print_report(report: Dict[str, Any]) -> None:
+    meta = report["meta"]
+    print(f"commit {meta['commit'] or '?'} | {meta['timestamp']} | python {meta['python']} | {meta['fixtures']}")
+    for section, values in report.items():
+        if section == "meta":
+            continue
+        print(f"\n[{section}]")
+        for key, value in values.items():
+            print(f"  {key}: {json.dumps(value, ensure_ascii=False) if isinstance(value, dict) else value}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", help="Fixture directory recorded with fake_bedesten.py (default: synthetic)")
+    parser.add_argument("--documents", type=int, default=40, help="Synthetic documents")
+    parser.add_argument("--only", help=f"Comma-separated subset of {','.join(BENCHMARKS)}")
+    parser.add_argument("--requests", type=int, default=500, help="Search requests per pass")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=20, help="Tree validation passes")
+    parser.add_argument("--conversion-limit", type=int, default=200, help="Payloads converted per kind")
+    parser.add_argument("--pdf-pages", type=int, default=300, help="Pages of the PDF used by the pdf_pages benchmark")
+    parser.add_argument("--page-range", default="150-152", help="Page range extracted by the pdf_pages benchmark")
+    parser.add_argument("--iterations", type=int, default=30, help="End-to-end tool call rounds")
+    parser.add_argument("--latency", type=float, default=0.0, help="Fake upstream latency (s)")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    report = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        _print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+# fake_bedesten.py
+"""
+Local stand-in for the bedesten API (searchDocuments, mevzuatMaddeTree, getDocumentContent).
+
+Responses come from a Fixtures set, either recorded from the live service or generated
+synthetically, with configurable latency, jitter and error/429 injection. The app is plain ASGI,
+so it can be mounted in-process with httpx.ASGITransport or served with uvicorn:
+
+    python benchmarks/fake_bedesten.py record --dir benchmarks/fixtures --phrase "vergi" --documents 5
+    python benchmarks/fake_bedesten.py serve --dir benchmarks/fixtures --port 8765 --latency 0.05
+    MEVZUAT_BASE_URL=http://127.0.0.1:8765/mevzuat python mevzuat_mcp_server.py
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import random
+import re
+import sys
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from mevzuat_client import MevzuatApiClient
+
+FAKE_BASE_URL = "http://bedesten.fake/mevzuat"
+
+def _success(data: Any) -> Dict[str, Any]:
+    return {"data": data, "metadata": {"FMTY": "SUCCESS"}}
+
+def _failure(message: str) -> Dict[str, Any]:
+    return {"data": None, "metadata": {"FMTY": "ERROR", "FMTE": message}}
+
+@dataclass
+class Fixtures:
+    """Raw bedesten payloads: search documents, tree children per mevzuat_id and base64 content per (id, documentType)."""
+    documents: List[Dict[str, Any]] = field(default_factory=list)
+    trees: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+    contents: Dict[Tuple[str, str], str] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, directory: str) -> "Fixtures":
+        with open(os.path.join(directory, "fixtures.json"), encoding="utf-8") as f:
+            raw = json.load(f)
+        return cls(
+            documents=raw["documents"], trees=raw["trees"],
+            contents={(item["id"], item["documentType"]): item["content"] for item in raw["contents"]},
+        )
+
+    def save(self, directory: str) -> str:
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, "fixtures.json")
+        raw = {
+            "documents": self.documents, "trees": self.trees,
+            "contents": [{"id": i, "documentType": t, "content": c} for (i, t), c in self.contents.items()],
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(raw, f, ensure_ascii=False)
+        return path
+
+    def article_ids(self, mevzuat_id: str) -> List[str]:
+        """Leaf (article) ids of a tree, in document order."""
+        ids, stack = [], list(reversed(self.trees.get(mevzuat_id, [])))
+        while stack:
+            node = stack.pop()
+            if node.get("children"):
+                stack.extend(reversed(node["children"]))
+            else:
+                ids.append(str(node["maddeId"]))
+        return ids
+
+@dataclass
+class Faults:
+    """Injected behaviour: base latency plus uniform jitter (seconds), and 503 / 429 response rates."""
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    seed: Optional[int] = None
+
+class FakeBedesten:
+    """The ASGI app (`.app`) plus request counters per endpoint."""
+
+    def __init__(self, fixtures: Fixtures, faults: Optional[Faults] = None):
+        self.fixtures = fixtures
+        self.faults = faults or Faults()
+        self._random = random.Random(self.faults.seed)
+        self.requests: Dict[str, int] = {}
+        self.app = Starlette(routes=[
+            Route("/mevzuat/searchDocuments", self._endpoint(self._search), methods=["POST"]),
+            Route("/mevzuat/mevzuatMaddeTree", self._endpoint(self._tree), methods=["POST"]),
+            Route("/mevzuat/getDocumentContent", self._endpoint(self._content), methods=["POST"]),
+        ])
+
+    def transport(self) -> httpx.ASGITransport:
+        """In-process transport for MevzuatApiClient(transport=..., base_url=FAKE_BASE_URL)."""
+        return httpx.ASGITransport(app=self.app)
+
+    def _endpoint(self, handler):
+        name = handler.__name__.lstrip("_")
+        async def endpoint(request: Request) -> JSONResponse:
+            self.requests[name] = self.requests.get(name, 0) + 1
+            faults = self.faults
+            delay = faults.latency + (self._random.uniform(0, faults.jitter) if faults.jitter else 0.0)
+            if delay:
+                await asyncio.sleep(delay)
+            roll = self._random.random()
+            if roll < faults.throttle_rate:
+                return JSONResponse({"message": "Too Many Requests"}, status_code=429, headers={"Retry-After": "1"})
+            if roll < faults.throttle_rate + faults.error_rate:
+                return JSONResponse({"message": "Service Unavailable"}, status_code=503)
+            payload = await request.json()
+            return JSONResponse(handler(payload.get("data") or {}))
+        return endpoint
+
+    def _search(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Word match of phrase/mevzuatAdi against titles; bedesten's Solr operators are ignored."""
+        words = [w.casefold() for w in re.findall(r"\w+", f"{data.get('phrase', '')} {data.get('mevzuatAdi', '')}")
+                 if w not in ("AND", "OR", "NOT")]
+        types = set(data.get("mevzuatTurList") or [])
+        matches = [
+            doc for doc in self.fixtures.documents
+            if (not types or doc["mevzuatTur"]["name"] in types)
+            and (not data.get("mevzuatNo") or str(doc.get("mevzuatNo")) == str(data["mevzuatNo"]))
+            and all(word in doc["mevzuatAdi"].casefold() for word in words)
+        ]
+        page_size, page_number = int(data.get("pageSize", 25)), int(data.get("pageNumber", 1))
+        start = (page_number - 1) * page_size
+        return _success({"mevzuatList": matches[start:start + page_size], "total": len(matches)})
+
+    def _tree(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        children = self.fixtures.trees.get(str(data.get("mevzuatId")))
+        if children is None:
+            return _failure("Mevzuat bulunamadı")
+        return _success({"children": children})
+
+    def _content(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        content = self.fixtures.contents.get((str(data.get("id")), data.get("documentType", "")))
+        if content is None:
+            return _failure("İçerik bulunamadı")
+        return _success({"content": content, "mimeType": "application/pdf" if content.startswith("JVBERi0") else "text/html"})
+
+# --- Synthetic fixtures ---
+
+_SENTENCES = [
+    "Bu Kanunun amacı, kamu hizmetlerinin etkin ve verimli şekilde yürütülmesini sağlamaktır.",
+    "Yükümlüler, bildirimlerini Bakanlıkça belirlenen süre içinde elektronik ortamda verir.",
+    "Bu madde uyarınca verilecek idari para cezaları, tebliğ tarihinden itibaren bir ay içinde ödenir.",
+    "Uygulamaya ilişkin usul ve esaslar yönetmelikle düzenlenir.",
+    "Birinci fıkrada belirtilen hâllerde, ilgili kurumun görüşü alınarak karar verilir.",
+]
+_SUBJECTS = ["Vergi Usul", "Türk Ceza", "Türk Ticaret", "İş", "Çevre", "Sağlık Hizmetleri", "Elektrik Piyasası", "Bankacılık"]
+
+def word_html(title: str, paragraphs: List[str]) -> str:
+    """A Word-exported HTML page like bedesten's article content (MsoNormal paragraphs, inline styles)."""
+    body = "".join(
+        f'<p class=MsoNormal style="text-align:justify;text-indent:28.3pt"><span style="font-size:9.0pt;'
+        f"font-family:&quot;Times New Roman&quot;,serif\">{text}</span></p>\n" for text in paragraphs
+    )
+    return (
+        '<html xmlns:o="urn:schemas-microsoft-com:office:office"><head><meta http-equiv=Content-Type '
+        'content="text/html; charset=utf-8"><style>p.MsoNormal{margin:0cm;font-size:11.0pt}</style></head>'
+        f'<body lang=TR><div class=WordSection1><p class=MsoNormal><b><span style="font-size:9.0pt">{title}'
+        f"</span></b></p>\n{body}</div></body></html>"
+    )
+
+def _pdf_text(text: str) -> str:
+    ascii_text = text.translate(str.maketrans("çğıöşüÇĞİÖŞÜâÂ", "cgiosuCGIOSUaA"))
+    return ascii_text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+def simple_pdf(pages: List[List[str]]) -> bytes:
+    """A minimal valid PDF with one Helvetica text page per entry of `pages` (lines of text)."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for lines in pages:
+        stream = "BT /F1 10 Tf 14 TL 50 790 Td " + " ".join(f"({_pdf_text(line)}) '" for line in lines) + " ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents {len(objects)} 0 R "
+                       "/Resources << /Font << /F1 3 0 R >> >> >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+    out, offsets = bytearray(b"%PDF-1.4\n"), []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+def synthetic(documents: int = 40, parts: int = 3, chapters: int = 4, articles: int = 12,
+              paragraphs: int = 4, pdf_documents: int = 4, pdf_pages: int = 20, seed: int = 7) -> Fixtures:
+    """
+    Generated fixtures: `documents` laws with a kısım/bölüm/madde tree of parts*chapters*articles
+    articles, Word-style HTML content for every article and for the full documents, except the last
+    `pdf_documents` whose full content is a `pdf_pages`-page PDF.
+    """
+    rng = random.Random(seed)
+    fixtures = Fixtures()
+    for d in range(documents):
+        mevzuat_id, subject = str(100000 + d), _SUBJECTS[d % len(_SUBJECTS)]
+        fixtures.documents.append({
+            "mevzuatId": mevzuat_id, "mevzuatNo": 5000 + d, "mevzuatAdi": f"{subject} Kanunu {d}",
+            "mevzuatTur": {"id": 1, "name": "KANUN", "description": "Kanun"},
+            "resmiGazeteTarihi": "2004-10-12T00:00:00", "resmiGazeteSayisi": str(25000 + d),
+            "kayitTarihi": "2004-10-12T00:00:00", "url": None,
+        })
+        tree, number, article_texts = [], 0, []
+        for p in range(parts):
+            part = {"maddeId": f"{mevzuat_id}-k{p}", "maddeNo": None, "title": f"{p + 1}. KISIM", "description": None, "mevzuatId": mevzuat_id, "children": []}
+            for c in range(chapters):
+                chapter = {"maddeId": f"{mevzuat_id}-k{p}-b{c}", "maddeNo": None, "title": f"{c + 1}. BÖLÜM", "description": None, "mevzuatId": mevzuat_id, "children": []}
+                for _ in range(articles):
+                    number += 1
+                    madde_id = f"{mevzuat_id}-m{number}"
+                    chapter["children"].append({"maddeId": madde_id, "maddeNo": number, "title": f"Madde {number}", "description": None, "mevzuatId": mevzuat_id, "children": []})
+                    texts = [f"({i + 1}) {rng.choice(_SENTENCES)}" for i in range(paragraphs)]
+                    article_texts.append((number, texts))
+                    html = word_html(f"MADDE {number}", texts)
+                    fixtures.contents[(madde_id, "MADDE")] = base64.b64encode(html.encode("utf-8")).decode("ascii")
+                part["children"].append(chapter)
+            tree.append(part)
+        fixtures.trees[mevzuat_id] = tree
+        if d >= documents - pdf_documents:
+            lines = [f"MADDE {n} - {t}" for n, texts in article_texts for t in texts]
+            per_page = max(1, -(-len(lines) // pdf_pages))
+            full = simple_pdf([lines[i:i + per_page] for i in range(0, len(lines), per_page)])
+        else:
+            full = word_html(f"{subject} Kanunu {d}", [f"MADDE {n} - {t}" for n, texts in article_texts for t in texts]).encode("utf-8")
+        fixtures.contents[(mevzuat_id, "MEVZUAT")] = base64.b64encode(full).decode("ascii")
+    return fixtures
+
+# --- Recording ---
+
+async def record(phrase: str, documents: int, articles: int, mevzuat_tur: str = "KANUN") -> Fixtures:
+    """Records a search, then trees, the first `articles` articles and the full content of its top `documents` hits from the live API."""
+    fixtures = Fixtures()
+    async with httpx.AsyncClient(base_url=MevzuatApiClient.BASE_URL + "/", headers=MevzuatApiClient.HEADERS, timeout=60.0) as client:
+        async def post(endpoint: str, data: Dict[str, Any], **extra: Any) -> Dict[str, Any]:
+            response = await client.post(endpoint, json={"data": data, "applicationName": "UyapMevzuat", **extra})
+            response.raise_for_status()
+            return response.json().get("data") or {}
+
+        found = await post("searchDocuments", {
+            "pageSize": documents, "pageNumber": 1, "mevzuatTurList": [mevzuat_tur], "phrase": phrase,
+            "sortFields": ["RESMI_GAZETE_TARIHI"], "sortDirection": "desc",
+        }, paging=True)
+        fixtures.documents = found.get("mevzuatList", [])
+        for doc in fixtures.documents:
+            mevzuat_id = str(doc["mevzuatId"])
+            print(f"📥 {mevzuat_id} {doc.get('mevzuatAdi', '')[:60]}")
+            fixtures.trees[mevzuat_id] = (await post("mevzuatMaddeTree", {"mevzuatId": mevzuat_id})).get("children", [])
+            content = await post("getDocumentContent", {"id": mevzuat_id, "documentType": "MEVZUAT"})
+            fixtures.contents[(mevzuat_id, "MEVZUAT")] = content.get("content", "")
+            for madde_id in fixtures.article_ids(mevzuat_id)[:articles]:
+                content = await post("getDocumentContent", {"id": madde_id, "documentType": "MADDE"})
+                fixtures.contents[(madde_id, "MADDE")] = content.get("content", "")
+    return fixtures
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    rec = subparsers.add_parser("record", help="Record fixtures from the live bedesten API")
+    rec.add_argument("--dir", required=True)
+    rec.add_argument("--phrase", required=True)
+    rec.add_argument("--documents", type=int, default=5)
+    rec.add_argument("--articles", type=int, default=20, help="Articles recorded per document")
+    gen = subparsers.add_parser("synthetic", help="Write generated fixtures")
+    gen.add_argument("--dir", required=True)
+    gen.add_argument("--documents", type=int, default=40)
+    serve = subparsers.add_parser("serve", help="Serve fixtures over HTTP")
+    serve.add_argument("--dir", help="Fixture directory (default: synthetic fixtures)")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--latency", type=float, default=0.0)
+    serve.add_argument("--jitter", type=float, default=0.0)
+    serve.add_argument("--error-rate", type=float, default=0.0)
+    serve.add_argument("--throttle-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    if args.command == "record":
+        fixtures = asyncio.run(record(args.phrase, args.documents, args.articles))
+        print(f"✅ {len(fixtures.documents)} belge, {len(fixtures.contents)} içerik: {fixtures.save(args.dir)}")
+    elif args.command == "synthetic":
+        print(f"✅ {synthetic(documents=args.documents).save(args.dir)}")
+    else:
+        import uvicorn
+        fixtures = Fixtures.load(args.dir) if args.dir else synthetic()
+        faults = Faults(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, throttle_rate=args.throttle_rate)
+        print(f"🚀 MEVZUAT_BASE_URL=http://{args.host}:{args.port}/mevzuat")
+        uvicorn.run(FakeBedesten(fixtures, faults).app, host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
@@ -5,16 +5,22 @@ HTTP API için MCP araçlarını expose eder
 """
 
 import os
+import json
 import asyncio
 import logging
-from typing import Dict, Any
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from typing import Dict, Any, AsyncIterator, Literal, Optional
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 import uvicorn
 
 # MCP araçlarını import et
 from mevzuat_client import MevzuatApiClient
+from mevzuat_store import ContentStore
+from mevzuat_index import LocalIndex
+from mevzuat_metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY
 from mevzuat_models import (
     MevzuatSearchRequest, MevzuatSearchResult,
     MevzuatTurEnum, SortFieldEnum, SortDirectionEnum,
@@ -25,11 +31,25 @@ from mevzuat_models import (
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Dönüştürme işçileri istekler gelmeden, sunucu dinlemeye başlamadan önce başlatılır
+    mevzuat_client.start_conversion_workers()
+    # Dönüştürücüler (markitdown, bs4/lxml) ilk içerik isteğinde yüklenir; istenirse sunucu açıldıktan sonra arka planda
+    if os.environ.get("MEVZUAT_PREWARM_CONVERTERS", "0") == "1":
+        mevzuat_client.prewarm(float(os.environ.get("MEVZUAT_PREWARM_DELAY", 1.0)))
+    try:
+        yield
+    finally:
+        # HTTP bağlantıları, işçi havuzu, içerik deposu ve yerel dizin kapatılır
+        await mevzuat_client.close()
+
 # FastAPI app
 app = FastAPI(
     title="Mevzuat MCP Server",
     description="HTTP API for Turkish Legislation Search",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -42,7 +62,7 @@ app.add_middleware(
 )
 
 # MCP client
-mevzuat_client = MevzuatApiClient()
+mevzuat_client = MevzuatApiClient(content_store=ContentStore.from_env(), local_index=LocalIndex.from_env())
 
 # Request models
 class SearchRequest(BaseModel):
@@ -56,9 +76,21 @@ class SearchRequest(BaseModel):
 class ArticleTreeRequest(BaseModel):
     mevzuat_id: str
 
+class ArticleTreePageRequest(ArticleTreeRequest):
+    max_depth: Optional[int] = Field(None, ge=1)
+    subtree_root: Optional[str] = None
+    page_number: int = Field(1, ge=1)
+    page_size: Optional[int] = Field(None, ge=1)
+
 class ArticleContentRequest(BaseModel):
     mevzuat_id: str
     madde_id: str
+    page_range: Optional[str] = None  # PDF belgeler için 1 tabanlı sayfalar, ör. "1-3,7"
+
+class ArticleByNumberRequest(BaseModel):
+    mevzuat_no_or_id: str
+    madde_no: str
+    mevzuat_tur: MevzuatTurEnum = "KANUN"
 
 # API Endpoints
 @app.get("/health")
@@ -66,6 +98,16 @@ async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "service": "mevzuat-mcp-server"}
 
+@app.get("/diagnostics")
+async def diagnostics():
+    """Önbellek ve istemci sayaçları"""
+    return mevzuat_client.diagnostics()
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrikleri (text exposition formatı)"""
+    return Response(REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
+
 @app.post("/search")
 async def search_mevzuat(request: SearchRequest):
     """Mevzuat arama endpoint'i"""
@@ -83,6 +125,7 @@ async def search_mevzuat(request: SearchRequest):
         )
         
         result = await mevzuat_client.search_documents(search_request)
+        mevzuat_client.prefetch_trees(result.documents)
         
         logger.info(f"Arama tamamlandı: {len(result.documents) if result.documents else 0} sonuç")
         
@@ -96,20 +139,26 @@ async def search_mevzuat(request: SearchRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/article-tree")
-async def get_article_tree(request: ArticleTreeRequest):
-    """Mevzuat madde ağacı endpoint'i"""
+async def get_article_tree(request: ArticleTreePageRequest):
+    """Mevzuat madde ağacı endpoint'i (isteğe bağlı max_depth, subtree_root ve sayfalama ile)"""
     try:
         logger.info(f"Madde ağacı isteği: {request.mevzuat_id}")
         
-        result = await mevzuat_client.get_article_tree(request.mevzuat_id)
+        result = await mevzuat_client.get_article_tree_page(
+            request.mevzuat_id, max_depth=request.max_depth, subtree_root=request.subtree_root,
+            page_number=request.page_number, page_size=request.page_size
+        )
         
-        logger.info(f"Madde ağacı alındı: {len(result) if result else 0} madde")
+        logger.info(f"Madde ağacı alındı: {len(result.nodes)}/{result.total_nodes} düğüm")
         
         return {
             "success": True,
-            "data": [item.dict() for item in result] if result else []
+            "data": [item.model_dump() for item in result.nodes],
+            **result.model_dump(exclude={"nodes"})
         }
         
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         logger.error(f"Madde ağacı hatası: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -121,7 +170,7 @@ async def get_article_content(request: ArticleContentRequest):
         logger.info(f"Madde içeriği isteği: {request.mevzuat_id}, madde: {request.madde_id}")
         
         if request.madde_id == request.mevzuat_id:
-            result = await mevzuat_client.get_full_document_content(request.mevzuat_id)
+            result = await mevzuat_client.get_full_document_content(request.mevzuat_id, page_range=request.page_range)
         else:
             result = await mevzuat_client.get_article_content(request.madde_id, request.mevzuat_id)
         
@@ -136,6 +185,156 @@ async def get_article_content(request: ArticleContentRequest):
         logger.error(f"Madde içeriği hatası: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/article-by-number")
+async def get_article_by_number(request: ArticleByNumberRequest):
+    """Mevzuat numarası/id'si ve madde numarasıyla tek çağrıda madde içeriği"""
+    try:
+        logger.info(f"Madde numarası isteği: {request.mevzuat_no_or_id}, madde: {request.madde_no}")
+        result = await mevzuat_client.get_article_by_number(request.mevzuat_no_or_id, request.madde_no, request.mevzuat_tur)
+        return {
+            "success": result.error_message is None,
+            "data": result.model_dump()
+        }
+        
+    except Exception as e:
+        logger.error(f"Madde numarası hatası: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Streaming endpoints
+CONTENT_CHUNK_SIZE = 8192
+
+StreamFormat = Literal["ndjson", "sse"]
+
+def _stream_response(events: AsyncIterator[Dict[str, Any]], fmt: StreamFormat) -> StreamingResponse:
+    """Olay akışını NDJSON satırları ya da Server-Sent Events olarak gönderir"""
+    async def encode():
+        try:
+            async for event in events:
+                data = json.dumps(event, ensure_ascii=False, default=str)
+                if fmt == "sse":
+                    yield f"event: {event.get('type', 'message')}\ndata: {data}\n\n"
+                else:
+                    yield data + "\n"
+        except Exception as e:
+            logger.error(f"Akış hatası: {str(e)}")
+            error = json.dumps({"type": "error", "detail": str(e)}, ensure_ascii=False)
+            yield f"event: error\ndata: {error}\n\n" if fmt == "sse" else error + "\n"
+
+    media_type = "text/event-stream" if fmt == "sse" else "application/x-ndjson"
+    return StreamingResponse(encode(), media_type=media_type, headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.post("/search/stream")
+async def stream_search(request: SearchRequest, format: StreamFormat = Query("ndjson")):
+    """Arama sonuçlarını belge belge akıtır"""
+    logger.info(f"Akışlı arama isteği: {request.phrase}")
+    search_request = MevzuatSearchRequest(
+        phrase=request.phrase,
+        mevzuat_tur_list=request.mevzuat_turleri,
+        page_size=request.page_size,
+        page_number=request.page_number,
+        sort_field=request.sort_field,
+        sort_direction=request.sort_direction
+    )
+
+    async def events():
+        result = await mevzuat_client.search_documents(search_request)
+        yield {"type": "meta", **result.model_dump(exclude={"documents"})}
+        for document in result.documents:
+            yield {"type": "document", "data": document.model_dump(mode="json")}
+        yield {"type": "end", "count": len(result.documents)}
+
+    return _stream_response(events(), format)
+
+@app.post("/article-tree/stream")
+async def stream_article_tree(request: ArticleTreeRequest, format: StreamFormat = Query("ndjson")):
+    """Madde ağacını düğüm düğüm (belge sırasıyla, çocuklar olmadan) akıtır"""
+    logger.info(f"Akışlı madde ağacı isteği: {request.mevzuat_id}")
+
+    async def events():
+        tree = await mevzuat_client.get_compact_tree(request.mevzuat_id)
+        count = 0
+        for node in tree or []:
+            data = {"madde_id": node.madde_id, "madde_no": node.madde_no, "title": node.title,
+                    "description": tree.descriptions[node.index], "mevzuat_id": request.mevzuat_id}
+            parent_id = tree.ids[node.parent] if node.parent >= 0 else None
+            yield {"type": "node", "depth": node.depth, "parent_id": parent_id, "data": data}
+            count += 1
+        yield {"type": "end", "count": count}
+
+    return _stream_response(events(), format)
+
+def _chunks(text: str, offset: int = 0):
+    """Metni CONTENT_CHUNK_SIZE boyutlu chunk olaylarına böler; offset belgedeki başlangıç konumudur"""
+    for start in range(0, len(text), CONTENT_CHUNK_SIZE):
+        yield {"type": "chunk", "offset": offset + start, "data": text[start:start + CONTENT_CHUNK_SIZE]}
+
+@app.post("/article-content/stream")
+async def stream_article_content(request: ArticleContentRequest, format: StreamFormat = Query("ndjson")):
+    """
+    Madde/mevzuat içeriğini parça parça akıtır.
+    Tam metin (madde_id == mevzuat_id) madde ağacından bölüm bölüm kurulur ve her bölüm hazır olur olmaz
+    gönderilir; toplam uzunluk ve hatalar bu yüzden "end" olayındadır. Tek bir madde ise önce tamamen
+    alınır, yalnızca aktarım parçalıdır.
+    """
+    logger.info(f"Akışlı madde içeriği isteği: {request.mevzuat_id}, madde: {request.madde_id}")
+
+    async def events():
+        if request.page_range and request.madde_id == request.mevzuat_id:
+            # PDF sayfaları dönüştürüldükçe sırayla gönderilir
+            count = 0
+            async for page, page_count, text in mevzuat_client.iter_document_pages(request.mevzuat_id, request.page_range):
+                if count == 0:
+                    yield {"type": "meta", "madde_id": request.madde_id, "mevzuat_id": request.mevzuat_id, "page_count": page_count}
+                yield {"type": "page", "page": page, "data": text}
+                count += 1
+            yield {"type": "end", "count": count}
+            return
+        if request.madde_id == request.mevzuat_id:
+            yield {"type": "meta", "madde_id": request.madde_id, "mevzuat_id": request.mevzuat_id}
+            length, failed, errors = 0, [], []
+            async for section in mevzuat_client.iter_document_sections(request.mevzuat_id):
+                if section.error_message:
+                    failed.append(section.madde_id)
+                    errors.append(section.error_message)
+                text = section.to_markdown()
+                if not text:
+                    continue
+                if length:
+                    text = "\n\n" + text
+                for event in _chunks(text, length):
+                    yield event
+                length += len(text)
+            # Ağaçsız mevzuatta tek bölüm tam metnin kendisidir; hatası olduğu gibi iletilir
+            error_message = None
+            if failed == [request.mevzuat_id]:
+                error_message = errors[0]
+            elif failed:
+                error_message = f"Could not retrieve {len(failed)} article(s): {', '.join(failed)}"
+            yield {"type": "end", "length": length, "error_message": error_message}
+            return
+        result = await mevzuat_client.get_article_content(request.madde_id, request.mevzuat_id)
+        yield {"type": "meta", "madde_id": result.madde_id, "mevzuat_id": result.mevzuat_id,
+               "length": len(result.markdown_content), "error_message": result.error_message}
+        for event in _chunks(result.markdown_content):
+            yield event
+        yield {"type": "end"}
+
+    return _stream_response(events(), format)
+
+@app.post("/document-sections")
+async def stream_document_sections(request: ArticleTreeRequest, format: StreamFormat = Query("ndjson")):
+    """Madde ağacından tam metni bölüm bölüm akıtır"""
+    logger.info(f"Bölüm akışı isteği: {request.mevzuat_id}")
+
+    async def events():
+        count = 0
+        async for section in mevzuat_client.iter_document_sections(request.mevzuat_id):
+            yield {"type": "section", "data": section.model_dump()}
+            count += 1
+        yield {"type": "end", "count": count}
+
+    return _stream_response(events(), format)
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -147,7 +346,14 @@ async def root():
             "search": "POST /search",
             "article_tree": "POST /article-tree", 
             "article_content": "POST /article-content",
-            "health": "GET /health"
+            "article_by_number": "POST /article-by-number",
+            "search_stream": "POST /search/stream?format=ndjson|sse",
+            "article_tree_stream": "POST /article-tree/stream?format=ndjson|sse",
+            "article_content_stream": "POST /article-content/stream?format=ndjson|sse",
+            "document_sections": "POST /document-sections?format=ndjson|sse",
+            "health": "GET /health",
+            "diagnostics": "GET /diagnostics",
+            "metrics": "GET /metrics"
         }
     }
 
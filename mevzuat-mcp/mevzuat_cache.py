@@ -0,0 +1,209 @@
+# mevzuat_cache.py
+"""
+In-memory caching primitives used by MevzuatApiClient.
+Provides a TTL+LRU cache, single-flight coalescing of identical in-flight calls and a
+bounded background prefetcher.
+"""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+_MISSING = object()
+
+class TTLCache:
+    """Bounded LRU cache whose entries expire after `ttl` seconds. A ttl of 0 disables caching."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.maxsize > 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            self.misses += 1
+            return default
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            # Expired entries stay until evicted so peek_stale() can still serve them during outages.
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def peek_stale(self, key: Hashable, default: Any = None) -> Any:
+        """Returns an entry even if it has expired, without touching counters or LRU order."""
+        entry = self._data.get(key, _MISSING)
+        return default if entry is _MISSING else entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if not self.enabled:
+            return
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def __contains__(self, key: Hashable) -> bool:
+        """True for a live (unexpired) entry; does not touch counters or LRU order."""
+        entry = self._data.get(key, _MISSING)
+        return entry is not _MISSING and entry[0] >= time.monotonic()
+
+    def pop(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data), "maxsize": self.maxsize, "ttl": self.ttl,
+            "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into one underlying awaitable.
+    The shared call is cancelled only when every caller waiting on it has been cancelled.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, "asyncio.Future[Any]"] = {}
+        self._waiters: Dict[Hashable, int] = {}
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            self._waiters[key] = 0
+            task.add_done_callback(lambda _t, k=key: (self._inflight.pop(k, None), self._waiters.pop(k, None)))
+        else:
+            self.coalesced += 1
+        self._waiters[key] += 1
+        try:
+            # Shield so a cancelled caller does not cancel the shared upstream call for the others.
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done() and self._waiters.get(key) == 1:
+                task.cancel()
+            raise
+        finally:
+            if key in self._waiters and self._inflight.get(key) is task:
+                self._waiters[key] -= 1
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+class Prefetcher:
+    """
+    Bounded speculative warm-up of a cache. At most `budget` speculative fetches run at once; further
+    requests are dropped rather than queued, so speculation never builds a backlog in front of real calls.
+    Counts how many prefetched keys were later requested for real (`hits`) to show whether it pays off.
+    """
+
+    def __init__(self, top_k: int = 0, budget: int = 4, max_tracked: int = 1024):
+        self.top_k = top_k
+        self.budget = budget
+        self.max_tracked = max_tracked
+        self._tasks: Dict[Hashable, Tuple["asyncio.Task[Any]", Hashable]] = {}
+        self._unused: "OrderedDict[Hashable, float]" = OrderedDict()
+        self._claimed: set = set()     # in flight, already requested for real
+        self.scheduled = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.skipped_budget = 0
+        self.skipped_busy = 0
+        self.hits = 0
+
+    @classmethod
+    def from_env(cls) -> "Prefetcher":
+        """MEVZUAT_PREFETCH_TOP_K (0 disables prefetching) and MEVZUAT_PREFETCH_BUDGET."""
+        return cls(
+            top_k=int(os.environ.get("MEVZUAT_PREFETCH_TOP_K", 0)),
+            budget=int(os.environ.get("MEVZUAT_PREFETCH_BUDGET", 4)),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.top_k > 0 and self.budget > 0
+
+    def schedule(self, key: Hashable, fn: Callable[[], Awaitable[bool]], owner: Hashable = None) -> bool:
+        """Starts `fn` (returning True on success) in the background unless the budget is used up."""
+        if key in self._tasks or key in self._unused:
+            return False
+        if len(self._tasks) >= self.budget:
+            self.skipped_budget += 1
+            return False
+        task = asyncio.create_task(self._run(key, fn))
+        self._tasks[key] = (task, owner)
+        self.scheduled += 1
+        return True
+
+    async def _run(self, key: Hashable, fn: Callable[[], Awaitable[bool]]) -> None:
+        try:
+            ok = await fn()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        except Exception:
+            ok = False
+        finally:
+            self._tasks.pop(key, None)
+            claimed = key in self._claimed
+            self._claimed.discard(key)
+        if not ok:
+            self.failed += 1
+            return
+        self.completed += 1
+        if claimed:
+            return
+        self._unused[key] = time.monotonic()
+        while len(self._unused) > self.max_tracked:
+            self._unused.popitem(last=False)
+
+    def record_use(self, key: Hashable) -> bool:
+        """Called on every real lookup; True if a prefetch (finished or still running) anticipated it."""
+        if key in self._tasks:
+            if key not in self._claimed:
+                self._claimed.add(key)
+                self.hits += 1
+            return True
+        if self._unused.pop(key, None) is not None:
+            self.hits += 1
+            return True
+        return False
+
+    def cancel(self, owner: Hashable = None) -> None:
+        """Cancels the running prefetches of `owner`, or all of them when owner is None."""
+        for task, task_owner in list(self._tasks.values()):
+            if owner is None or task_owner == owner:
+                task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "top_k": self.top_k, "budget": self.budget, "in_flight": len(self._tasks),
+            "scheduled": self.scheduled, "completed": self.completed, "failed": self.failed,
+            "cancelled": self.cancelled, "skipped_budget": self.skipped_budget, "skipped_busy": self.skipped_busy,
+            "hits": self.hits, "unused": len(self._unused),
+            "hit_rate": round(self.hits / self.scheduled, 4) if self.scheduled else 0.0,
+        }
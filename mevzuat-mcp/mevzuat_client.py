@@ -4,19 +4,50 @@ API Client for interacting with the Adalet Bakanlığı Mevzuat API (bedesten.ad
 This client handles the business logic of making HTTP requests and parsing responses.
 """
 
+import asyncio
+import base64
 import httpx
 import logging
-import base64
-import io
-from bs4 import BeautifulSoup
-from markitdown import MarkItDown
-from typing import Dict, List, Optional, Any
+import os
+import time
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Any, Hashable, Sequence, Set, Tuple, Union
+from mevzuat_cache import Prefetcher, TTLCache, SingleFlight
+from mevzuat_store import ContentStore, content_hash
+from mevzuat_index import LocalIndex
+from mevzuat_resilience import AdaptiveTokenBucket, CircuitBreaker, CircuitOpenError, RetryBudget, UpstreamGuard, backoff_delay
+from mevzuat_http import PoolMetrics, build_http_client, resolve_http2
+from mevzuat_convert import (
+    PDF_BASE64_PREFIX, ConversionPool, PdfDocument, html_from_base64, is_unextracted_pdf_message, markdown_from_content,
+    markdown_from_html, markdown_from_payload, markdown_from_pdf_pages, page_chunks, parse_page_range, pdf_page_count,
+    pdf_pages_supported, unextracted_pdf_message
+)
+from mevzuat_stream import StreamedContent, read_content_stream
+from mevzuat_metrics import (
+    CONVERSION_INPUT_BYTES, CONVERSION_SECONDS, REGISTRY, UPSTREAM_RESPONSE_BYTES, UPSTREAM_SECONDS, Family, instrumented
+)
+from mevzuat_tree import ArticleTree, TreeNode, article_key
 from mevzuat_models import (
     MevzuatSearchRequest, MevzuatSearchResult, MevzuatDocument, MevzuatTur,
-    MevzuatArticleNode, MevzuatArticleContent
+    MevzuatArticleNode, MevzuatArticleContent, MevzuatDocumentSection, MevzuatArticleTreePage
 )
 logger = logging.getLogger(__name__)
 
+# A fetched content payload: the base64 string of a buffered response, or a streamed download.
+ContentPayload = Union[str, StreamedContent]
+# Consumes a successful response that _post_once has not buffered.
+ResponseReader = Callable[[httpx.Response], Awaitable[Any]]
+
+def _payload_hash(content: ContentPayload) -> str:
+    return content.source_hash if isinstance(content, StreamedContent) else content_hash(content)
+
+def _is_pdf_payload(content: ContentPayload) -> bool:
+    return content.is_pdf if isinstance(content, StreamedContent) else content.startswith(PDF_BASE64_PREFIX)
+
+def _release(content: Optional[ContentPayload]) -> None:
+    if isinstance(content, StreamedContent):
+        content.close()
+
 class MevzuatApiClient:
     BASE_URL = "https://bedesten.adalet.gov.tr/mevzuat"
     HEADERS = {
@@ -27,34 +58,297 @@ class MevzuatApiClient:
         'Referer': 'https://mevzuat.adalet.gov.tr/',
         'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
     }
-    def __init__(self, timeout: float = 30.0):
-        self._http_client = httpx.AsyncClient(headers=self.HEADERS, timeout=timeout, follow_redirects=True)
-        self._md_converter = MarkItDown()
+    ENDPOINTS = ("searchDocuments", "mevzuatMaddeTree", "getDocumentContent")
+
+    def __init__(self, timeout: float = 30.0, search_cache_ttl: float = 300.0, search_cache_size: int = 1024,
+                 content_store: Optional[ContentStore] = None, conversion_pool: Optional[ConversionPool] = None,
+                 upstream_rate: float = 10.0, upstream_burst: int = 20,
+                 breaker_failure_threshold: int = 5, breaker_recovery_timeout: float = 30.0,
+                 connect_timeout: float = 5.0, max_connections: int = 100, max_keepalive_connections: int = 20,
+                 keepalive_expiry: float = 30.0, http2: Optional[bool] = None,
+                 transport: Optional[httpx.AsyncBaseTransport] = None,
+                 max_retries: int = 2, retry_backoff_base: float = 0.2, retry_backoff_max: float = 2.0,
+                 retry_budget_ratio: float = 0.1, hedged_endpoints: Tuple[str, ...] = ("getDocumentContent", "mevzuatMaddeTree"),
+                 local_index: Optional[LocalIndex] = None, tree_cache_ttl: float = 600.0, tree_cache_size: int = 256,
+                 prefetcher: Optional[Prefetcher] = None, base_url: Optional[str] = None,
+                 pdf_cache_size: int = 4, pdf_page_cache_size: int = 4096, pdf_cache_ttl: float = 600.0,
+                 stream_documents: bool = True, stream_chunk_size: int = 64 * 1024, stream_spool_bytes: int = 1024 * 1024,
+                 stream_spool_dir: Optional[str] = None):
+        http2 = resolve_http2(http2)
+        # MEVZUAT_BASE_URL points the client at another bedesten-compatible server (e.g. benchmarks/fake_bedesten.py).
+        self.base_url = (base_url or os.environ.get("MEVZUAT_BASE_URL") or self.BASE_URL).rstrip("/")
+        self._http_client = build_http_client(
+            self.HEADERS, connect_timeout=connect_timeout, read_timeout=timeout,
+            max_connections=max_connections, max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry, http2=http2, transport=transport,
+        )
+        self._pool_metrics = PoolMetrics(self._http_client, http2=http2)
+        self._search_cache = TTLCache(maxsize=search_cache_size, ttl=search_cache_ttl)
+        self._search_flight = SingleFlight()
+        self._tree_cache = TTLCache(maxsize=tree_cache_size, ttl=tree_cache_ttl)
+        self._tree_flight = SingleFlight()
+        # Decoded full-document PDFs (mevzuat_id -> PdfDocument) and their extracted pages ((source_hash, page) -> text).
+        self._pdf_cache = TTLCache(maxsize=pdf_cache_size, ttl=pdf_cache_ttl)
+        self._pdf_flight = SingleFlight()
+        self._pdf_page_cache = TTLCache(maxsize=pdf_page_cache_size, ttl=pdf_cache_ttl)
+        self._prefetcher = prefetcher or Prefetcher.from_env()
+        self._content_store = content_store
+        self._conversion_pool = conversion_pool or ConversionPool.from_env()
+        self._revalidating: Dict[str, asyncio.Task] = {}
+        self._background_tasks: Set[asyncio.Task] = set()
+        self._prewarm_task: Optional[asyncio.Task] = None
+        self.local_index = local_index
+        self._guards = {
+            endpoint: UpstreamGuard(
+                endpoint,
+                AdaptiveTokenBucket(rate=upstream_rate, burst=upstream_burst),
+                CircuitBreaker(failure_threshold=breaker_failure_threshold, recovery_timeout=breaker_recovery_timeout),
+            )
+            for endpoint in self.ENDPOINTS
+        }
+        self._max_retries = max_retries
+        self._retry_backoff_base = retry_backoff_base
+        self._retry_backoff_max = retry_backoff_max
+        self._retry_budget = RetryBudget(ratio=retry_budget_ratio)
+        self._hedged_endpoints = frozenset(hedged_endpoints)
+        # Full documents are decoded from the response body as it arrives (see mevzuat_stream); payloads
+        # beyond stream_spool_bytes are spooled to a temporary file in stream_spool_dir.
+        self._stream_documents = stream_documents
+        self._stream_chunk_size = stream_chunk_size
+        self._stream_spool_bytes = stream_spool_bytes
+        self._stream_spool_dir = stream_spool_dir
+        REGISTRY.register_collector(self._collect_metrics)
 
     async def close(self):
+        self._prefetcher.cancel()
+        for task in [*self._revalidating.values(), *self._background_tasks]:
+            task.cancel()
         await self._http_client.aclose()
+        self._conversion_pool.shutdown()
+        if self._content_store is not None:
+            self._content_store.close()
+        if self.local_index is not None:
+            self.local_index.close()
 
-    def _html_from_base64(self, b64_string: str) -> str:
+    RETRYABLE_STATUS_CODES = (429, 502, 503, 504)
+
+    async def _post(self, endpoint: str, payload: Dict[str, Any],
+                    reader: Optional[ResponseReader] = None) -> Any:
+        """
+        POSTs to a bedesten endpoint. All bedesten endpoints used here are read-only, so transient
+        failures are retried with jittered exponential backoff, and slow calls may be hedged.
+        Extra attempts draw from a shared RetryBudget so they never multiply upstream load.
+        Returns the parsed JSON body, or what `reader` makes of a successful streaming response.
+        """
+        guard = self._guards[endpoint]
+        self._retry_budget.deposit()
+        attempt = 0
+        while True:
+            try:
+                return await self._post_hedged(endpoint, payload, reader)
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                retryable = not isinstance(e, httpx.HTTPStatusError) or e.response.status_code in self.RETRYABLE_STATUS_CODES
+                if not retryable or attempt >= self._max_retries or not self._retry_budget.withdraw():
+                    raise
+                delay = backoff_delay(attempt, self._retry_backoff_base, self._retry_backoff_max)
+                logger.info(f"Retrying {endpoint} in {delay:.2f}s after: {e!r}")
+                guard.retries += 1
+                attempt += 1
+                await asyncio.sleep(delay)
+
+    async def _post_hedged(self, endpoint: str, payload: Dict[str, Any],
+                           reader: Optional[ResponseReader] = None) -> Any:
+        """
+        Sends one attempt; if it has not answered within the endpoint's observed p95 latency,
+        sends a second one and returns whichever succeeds first.
+        """
+        guard = self._guards[endpoint]
+        hedge_after = guard.latency.percentile(0.95) if endpoint in self._hedged_endpoints else None
+        if hedge_after is None:
+            return await self._post_once(endpoint, payload, reader)
+
+        primary = asyncio.create_task(self._post_once(endpoint, payload, reader))
+        attempts = [primary]
         try:
-            decoded_bytes = base64.b64decode(b64_string)
-            return decoded_bytes.decode('utf-8')
-        except Exception: return ""
+            done, _ = await asyncio.wait(attempts, timeout=hedge_after)
+            if not done and self._retry_budget.withdraw():
+                guard.hedges += 1
+                attempts.append(asyncio.create_task(self._post_once(endpoint, payload, reader)))
+            pending = set(attempts)
+            first_error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            guard.hedge_wins += 1
+                        return task.result()
+                    if first_error is None or task is primary:
+                        first_error = task.exception()
+            raise first_error
+        finally:
+            for task in attempts:
+                task.cancel()
+
+    async def _post_once(self, endpoint: str, payload: Dict[str, Any],
+                         reader: Optional[ResponseReader] = None) -> Any:
+        """
+        A single POST through the endpoint's rate limiter and circuit breaker.
+        Raises CircuitOpenError without touching the network while the endpoint is unhealthy.
+        With a `reader`, a successful response body is not buffered: reader consumes the open response.
+        """
+        guard = self._guards[endpoint]
+        await guard.acquire()
+        self._pool_metrics.request_started()
+        started_at = time.perf_counter()
+        result = None
+        try:
+            # The tracer is created after acquire() so the pool acquire-wait metric excludes rate-limiter sleeps.
+            request = self._http_client.build_request(
+                "POST", f"{self.base_url}/{endpoint}", json=payload, extensions={"trace": self._pool_metrics.tracer()}
+            )
+            response = await self._http_client.send(request, stream=True)
+            try:
+                if reader is not None and response.is_success:
+                    result = await reader(response)
+                else:
+                    await response.aread()
+            finally:
+                await response.aclose()
+        except httpx.TransportError:
+            guard.record(None)
+            UPSTREAM_SECONDS.labels(endpoint=endpoint, status="transport_error").observe(time.perf_counter() - started_at)
+            raise
+        except BaseException:
+            guard.abandon()
+            raise
+        finally:
+            self._pool_metrics.request_finished()
+        elapsed = time.perf_counter() - started_at
+        guard.record(response.status_code)
+        UPSTREAM_SECONDS.labels(endpoint=endpoint, status=response.status_code).observe(elapsed)
+        # A streamed body is not kept on the response; count what came over the wire instead.
+        UPSTREAM_RESPONSE_BYTES.labels(endpoint=endpoint).observe(
+            response.num_bytes_downloaded if reader is not None else len(response.content)
+        )
+        response.raise_for_status()
+        guard.latency.record(elapsed)
+        return result if reader is not None else response.json()
+
+    def _html_from_base64(self, b64_string: str) -> str:
+        return html_from_base64(b64_string)
 
     def _markdown_from_html(self, html_content: str) -> str:
-        if not html_content: return ""
+        started_at = time.perf_counter()
         try:
-            html_bytes = html_content.encode('utf-8')
-            html_io = io.BytesIO(html_bytes)
-            conv_res = self._md_converter.convert(html_io)
-            if conv_res and conv_res.text_content:
-                return conv_res.text_content.strip()
-            return ""
-        except Exception:
-            soup = BeautifulSoup(html_content, 'lxml')
-            return soup.get_text(separator='\n', strip=True)
+            return markdown_from_html(html_content)
+        finally:
+            CONVERSION_SECONDS.labels(kind="html").observe(time.perf_counter() - started_at)
+            CONVERSION_INPUT_BYTES.labels(kind="html").observe(len(html_content or ""))
 
+    async def _markdown_from_payload(self, content: ContentPayload, doc_id: str) -> str:
+        """
+        Converts a content payload in the conversion pool so large PDFs do not block the event loop.
+        PDFs are split into page chunks converted in parallel when pdfminer.six is available.
+        A streamed payload is handed to the workers as its spooled file rather than as bytes.
+        """
+        streamed = isinstance(content, StreamedContent)
+        kind = "pdf" if _is_pdf_payload(content) else "html"
+        b64_length = content.b64_length if streamed else len(content)
+        started_at = time.perf_counter()
+        try:
+            if kind == "pdf" and pdf_pages_supported():
+                try:
+                    pdf = await asyncio.to_thread(self._decode_pdf, content, True)
+                    pages = [text async for _, text in self._pdf_pages(pdf, range(pdf.page_count))]
+                    return "\n\n".join(text for text in pages if text)
+                except Exception as pdf_error:
+                    logger.warning(f"PDF extraction failed for {doc_id}: {pdf_error}")
+                    return unextracted_pdf_message(b64_length)
+            if streamed:
+                return await self._conversion_pool.run(markdown_from_content, content.source, doc_id, b64_length)
+            return await self._conversion_pool.run(markdown_from_payload, content, doc_id)
+        finally:
+            CONVERSION_SECONDS.labels(kind=kind).observe(time.perf_counter() - started_at)
+            CONVERSION_INPUT_BYTES.labels(kind=kind).observe(content.size if streamed else b64_length * 3 // 4)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Returns hit/miss counters of the search result cache."""
+        return {**self._search_cache.stats(), "coalesced": self._search_flight.coalesced, "inflight": len(self._search_flight)}
+
+    def diagnostics(self) -> Dict[str, Any]:
+        diagnostics = {"search_cache": self.cache_stats(), "conversion_pool": self._conversion_pool.stats()}
+        diagnostics["tree_cache"] = {**self._tree_cache.stats(), "coalesced": self._tree_flight.coalesced}
+        diagnostics["pdf_cache"] = {"documents": self._pdf_cache.stats(), "pages": self._pdf_page_cache.stats()}
+        diagnostics["prefetch"] = self._prefetcher.stats()
+        diagnostics["http_pool"] = self._pool_metrics.stats()
+        diagnostics["upstream"] = {endpoint: guard.stats() for endpoint, guard in self._guards.items()}
+        diagnostics["retry_budget"] = self._retry_budget.stats()
+        if self._content_store is not None:
+            diagnostics["content_store"] = {**self._content_store.stats(), "revalidating": len(self._revalidating)}
+        if self.local_index is not None:
+            diagnostics["local_index"] = self.local_index.stats()
+        return diagnostics
+
+    def _collect_metrics(self) -> Iterable[Family]:
+        """Scrape-time samples from the client's caches, pools and upstream guards."""
+        caches = {"search": self._search_cache.stats(), "tree": self._tree_cache.stats(), "pdf_page": self._pdf_page_cache.stats()}
+        yield ("mevzuat_cache_entries", "gauge", "Entries in in-memory caches.",
+               [({"cache": name}, stats["size"]) for name, stats in caches.items()])
+        yield ("mevzuat_cache_lookups_total", "counter", "In-memory cache lookups by result.",
+               [({"cache": name, "result": result}, stats[key]) for name, stats in caches.items() for result, key in (("hit", "hits"), ("miss", "misses"))])
+        prefetch = self._prefetcher.stats()
+        yield ("mevzuat_prefetch_total", "counter", "Speculative article tree prefetches by outcome.",
+               [({"outcome": outcome}, prefetch[outcome]) for outcome in ("scheduled", "completed", "failed", "cancelled", "skipped_budget", "skipped_busy")]
+               + [({"outcome": "used"}, prefetch["hits"])])
+        pool = self._conversion_pool.stats()
+        yield ("mevzuat_conversion_pool_queue_depth", "gauge", "Conversions waiting for a conversion pool slot.", [({}, pool["queue_depth"])])
+        yield ("mevzuat_conversion_pool_active", "gauge", "Conversions currently running.", [({}, pool["active"])])
+        yield ("mevzuat_http_in_flight", "gauge", "HTTP requests to bedesten currently in flight.", [({}, self._pool_metrics.in_flight)])
+        yield ("mevzuat_upstream_breaker_open", "gauge", "1 while an endpoint's circuit breaker is not closed.",
+               [({"endpoint": endpoint}, int(guard.breaker.state != guard.breaker.CLOSED)) for endpoint, guard in self._guards.items()])
+        if self._content_store is not None:
+            store = self._content_store.stats()
+            yield ("mevzuat_content_store_lookups_total", "counter", "Persistent content store lookups by result.",
+                   [({"result": result}, store[key]) for result, key in (("hit", "hits"), ("miss", "misses")) if key in store])
+
+    @staticmethod
+    def _search_cache_key(request: MevzuatSearchRequest) -> Hashable:
+        def norm(value: Optional[str]) -> Optional[str]:
+            return (value.strip() or None) if value else None
+        return (
+            tuple(sorted(set(request.mevzuat_tur_list))), norm(request.phrase), norm(request.mevzuat_adi),
+            norm(request.mevzuat_no), norm(request.resmi_gazete_sayisi),
+            request.page_number, request.page_size, request.sort_field, request.sort_direction,
+        )
+
+    @instrumented("search_documents")
     async def search_documents(self, request: MevzuatSearchRequest) -> MevzuatSearchResult:
-        """Performs a detailed search for legislation documents."""
+        """Performs a detailed search for legislation documents, served from the TTL/LRU cache when possible."""
+        key = self._search_cache_key(request)
+        result = self._search_cache.get(key)
+        if result is None:
+            try:
+                result = await self._search_flight.do(key, lambda: self._search_documents_uncached(request))
+            except CircuitOpenError as e:
+                stale = self._search_cache.peek_stale(key)
+                if stale is not None:
+                    logger.warning(f"Serving stale search result: {e}")
+                    return stale.model_copy(update={"query_used": self._query_used(request)})
+                return MevzuatSearchResult(documents=[], total_results=0, current_page=request.page_number, page_size=request.page_size, total_pages=0, query_used=self._query_used(request), error_message=str(e))
+            # Only successful answers are cached; upstream errors should be retried by the next caller.
+            if not result.error_message:
+                self._search_cache.set(key, result)
+                if self.local_index is not None and result.documents:
+                    self._run_in_background(self.local_index.add_documents, result.documents)
+        # Copy so callers may annotate their result without touching the cached instance.
+        return result.model_copy(update={"query_used": self._query_used(request)})
+
+    @staticmethod
+    def _query_used(request: MevzuatSearchRequest) -> Dict[str, Any]:
+        return {**request.model_dump(), "backend": "remote"}
+
+    async def _search_documents_uncached(self, request: MevzuatSearchRequest) -> MevzuatSearchResult:
         payload = {
             "data": {
                 "pageSize": request.page_size,
@@ -68,18 +362,16 @@ class MevzuatApiClient:
         }
         
         if request.mevzuat_adi:
-            payload["data"]["mevzuatAdi"] = request.mevzuat_adi
+            payload["data"]["mevzuatAdi"] = request.mevzuat_adi.strip()
         if request.phrase:
-            payload["data"]["phrase"] = request.phrase
+            payload["data"]["phrase"] = request.phrase.strip()
         if request.mevzuat_no:
-            payload["data"]["mevzuatNo"] = request.mevzuat_no
+            payload["data"]["mevzuatNo"] = request.mevzuat_no.strip()
         if request.resmi_gazete_sayisi:
             payload["data"]["resmiGazeteSayi"] = request.resmi_gazete_sayisi
             
         try:
-            response = await self._http_client.post(f"{self.BASE_URL}/searchDocuments", json=payload)
-            response.raise_for_status()
-            data = response.json()
+            data = await self._post("searchDocuments", payload)
             if data.get("metadata", {}).get("FMTY") != "SUCCESS":
                 error_msg = data.get("metadata", {}).get("FMTE", "Unknown API error")
                 return MevzuatSearchResult(documents=[], total_results=0, current_page=request.page_number, page_size=request.page_size, total_pages=0, query_used=request.model_dump(), error_message=error_msg)
@@ -91,84 +383,467 @@ class MevzuatApiClient:
                 total_pages=(total_results + request.page_size - 1) // request.page_size if request.page_size > 0 else 0,
                 query_used=request.model_dump()
             )
+        except CircuitOpenError:
+            raise
         except httpx.HTTPStatusError as e:
             return MevzuatSearchResult(documents=[], total_results=0, current_page=request.page_number, page_size=request.page_size, total_pages=0, query_used=request.model_dump(), error_message=f"API request failed: {e.response.status_code}")
         except Exception as e:
             return MevzuatSearchResult(documents=[], total_results=0, current_page=request.page_number, page_size=request.page_size, total_pages=0, query_used=request.model_dump(), error_message=f"An unexpected error occurred: {e}")
 
-    async def get_article_tree(self, mevzuat_id: str) -> List[MevzuatArticleNode]:
+    async def get_compact_tree(self, mevzuat_id: str) -> Optional[ArticleTree]:
+        """
+        The article tree in compact form, cached per mevzuat_id. An empty tree means the legislation
+        has no hierarchical structure; None means the tree could not be retrieved (not cached).
+        """
+        anticipated = self._prefetcher.record_use(mevzuat_id)
+        tree = self._tree_cache.get(mevzuat_id)
+        if tree is None:
+            tree = await self._tree_flight.do(mevzuat_id, lambda: self._fetch_compact_tree(mevzuat_id))
+            if tree is None and anticipated:
+                # Joined a one-shot speculative fetch that failed; make the real, retrying attempt.
+                tree = await self._tree_flight.do(mevzuat_id, lambda: self._fetch_compact_tree(mevzuat_id))
+            if tree is not None:
+                self._tree_cache.set(mevzuat_id, tree)
+        return tree
+
+    async def _fetch_compact_tree(self, mevzuat_id: str, speculative: bool = False) -> Optional[ArticleTree]:
+        """Speculative fetches make a single attempt: no retries or hedges that would draw on the shared budgets."""
         payload = { "data": {"mevzuatId": mevzuat_id}, "applicationName": "UyapMevzuat" }
         try:
-            response = await self._http_client.post(f"{self.BASE_URL}/mevzuatMaddeTree", json=payload)
-            response.raise_for_status()
-            data = response.json()
-            if data.get("metadata", {}).get("FMTY") != "SUCCESS": return []
-            root_node = data.get("data", {})
-            return [MevzuatArticleNode.model_validate(child) for child in root_node.get("children", [])]
+            post = self._post_once if speculative else self._post
+            data = await post("mevzuatMaddeTree", payload)
+            if data.get("metadata", {}).get("FMTY") != "SUCCESS":
+                # Not the same as an empty tree: caching this would turn a failed lookup into a flat law.
+                log = logger.debug if speculative else logger.warning
+                log(f"Article tree for mevzuatId {mevzuat_id} not returned: {data.get('metadata')}")
+                return None
+            return ArticleTree.from_payload(mevzuat_id, (data.get("data") or {}).get("children", []))
         except Exception as e:
-            logger.exception(f"Error fetching article tree for mevzuatId {mevzuat_id}")
-            return []
+            if speculative:
+                logger.debug(f"Prefetch of article tree {mevzuat_id} failed: {e!r}")
+            else:
+                logger.exception(f"Error fetching article tree for mevzuatId {mevzuat_id}")
+            return None
+
+    @property
+    def prefetch_enabled(self) -> bool:
+        return self._prefetcher.enabled
+
+    def prefetch_trees(self, documents: List[MevzuatDocument], owner: Hashable = None) -> int:
+        """
+        Speculatively warms the tree cache for the first `top_k` documents of a search result, which
+        are what a client usually opens next. Skipped while the tree endpoint is short of rate-limit
+        headroom or its breaker is not closed. `owner` (e.g. a session) allows cancel_prefetch(owner).
+        Returns the number of prefetches started.
+        """
+        if not self._prefetcher.enabled:
+            return 0
+        guard = self._guards["mevzuatMaddeTree"]
+        started = 0
+        for document in documents[:self._prefetcher.top_k]:
+            mevzuat_id = document.mevzuat_id
+            if mevzuat_id in self._tree_cache:
+                continue
+            if not guard.has_headroom():
+                self._prefetcher.skipped_busy += 1
+                break
+            started += self._prefetcher.schedule(mevzuat_id, lambda m=mevzuat_id: self._prefetch_tree(m), owner)
+        return started
+
+    async def _prefetch_tree(self, mevzuat_id: str) -> bool:
+        tree = await self._tree_flight.do(mevzuat_id, lambda: self._fetch_compact_tree(mevzuat_id, speculative=True))
+        if tree is None:
+            return False
+        self._tree_cache.set(mevzuat_id, tree)
+        return True
+
+    def cancel_prefetch(self, owner: Hashable = None) -> None:
+        """Cancels the prefetches started for `owner` (all of them when None), e.g. when a session ends."""
+        self._prefetcher.cancel(owner)
+
+    @instrumented("get_article_tree")
+    async def get_article_tree(self, mevzuat_id: str) -> List[MevzuatArticleNode]:
+        """The complete article tree as nested models; see get_article_tree_page for bounded responses."""
+        tree = await self.get_compact_tree(mevzuat_id)
+        return tree.to_models(list(range(len(tree)))) if tree else []
+
+    @instrumented("get_article_tree_page")
+    async def get_article_tree_page(self, mevzuat_id: str, max_depth: Optional[int] = None,
+                                    subtree_root: Optional[str] = None, page_number: int = 1,
+                                    page_size: Optional[int] = None) -> MevzuatArticleTreePage:
+        """
+        A slice of the article tree: the nodes under `subtree_root` (whole tree if None), at most `max_depth`
+        levels deep, paged over document order (`page_size` None = everything on one page).
+        Raises ValueError for a subtree_root that is not in the tree.
+        """
+        tree = await self.get_compact_tree(mevzuat_id)
+        page = {"mevzuat_id": mevzuat_id, "subtree_root": subtree_root, "max_depth": max_depth,
+                "page_number": page_number, "page_size": page_size}
+        if tree is None:
+            return MevzuatArticleTreePage(**page, nodes=[], total_nodes=0, total_pages=0, error_message="Failed to retrieve article tree.")
+        try:
+            selected = tree.select(subtree_root, max_depth)
+        except KeyError:
+            raise ValueError(f"Node {subtree_root} is not in the article tree of {mevzuat_id}")
+        total_nodes = len(selected)
+        if page_size:
+            total_pages = (total_nodes + page_size - 1) // page_size
+            selected = selected[(page_number - 1) * page_size:page_number * page_size]
+        else:
+            total_pages = 1 if selected else 0
+        return MevzuatArticleTreePage(**page, nodes=tree.to_models(selected), total_nodes=total_nodes, total_pages=total_pages)
+
+    async def resolve_mevzuat_id(self, mevzuat_no_or_id: str, mevzuat_tur: str = "KANUN") -> str:
+        """
+        Maps a legislation number (e.g. "5237") of type `mevzuat_tur` to its mevzuat_id. Values that are
+        already known tree ids, or that match no legislation number, are returned unchanged as ids.
+        """
+        value = str(mevzuat_no_or_id).strip()
+        if self._tree_cache.peek_stale(value) is not None:
+            return value
+        result = await self.search_documents(MevzuatSearchRequest(mevzuat_no=value, mevzuat_tur_list=[mevzuat_tur], page_size=5))
+        for document in result.documents:
+            if str(document.mevzuat_no) == value:
+                return document.mevzuat_id
+        return value
+
+    @instrumented("get_article_by_number")
+    async def get_article_by_number(self, mevzuat_no_or_id: str, madde_no: str, mevzuat_tur: str = "KANUN") -> MevzuatArticleContent:
+        """
+        Resolves "article `madde_no` of legislation `mevzuat_no_or_id`" through the article-number index of
+        the cached tree and returns its content. Problems are reported via error_message.
+        """
+        key = article_key(madde_no)
+        mevzuat_id = await self.resolve_mevzuat_id(mevzuat_no_or_id, mevzuat_tur)
+        def failure(message: str) -> MevzuatArticleContent:
+            return MevzuatArticleContent(madde_id="", mevzuat_id=mevzuat_id, markdown_content="", error_message=message)
+        if key is None:
+            return failure(f"'{madde_no}' is not an article number (expected e.g. 81, 81/A, 'geçici 1', 'ek 3').")
+        tree = await self.get_compact_tree(mevzuat_id)
+        if tree is None:
+            return failure("Failed to retrieve article tree.")
+        if not tree:
+            return failure(f"Legislation {mevzuat_id} has no article tree; use its mevzuat_id as madde_id to get the full document.")
+        index = tree.article_index().get(key)
+        if index is None:
+            return failure(f"Article '{key}' was not found in legislation {mevzuat_id}.")
+        return await self.get_article_content(tree.ids[index], mevzuat_id)
+
+    async def _fetch_content_payload(self, doc_id: str, document_type: str) -> Tuple[str, Optional[str]]:
+        """Fetches the base64 content of an article or document. Returns (content, error_message)."""
+        payload = {"data": {"id": doc_id, "documentType": document_type}, "applicationName": "UyapMevzuat"}
+        data = await self._post("getDocumentContent", payload)
+        if data.get("metadata", {}).get("FMTY") != "SUCCESS":
+            default_error = "Failed to retrieve content." if document_type == "MADDE" else "Failed to retrieve full document content."
+            return "", data.get("metadata", {}).get("FMTE", default_error)
+        return data.get("data", {}).get("content", ""), None
+
+    async def _read_content(self, response: httpx.Response) -> StreamedContent:
+        return await read_content_stream(
+            response.aiter_bytes(self._stream_chunk_size), max_memory=self._stream_spool_bytes, directory=self._stream_spool_dir
+        )
 
+    async def _fetch_content_stream(self, doc_id: str, document_type: str) -> Tuple[Optional[StreamedContent], Optional[str]]:
+        """
+        _fetch_content_payload for large payloads: the response body is decoded as it arrives, so neither
+        the JSON text nor the base64 string is ever held whole. The caller closes the returned content.
+        """
+        payload = {"data": {"id": doc_id, "documentType": document_type}, "applicationName": "UyapMevzuat"}
+        content: StreamedContent = await self._post("getDocumentContent", payload, reader=self._read_content)
+        if content.metadata.get("FMTY") != "SUCCESS":
+            content.close()
+            default_error = "Failed to retrieve content." if document_type == "MADDE" else "Failed to retrieve full document content."
+            return None, content.metadata.get("FMTE", default_error)
+        return content, None
+
+    async def _fetch_content(self, doc_id: str, document_type: str) -> Tuple[Optional[ContentPayload], Optional[str]]:
+        """Full documents are streamed (unless disabled); articles are small enough to buffer."""
+        if self._stream_documents and document_type == "MEVZUAT":
+            return await self._fetch_content_stream(doc_id, document_type)
+        return await self._fetch_content_payload(doc_id, document_type)
+
+    async def download_content(self, doc_id: str, document_type: str) -> Tuple[str, str, Optional[str]]:
+        """
+        Fetches and converts content straight from upstream, bypassing the store.
+        Returns (markdown, source_hash, error_message); source_hash identifies the raw upstream payload.
+        A PDF that could not be extracted is reported as an error, so callers neither store nor index it.
+        """
+        content, error_message = await self._fetch_content(doc_id, document_type)
+        if error_message:
+            return "", "", error_message
+        try:
+            markdown_content = await self._markdown_from_payload(content, doc_id)
+        finally:
+            _release(content)
+        if is_unextracted_pdf_message(markdown_content):
+            return "", "", markdown_content
+        return markdown_content, _payload_hash(content), None
+
+    async def _get_content(self, doc_id: str, mevzuat_id: str, document_type: str) -> MevzuatArticleContent:
+        """Serves content from the persistent store when available, otherwise fetches and converts it."""
+        if self._content_store is not None:
+            key = self._content_store.make_key(document_type, doc_id)
+            stored = await asyncio.to_thread(self._content_store.get, key)
+            # Placeholders stored by earlier versions are treated as misses, so the PDF is extracted again.
+            if stored is not None and not is_unextracted_pdf_message(stored.markdown):
+                if self._content_store.is_stale(stored):
+                    self._schedule_revalidation(key, doc_id, document_type, stored.source_hash)
+                return MevzuatArticleContent(madde_id=doc_id, mevzuat_id=mevzuat_id, markdown_content=stored.markdown)
+        markdown_content, source_hash, error_message = await self.download_content(doc_id, document_type)
+        if error_message:
+            return MevzuatArticleContent(madde_id=doc_id, mevzuat_id=mevzuat_id, markdown_content="", error_message=error_message)
+        if self._content_store is not None:
+            await asyncio.to_thread(self._content_store.put, key, source_hash, markdown_content)
+        if self.local_index is not None:
+            self._run_in_background(self.local_index.add_article, mevzuat_id, doc_id, markdown_content)
+        return MevzuatArticleContent(madde_id=doc_id, mevzuat_id=mevzuat_id, markdown_content=markdown_content)
+
+    def start_conversion_workers(self) -> None:
+        """Starts the conversion worker processes up front; see ConversionPool.start."""
+        self._conversion_pool.start()
+
+    def prewarm(self, delay: float = 0.0) -> None:
+        """
+        Loads the content converters in the background, after `delay` seconds, instead of on the first
+        content request. Only the first call has an effect.
+        """
+        if self._prewarm_task is not None:
+            return
+        async def run():
+            await asyncio.sleep(delay)
+            started_at = time.perf_counter()
+            try:
+                await self._conversion_pool.prewarm()
+                logger.info(f"Content converters pre-warmed in {time.perf_counter() - started_at:.2f}s")
+            except Exception:
+                logger.exception("Pre-warming the content converters failed")
+        self._prewarm_task = asyncio.create_task(run())
+        self._background_tasks.add(self._prewarm_task)
+        self._prewarm_task.add_done_callback(self._background_tasks.discard)
+
+    def _run_in_background(self, fn, *args) -> None:
+        """Runs a blocking side task (e.g. index writes) in a thread without delaying the caller."""
+        async def run():
+            try:
+                await asyncio.to_thread(fn, *args)
+            except Exception:
+                logger.exception(f"Background task {getattr(fn, '__qualname__', fn)} failed")
+        task = asyncio.create_task(run())
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    def _schedule_revalidation(self, key: str, doc_id: str, document_type: str, source_hash: str) -> None:
+        if key in self._revalidating:
+            return
+        task = asyncio.create_task(self._revalidate(key, doc_id, document_type, source_hash))
+        self._revalidating[key] = task
+        task.add_done_callback(lambda _t: self._revalidating.pop(key, None))
+
+    async def _revalidate(self, key: str, doc_id: str, document_type: str, source_hash: str) -> None:
+        """Stale-while-revalidate refresh; conversion is skipped when the upstream payload is unchanged."""
+        content = None
+        try:
+            content, error_message = await self._fetch_content(doc_id, document_type)
+            if error_message:
+                logger.info(f"Revalidation of {key} failed, keeping stale entry: {error_message}")
+                return
+            new_hash = _payload_hash(content)
+            if new_hash == source_hash:
+                await asyncio.to_thread(self._content_store.touch, key)
+                return
+            markdown_content = await self._markdown_from_payload(content, doc_id)
+            if is_unextracted_pdf_message(markdown_content):
+                logger.info(f"Revalidation of {key} could not extract the PDF, keeping stale entry")
+                return
+            await asyncio.to_thread(self._content_store.put, key, new_hash, markdown_content)
+            logger.info(f"Content of {key} changed upstream, store updated")
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception(f"Background revalidation of {key} failed")
+        finally:
+            _release(content)
+
+    @instrumented("get_article_content")
     async def get_article_content(self, madde_id: str, mevzuat_id: str) -> MevzuatArticleContent:
-        payload = {"data": {"id": madde_id, "documentType": "MADDE"}, "applicationName": "UyapMevzuat"}
         try:
-            response = await self._http_client.post(f"{self.BASE_URL}/getDocumentContent", json=payload)
-            response.raise_for_status()
-            data = response.json()
-            if data.get("metadata", {}).get("FMTY") != "SUCCESS":
-                return MevzuatArticleContent(madde_id=madde_id, mevzuat_id=mevzuat_id, markdown_content="", error_message=data.get("metadata", {}).get("FMTE", "Failed to retrieve content."))
-            content_data = data.get("data", {})
-            b64_content = content_data.get("content", "")
-            html_content = self._html_from_base64(b64_content)
-            markdown_content = self._markdown_from_html(html_content)
-            return MevzuatArticleContent(madde_id=madde_id, mevzuat_id=mevzuat_id, markdown_content=markdown_content)
+            return await self._get_content(madde_id, mevzuat_id, "MADDE")
         except Exception as e:
             logger.exception(f"Error fetching content for maddeId {madde_id}")
             return MevzuatArticleContent(madde_id=madde_id, mevzuat_id=mevzuat_id, markdown_content="", error_message=f"An unexpected error occurred: {e}")
-    
-    async def get_full_document_content(self, mevzuat_id: str) -> MevzuatArticleContent:
-        """Retrieves the full content of a legislation document as a single unit."""
-        payload = {"data": {"id": mevzuat_id, "documentType": "MEVZUAT"}, "applicationName": "UyapMevzuat"}
-        try:
-            response = await self._http_client.post(f"{self.BASE_URL}/getDocumentContent", json=payload)
-            response.raise_for_status()
-            data = response.json()
-            if data.get("metadata", {}).get("FMTY") != "SUCCESS":
+
+    @instrumented("get_full_document_content")
+    async def get_full_document_content(self, mevzuat_id: str, page_range: Optional[str] = None) -> MevzuatArticleContent:
+        """
+        Retrieves the full content of a legislation document as a single unit. For PDF documents,
+        `page_range` (1-based, e.g. "1-3,7") limits extraction to those pages; see iter_document_pages.
+        """
+        if page_range:
+            try:
+                parts, pages, page_count = [], [], None
+                async for page, page_count, text in self.iter_document_pages(mevzuat_id, page_range):
+                    parts.append(f"--- Page {page} / {page_count} ---\n\n{text}".rstrip())
+                    pages.append(page)
                 return MevzuatArticleContent(
-                    madde_id=mevzuat_id, mevzuat_id=mevzuat_id,
-                    markdown_content="", 
-                    error_message=data.get("metadata", {}).get("FMTE", "Failed to retrieve full document content.")
+                    madde_id=mevzuat_id, mevzuat_id=mevzuat_id, markdown_content="\n\n".join(parts),
+                    page_count=page_count, pages=pages
                 )
-            
-            content_data = data.get("data", {})
-            b64_content = content_data.get("content", "")
-            
-            # Handle PDF content - try to extract if it's a PDF
-            if b64_content.startswith("JVBERi0"):  # PDF header in base64
-                try:
-                    import base64
-                    pdf_bytes = base64.b64decode(b64_content)
-                    # Use markitdown to convert PDF to markdown
-                    from markitdown import MarkItDown
-                    md = MarkItDown()
-                    result = md.convert_stream(pdf_bytes, file_extension=".pdf")
-                    markdown_content = result.text_content
-                except Exception as pdf_error:
-                    logger.warning(f"PDF extraction failed for {mevzuat_id}: {pdf_error}")
-                    markdown_content = f"PDF content available but could not be extracted. Content length: {len(b64_content)} characters."
-            else:
-                # Handle HTML content
-                html_content = self._html_from_base64(b64_content)
-                markdown_content = self._markdown_from_html(html_content)
-            
-            return MevzuatArticleContent(
-                madde_id=mevzuat_id, mevzuat_id=mevzuat_id,
-                markdown_content=markdown_content
-            )
+            except ValueError as e:
+                return MevzuatArticleContent(madde_id=mevzuat_id, mevzuat_id=mevzuat_id, markdown_content="", error_message=str(e))
+            except Exception as e:
+                logger.exception(f"Error extracting pages {page_range} of mevzuatId {mevzuat_id}")
+                return MevzuatArticleContent(madde_id=mevzuat_id, mevzuat_id=mevzuat_id, markdown_content="", error_message=f"An unexpected error occurred: {e}")
+        try:
+            return await self._get_content(mevzuat_id, mevzuat_id, "MEVZUAT")
         except Exception as e:
             logger.exception(f"Error fetching full document content for mevzuatId {mevzuat_id}")
             return MevzuatArticleContent(
                 madde_id=mevzuat_id, mevzuat_id=mevzuat_id,
                 markdown_content="", 
                 error_message=f"An unexpected error occurred: {str(e)}"
-            )
\ No newline at end of file
+            )
+
+
+    async def get_article_contents(self, mevzuat_id: str, madde_ids: List[str], concurrency: int = 8) -> List[MevzuatArticleContent]:
+        """
+        Fetches several articles concurrently (at most `concurrency` at a time), preserving the caller's order.
+        Failures are reported per item via error_message; duplicate ids are fetched once.
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        async def fetch(madde_id: str) -> MevzuatArticleContent:
+            async with semaphore:
+                if madde_id == mevzuat_id:
+                    return await self.get_full_document_content(mevzuat_id)
+                return await self.get_article_content(madde_id, mevzuat_id)
+        unique_ids = list(dict.fromkeys(madde_ids))
+        results = await asyncio.gather(*(fetch(madde_id) for madde_id in unique_ids))
+        by_id = dict(zip(unique_ids, results))
+        return [by_id[madde_id] for madde_id in madde_ids]
+
+
+    @staticmethod
+    def _decode_pdf(content: ContentPayload, spooled: bool = False) -> PdfDocument:
+        """
+        The PDF of a payload. With `spooled`, a streamed payload is used in place (its file path, valid
+        until the content is closed) instead of being read into memory.
+        """
+        if isinstance(content, StreamedContent):
+            data = content.source if spooled else content.read()
+        else:
+            data = base64.b64decode(content)
+        return PdfDocument(source_hash=_payload_hash(content), data=data, page_count=pdf_page_count(data))
+
+    async def _fetch_pdf(self, mevzuat_id: str) -> Tuple[Optional[PdfDocument], Optional[str]]:
+        content, error_message = await self._fetch_content(mevzuat_id, "MEVZUAT")
+        if error_message:
+            return None, error_message
+        try:
+            if not _is_pdf_payload(content):
+                return None, f"Document {mevzuat_id} is not a PDF; page_range only applies to PDF documents. Request it without page_range."
+            return await asyncio.to_thread(self._decode_pdf, content), None
+        except Exception as e:
+            logger.warning(f"Could not open the PDF of {mevzuat_id}: {e}")
+            return None, f"The PDF of {mevzuat_id} could not be read: {e}"
+        finally:
+            _release(content)
+
+    async def _load_pdf(self, mevzuat_id: str) -> PdfDocument:
+        """The decoded full-document PDF, kept in a small cache so follow-up page ranges skip the download."""
+        pdf = self._pdf_cache.get(mevzuat_id)
+        if pdf is None:
+            pdf, error_message = await self._pdf_flight.do(mevzuat_id, lambda: self._fetch_pdf(mevzuat_id))
+            if pdf is None:
+                raise ValueError(error_message)
+            self._pdf_cache.set(mevzuat_id, pdf)
+        return pdf
+
+    async def _convert_pdf_pages(self, pdf: PdfDocument, pages: List[int]) -> Dict[int, str]:
+        started_at = time.perf_counter()
+        try:
+            texts = await self._conversion_pool.run(markdown_from_pdf_pages, pdf.data, pages)
+        finally:
+            CONVERSION_SECONDS.labels(kind="pdf_pages").observe(time.perf_counter() - started_at)
+        converted = dict(zip(pages, texts))
+        for page, text in converted.items():
+            self._pdf_page_cache.set((pdf.source_hash, page), text)
+        return converted
+
+    async def _pdf_pages(self, pdf: PdfDocument, pages: Sequence[int]) -> AsyncIterator[Tuple[int, str]]:
+        """
+        Yields (0-based page, text) in the given order. Cached pages are served as is; the rest are split
+        into contiguous chunks that the conversion pool converts in parallel, and each page is yielded
+        as soon as its chunk is done.
+        """
+        cached: Dict[int, str] = {}
+        for page in pages:
+            text = self._pdf_page_cache.get((pdf.source_hash, page))
+            if text is not None:
+                cached[page] = text
+        missing = [page for page in pages if page not in cached]
+        pending: Dict[int, asyncio.Future] = {}
+        for chunk in page_chunks(missing, self._conversion_pool.max_workers) if missing else []:
+            task = asyncio.ensure_future(self._convert_pdf_pages(pdf, chunk))
+            pending.update(dict.fromkeys(chunk, task))
+        try:
+            for page in pages:
+                yield page, cached[page] if page in cached else (await pending[page])[page]
+        finally:
+            for task in set(pending.values()):
+                task.cancel()
+
+    async def iter_document_pages(self, mevzuat_id: str, page_range: Optional[str] = None) -> AsyncIterator[Tuple[int, int, str]]:
+        """
+        Yields (1-based page, page count, text) for the pages of a PDF document selected by `page_range`
+        (e.g. "3", "1-5", "10-", "1-3,7"; all pages when None), in order. Only the selected pages are
+        parsed and converted, and extracted pages are cached per upstream payload. Raises ValueError when
+        the document cannot be fetched, is not a PDF, or the range is invalid.
+        """
+        if not pdf_pages_supported():
+            raise ValueError("PDF page extraction requires the pdfminer.six package.")
+        pdf = await self._load_pdf(mevzuat_id)
+        pages = parse_page_range(page_range, pdf.page_count) if page_range else list(range(pdf.page_count))
+        async for page, text in self._pdf_pages(pdf, pages):
+            yield page + 1, pdf.page_count, text
+
+    async def iter_document_sections(self, mevzuat_id: str, concurrency: int = 8, read_ahead: int = 32) -> AsyncIterator[MevzuatDocumentSection]:
+        """
+        Assembles a legislation from its article tree as an alternative to the single MEVZUAT payload.
+        Leaf articles are fetched concurrently, but sections are yielded strictly in document order as soon as
+        every preceding section is done. At most `read_ahead` sections are buffered, which bounds memory.
+        Falls back to the full document content when the legislation has no tree.
+        """
+        tree = await self.get_compact_tree(mevzuat_id)
+        if not tree:
+            content = await self.get_full_document_content(mevzuat_id)
+            yield MevzuatDocumentSection(
+                mevzuat_id=mevzuat_id, madde_id=mevzuat_id,
+                markdown_content=content.markdown_content, error_message=content.error_message
+            )
+            return
+
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        async def build(node: TreeNode) -> MevzuatDocumentSection:
+            section = MevzuatDocumentSection(
+                mevzuat_id=mevzuat_id, madde_id=node.madde_id, madde_no=node.madde_no,
+                title=node.title, depth=node.depth, is_article=node.is_leaf
+            )
+            if not node.is_leaf:
+                return section
+            async with semaphore:
+                content = await self.get_article_content(node.madde_id, mevzuat_id)
+            section.markdown_content = content.markdown_content
+            section.error_message = content.error_message
+            return section
+
+        window: "deque[asyncio.Task]" = deque()
+        try:
+            for node in tree:
+                window.append(asyncio.create_task(build(node)))
+                if len(window) >= max(1, read_ahead):
+                    yield await window.popleft()
+            while window:
+                yield await window.popleft()
+        finally:
+            # Consumer stopped early (client disconnected, generator closed): drop outstanding fetches.
+            for task in window:
+                task.cancel()
@@ -0,0 +1,335 @@
+# mevzuat_convert.py
+"""
+HTML/PDF → Markdown conversion for bedesten payloads.
+Conversion functions are module-level so they can run inside a ProcessPoolExecutor;
+ConversionPool keeps that CPU-bound work off the event loop.
+
+Bedesten's Word-exported HTML is converted by mevzuat_html's lxml fast path straight from the
+decoded bytes; markup it does not recognize goes through MarkItDown. MEVZUAT_FAST_HTML=0 disables
+the fast path.
+
+markitdown and bs4/lxml are imported on the first conversion, not at import time, so starting a
+server does not pay for them; prewarm_converters() loads them ahead of time.
+
+PDFs are extracted page by page with pdfminer.six (the library markitdown uses for PDFs):
+markdown_from_pdf_pages() only interprets and lays out the requested pages, so callers can split
+a document into page chunks across pool workers or convert just a page range.
+
+markdown_from_content() takes a decoded payload as bytes or as the path of a file holding it (a
+download spooled to disk by mevzuat_stream); PDFs are then read from the file by pdfminer, and
+HTML is fed to the fast path's parser in chunks.
+"""
+
+import asyncio
+import base64
+import functools
+import io
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, BinaryIO, Callable, Dict, List, Optional, Sequence, Union
+
+from mevzuat_html import markdown_from_bedesten_html, markdown_from_bedesten_html_file
+
+if TYPE_CHECKING:
+    from markitdown import MarkItDown
+
+logger = logging.getLogger(__name__)
+
+PDF_BASE64_PREFIX = "JVBERi0"  # "%PDF-" encoded as base64
+PDF_MAGIC = b"%PDF-"
+FAST_HTML = os.environ.get("MEVZUAT_FAST_HTML", "1") != "0"
+MIN_PDF_PAGES_PER_TASK = 4    # smaller chunks cost more in re-parsing the document than they gain in parallelism
+
+_md_converter: Optional["MarkItDown"] = None
+_md_converter_lock = threading.Lock()
+
+def get_md_converter() -> "MarkItDown":
+    """Returns the per-process MarkItDown instance, importing and building it on first use."""
+    global _md_converter
+    if _md_converter is None:
+        with _md_converter_lock:
+            if _md_converter is None:
+                from markitdown import MarkItDown
+                _md_converter = MarkItDown()
+    return _md_converter
+
+def prewarm_converters() -> float:
+    """Imports and builds the converters now rather than on the first content request. Returns the seconds spent."""
+    started_at = time.perf_counter()
+    get_md_converter()
+    import bs4, lxml.etree, lxml.html  # noqa: F401 - used by the HTML fast path and fallback
+    if pdf_pages_supported():
+        import pdfminer.converter, pdfminer.pdfinterp, pdfminer.pdfpage  # noqa: F401
+    return time.perf_counter() - started_at
+
+def html_from_base64(b64_string: str) -> str:
+    try:
+        decoded_bytes = base64.b64decode(b64_string)
+        return decoded_bytes.decode('utf-8')
+    except Exception: return ""
+
+def markdown_from_html(html_content: str, md_converter: Optional["MarkItDown"] = None) -> str:
+    if not html_content: return ""
+    try:
+        html_bytes = html_content.encode('utf-8')
+        html_io = io.BytesIO(html_bytes)
+        conv_res = (md_converter or get_md_converter()).convert(html_io)
+        if conv_res and conv_res.text_content:
+            return conv_res.text_content.strip()
+        return ""
+    except Exception:
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(html_content, 'lxml')
+        return soup.get_text(separator='\n', strip=True)
+
+# Decoded payload bytes, or the path of a file holding them.
+PayloadSource = Union[bytes, str]
+
+@dataclass
+class PdfDocument:
+    """A decoded PDF payload; source_hash identifies the upstream payload (and so the cached pages)."""
+    source_hash: str
+    data: PayloadSource
+    page_count: int
+
+_UNEXTRACTED_PDF = "PDF content available but could not be extracted."
+
+def unextracted_pdf_message(b64_length: int) -> str:
+    return f"{_UNEXTRACTED_PDF} Content length: {b64_length} characters."
+
+def is_unextracted_pdf_message(markdown: str) -> bool:
+    """True for the placeholder returned instead of Markdown when PDF extraction failed; it must not be cached."""
+    return markdown.startswith(_UNEXTRACTED_PDF)
+
+def _open_source(source: PayloadSource) -> BinaryIO:
+    return io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else open(source, "rb")
+
+@functools.lru_cache(maxsize=None)
+def pdf_pages_supported() -> bool:
+    try:
+        import pdfminer  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def _open_pdf(fp: BinaryIO):
+    from pdfminer.pdfdocument import PDFDocument
+    from pdfminer.pdfparser import PDFParser
+    return PDFDocument(PDFParser(fp))
+
+def pdf_page_count(pdf: PayloadSource) -> int:
+    """Reads the page count from the page tree root without parsing any page content."""
+    from pdfminer.pdftypes import resolve1
+    from pdfminer.pdfpage import PDFPage
+    with _open_source(pdf) as fp:
+        document = _open_pdf(fp)
+        count = resolve1(resolve1(document.catalog.get("Pages")) or {}).get("Count")
+        if isinstance(count, int) and count >= 0:
+            return count
+        return sum(1 for _ in PDFPage.create_pages(document))
+
+def markdown_from_pdf_pages(pdf: PayloadSource, pages: Sequence[int]) -> List[str]:
+    """
+    Extracts the text of the given 0-based pages, in the order given. Pages after the last requested
+    one are never read, and skipped pages are not interpreted.
+    """
+    from pdfminer.converter import TextConverter
+    from pdfminer.layout import LAParams
+    from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+    from pdfminer.pdfpage import PDFPage
+
+    wanted = set(pages)
+    texts: Dict[int, str] = {}
+    output = io.StringIO()
+    resources = PDFResourceManager(caching=True)
+    device = TextConverter(resources, output, laparams=LAParams())
+    interpreter = PDFPageInterpreter(resources, device)
+    try:
+        with _open_source(pdf) as fp:
+            for number, page in enumerate(PDFPage.create_pages(_open_pdf(fp))):
+                if number in wanted:
+                    interpreter.process_page(page)
+                    texts[number] = output.getvalue().replace("\f", "").strip()
+                    output.seek(0)
+                    output.truncate()
+                    if len(texts) == len(wanted):
+                        break
+    finally:
+        device.close()
+    return [texts.get(number, "") for number in pages]
+
+def parse_page_range(page_range: str, page_count: int) -> List[int]:
+    """
+    Parses a 1-based page selection such as "3", "1-5", "10-" or "1-3,7,12-14" into sorted 0-based
+    page numbers. Raises ValueError for malformed ranges or pages beyond `page_count`.
+    """
+    selected = set()
+    for part in page_range.replace(" ", "").split(","):
+        if not part:
+            continue
+        start, dash, end = part.partition("-")
+        if not start.isdigit() or (end and not end.isdigit()):
+            raise ValueError(f"Invalid page range '{page_range}'; use e.g. '3', '1-5', '10-' or '1-3,7'.")
+        first = int(start)
+        last = (int(end) if end else page_count) if dash else first
+        if first < 1 or last < first:
+            raise ValueError(f"Invalid page range '{part}'.")
+        if first > page_count:
+            raise ValueError(f"Page {first} is out of range; the document has {page_count} pages.")
+        selected.update(range(first - 1, min(last, page_count)))
+    if not selected:
+        raise ValueError(f"Invalid page range '{page_range}'.")
+    return sorted(selected)
+
+def page_chunks(pages: Sequence[int], workers: int) -> List[List[int]]:
+    """Splits pages into at most `workers` contiguous chunks of at least MIN_PDF_PAGES_PER_TASK pages."""
+    count = max(1, min(workers, len(pages) // MIN_PDF_PAGES_PER_TASK))
+    size = -(-len(pages) // count)
+    return [list(pages[i:i + size]) for i in range(0, len(pages), size)]
+
+def markdown_from_pdf(pdf: PayloadSource) -> str:
+    if pdf_pages_supported():
+        texts = markdown_from_pdf_pages(pdf, range(pdf_page_count(pdf)))
+        return "\n\n".join(text for text in texts if text)
+    with _open_source(pdf) as fp:
+        result = get_md_converter().convert_stream(fp, file_extension=".pdf")
+    return result.text_content
+
+def markdown_from_payload(b64_content: str, doc_id: str) -> str:
+    """Converts a base64 getDocumentContent payload (HTML or PDF) to Markdown."""
+    try:
+        data = base64.b64decode(b64_content)
+    except Exception:
+        return unextracted_pdf_message(len(b64_content)) if b64_content.startswith(PDF_BASE64_PREFIX) else ""
+    return markdown_from_content(data, doc_id, len(b64_content))
+
+def markdown_from_content(source: PayloadSource, doc_id: str, b64_length: int) -> str:
+    """
+    Converts a decoded getDocumentContent payload (HTML or PDF), given as bytes or as a file path, to
+    Markdown. b64_length, the size of the base64 text it came from, is reported for unextractable PDFs.
+    """
+    in_memory = isinstance(source, (bytes, bytearray))
+    with _open_source(source) as fp:
+        is_pdf = fp.read(len(PDF_MAGIC)) == PDF_MAGIC
+    # Handle PDF content - try to extract if it's a PDF
+    if is_pdf:
+        try:
+            return markdown_from_pdf(source)
+        except Exception as pdf_error:
+            logger.warning(f"PDF extraction failed for {doc_id}: {pdf_error}")
+            return unextracted_pdf_message(b64_length)
+    # Handle HTML content
+    if FAST_HTML:
+        markdown = markdown_from_bedesten_html(source) if in_memory else markdown_from_bedesten_html_file(source)
+        if markdown is not None:
+            return markdown
+    try:
+        if in_memory:
+            return markdown_from_html(source.decode('utf-8'))
+        with open(source, "rb") as f:
+            return markdown_from_html(f.read().decode('utf-8'))
+    except UnicodeDecodeError:
+        return ""
+
+class ConversionPool:
+    """
+    Runs conversion callables in a process or thread pool behind a concurrency limit.
+    Tracks queue depth (calls waiting for a slot), active conversions and timings.
+    """
+
+    def __init__(self, kind: str = "process", max_workers: Optional[int] = None, max_concurrency: Optional[int] = None):
+        if kind not in ("process", "thread"):
+            raise ValueError(f"Unknown conversion pool kind: {kind}")
+        self.kind = kind
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.max_concurrency = max_concurrency or self.max_workers
+        self._executor: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.queued = 0
+        self.active = 0
+        self.completed = 0
+        self.failed = 0
+        self.max_queue_depth = 0
+        self.total_wait_seconds = 0.0
+        self.total_run_seconds = 0.0
+
+    @classmethod
+    def from_env(cls) -> "ConversionPool":
+        workers = os.environ.get("MEVZUAT_CONVERT_WORKERS")
+        concurrency = os.environ.get("MEVZUAT_CONVERT_CONCURRENCY")
+        return cls(
+            kind=os.environ.get("MEVZUAT_CONVERT_EXECUTOR", "process"),
+            max_workers=int(workers) if workers else None,
+            max_concurrency=int(concurrency) if concurrency else None,
+        )
+
+    def _get_executor(self) -> Executor:
+        # Created lazily so that importing the client never spawns worker processes.
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="mevzuat-convert")
+        return self._executor
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        enqueued_at = time.perf_counter()
+        self.queued += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queued)
+        acquired = False
+        try:
+            async with self._semaphore:
+                acquired = True
+                self.queued -= 1
+                started_at = time.perf_counter()
+                self.total_wait_seconds += started_at - enqueued_at
+                self.active += 1
+                try:
+                    loop = asyncio.get_running_loop()
+                    return await loop.run_in_executor(self._get_executor(), fn, *args)
+                except Exception:
+                    self.failed += 1
+                    raise
+                finally:
+                    self.active -= 1
+                    self.completed += 1
+                    self.total_run_seconds += time.perf_counter() - started_at
+        finally:
+            if not acquired:
+                self.queued -= 1
+
+    def start(self) -> None:
+        """
+        Forks the worker processes now (a fork-based pool starts all of them on the first submit).
+        The stdio server must call this before its transport starts reading stdin: a worker forked
+        while another thread is blocked reading stdin hangs when multiprocessing closes stdin in the child.
+        """
+        if self.kind == "process" and self._executor is None:
+            self._get_executor().submit(int).result()
+
+    async def prewarm(self) -> None:
+        """Loads the converters in the workers (one task per worker for a process pool; threads share this process)."""
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        workers = self.max_workers if self.kind == "process" else 1
+        await asyncio.gather(*(loop.run_in_executor(executor, prewarm_converters) for _ in range(workers)))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind, "max_workers": self.max_workers, "max_concurrency": self.max_concurrency,
+            "queue_depth": self.queued, "max_queue_depth": self.max_queue_depth, "active": self.active,
+            "completed": self.completed, "failed": self.failed,
+            "avg_wait_ms": round(1000 * self.total_wait_seconds / self.completed, 2) if self.completed else 0.0,
+            "avg_run_ms": round(1000 * self.total_run_seconds / self.completed, 2) if self.completed else 0.0,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
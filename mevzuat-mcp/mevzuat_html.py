@@ -0,0 +1,254 @@
+# mevzuat_html.py
+"""
+Fast HTML → Markdown conversion for bedesten content.
+
+Bedesten serves articles and documents as Word-exported HTML: a body of MsoNormal paragraphs made
+of span/b/i/u runs, line breaks and empty <o:p> markers. markdown_from_bedesten_html() parses the
+decoded bytes with lxml and renders that markup in a single walk over the tree, applying the same
+whitespace, escaping and block rules as MarkItDown (markdownify over BeautifulSoup), so its output
+matches markdown_from_html() for the markup it accepts. For anything else (tables, lists, links,
+headings, images, downlevel-revealed conditionals, processing instructions, misnested tags that
+the two parsers repair differently, bytes that are not valid UTF-8) it returns None and the caller
+falls back to MarkItDown.
+markdown_from_bedesten_html_file() does the same for a document spooled to disk: the file is fed
+to a pull parser in chunks and every paragraph is rendered as soon as it is complete, so the tree
+holds rendered text instead of the document's markup.
+"""
+
+import codecs
+import re
+import threading
+from typing import Any, Callable, Dict, FrozenSet, List, Optional
+
+# markdownify's text normalization and newline collapsing
+_NEWLINE_WHITESPACE_RE = re.compile(r"[\t \r\n]*[\r\n][\t \r\n]*")
+_WHITESPACE_RE = re.compile(r"[\t ]+")
+_EXTRACT_NEWLINES_RE = re.compile(r"^(\n*)((?:.*[^\n])?)(\n*)$", flags=re.DOTALL)
+_LINE_SPLIT_RE = re.compile(r"\r?\n")
+_EXCESS_NEWLINES_RE = re.compile(r"\n{3,}")
+_BODY_END_RE = re.compile(rb"</body\s*>\s*(?:</html\s*>\s*)?\Z", re.IGNORECASE)
+# Processing instructions (<?xml:namespace ...>) and downlevel-revealed conditionals (<![if ...]>, <![endif]>);
+# "<![endif]-->" closes an ordinary conditional comment and is fine.
+_SPECIAL_MARKUP_RE = re.compile(rb"<\?|<!\[(?!endif\]--)")
+_SPECIAL_MARKUP_LOOKAHEAD = len(b"<![endif]--")
+_UTF8_CHECK_CHUNK = 1024 * 1024
+
+_BLOCK_TAGS: FrozenSet[str] = frozenset((
+    "p", "blockquote", "article", "div", "section", "ol", "ul", "li", "dl", "dt", "dd",
+    "table", "thead", "tbody", "tfoot", "tr", "td", "th", "h1", "h2", "h3", "h4", "h5", "h6",
+))
+# Tags rendered as their content.
+_PASSTHROUGH_TAGS: FrozenSet[str] = frozenset(("body", "span", "font", "center", "small", "big", "ins", "abbr", "a"))
+_DROPPED_TAGS: FrozenSet[str] = frozenset(("script", "style"))
+# Marks a paragraph already rendered by the file path; its text is the Markdown.
+_RENDERED_ATTRIBUTE = "data-mevzuat-markdown"
+
+class _Unsupported(Exception):
+    pass
+
+def _chomp(text: str):
+    prefix = " " if text and text[0] == " " else ""
+    suffix = " " if text and text[-1] == " " else ""
+    return prefix, suffix, text.strip()
+
+def _inline(marker: str) -> Callable[[str], str]:
+    def convert(text: str) -> str:
+        prefix, suffix, text = _chomp(text)
+        return f"{prefix}{marker}{text}{marker}{suffix}" if text else ""
+    return convert
+
+def _convert_p(text: str) -> str:
+    text = text.strip(" \t\r\n")
+    return f"\n\n{text}\n\n" if text else ""
+
+def _convert_div(text: str) -> str:
+    text = text.strip()
+    return f"\n\n{text}\n\n" if text else ""
+
+def _convert_u(text: str) -> str:
+    if not text.strip():
+        return text
+    prefix, suffix, text = _chomp(text)
+    return f"{prefix}<u>{text}</u>{suffix}" if text else ""
+
+def _convert_anchor(text: str) -> str:
+    # Only anchors without href are accepted; MarkItDown renders them as their chomped text.
+    return _chomp(text)[2]
+
+_CONVERTERS: Dict[str, Callable[[str], str]] = {
+    "p": _convert_p, "div": _convert_div,
+    "b": _inline("**"), "strong": _inline("**"), "i": _inline("*"), "em": _inline("*"),
+    "s": _inline("~~"), "del": _inline("~~"), "strike": _inline("~~"),
+    "sub": _inline(""), "sup": _inline(""), "u": _convert_u, "a": _convert_anchor,
+}
+
+def _is_block(node: Any) -> bool:
+    return node is not None and not isinstance(node, str) and node.tag in _BLOCK_TAGS
+
+def _children(element: Any, comment: Any) -> List[Any]:
+    """Child nodes in document order as BeautifulSoup sees them: text strings, elements and comments."""
+    nodes: List[Any] = [element.text] if element.text else []
+    for child in element:
+        if child.tag is comment or child.tag not in _DROPPED_TAGS:
+            nodes.append(child)
+        if child.tail:
+            nodes.append(child.tail)
+    return nodes
+
+def _render_text(text: str, previous: Any, following: Any, in_block: bool) -> str:
+    text = _WHITESPACE_RE.sub(" ", _NEWLINE_WHITESPACE_RE.sub("\n", text))
+    text = text.replace("*", r"\*").replace("_", r"\_")
+    if _is_block(previous) or (in_block and previous is None):
+        text = text.lstrip(" \t\r\n")
+    if _is_block(following) or (in_block and following is None):
+        text = text.rstrip()
+    return text
+
+def _render(element: Any, comment: Any) -> str:
+    tag = element.tag
+    if tag == "p" and element.get(_RENDERED_ATTRIBUTE) is not None:
+        return element.text or ""
+    if not isinstance(tag, str) or (tag not in _CONVERTERS and tag not in _PASSTHROUGH_TAGS and ":" not in tag and tag != "br"):
+        raise _Unsupported(tag)
+    if tag == "br":
+        return "  \n"
+    if tag == "a" and element.get("href") is not None:
+        raise _Unsupported("a[href]")
+    in_block = tag in _BLOCK_TAGS
+    nodes = _children(element, comment)
+    parts: List[str] = []
+    last = len(nodes) - 1
+    for i, node in enumerate(nodes):
+        previous = nodes[i - 1] if i > 0 else None
+        following = nodes[i + 1] if i < last else None
+        if isinstance(node, str):
+            if not node.strip() and ((in_block and (previous is None or following is None))
+                                     or _is_block(previous) or _is_block(following)):
+                continue
+            part = _render_text(node, previous, following, in_block)
+        elif node.tag is comment:
+            continue
+        else:
+            part = _render(node, comment)
+        if part:
+            parts.append(part)
+
+    # Collapse newlines where adjacent children meet, as markdownify does (at most two).
+    merged = [""]
+    for part in parts:
+        leading, content, trailing = _EXTRACT_NEWLINES_RE.match(part).groups()
+        if merged[-1] and leading:
+            leading = "\n" * min(2, max(len(merged.pop()), len(leading)))
+        merged.extend((leading, content, trailing))
+    text = "".join(merged)
+    convert = _CONVERTERS.get(tag)
+    return convert(text) if convert else text
+
+def markdown_from_bedesten_html(data: bytes) -> Optional[str]:
+    """
+    Converts UTF-8 bedesten HTML to Markdown straight from the decoded bytes. Returns None when the
+    markup is outside the recognized Word-export subset, so the caller can use MarkItDown instead.
+    """
+    if not data.strip():
+        return ""
+    # html.parser turns special markup into text and leaves content after </body> outside the body;
+    # lxml does neither, so such documents go to MarkItDown.
+    if _SPECIAL_MARKUP_RE.search(data) or not _BODY_END_RE.search(data[-64:]):
+        return None
+    if not _is_utf8(data):
+        return None
+    from lxml import etree, html
+    parser = _parser()
+    try:
+        document = html.document_fromstring(data, parser=parser)
+    except (etree.ParserError, ValueError):
+        return None
+    return _markdown_from_document(document, parser.error_log)
+
+def markdown_from_bedesten_html_file(path: str, chunk_size: int = 1024 * 1024) -> Optional[str]:
+    """
+    markdown_from_bedesten_html() for HTML stored in a file, which is fed to the parser `chunk_size`
+    bytes at a time instead of being read whole. Paragraphs are rendered and emptied as soon as the
+    parser closes them.
+    """
+    from lxml import etree
+    parser = etree.HTMLPullParser(events=("end",), tag="p", encoding="utf-8")
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    tail, empty = b"", True
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                window = tail + chunk   # the tail keeps markup split across chunks searchable
+                if _special_markup(window, final=False):
+                    return None
+                utf8.decode(chunk)      # raises UnicodeDecodeError (a ValueError) for invalid UTF-8
+                empty = empty and not chunk.strip()
+                parser.feed(chunk)
+                _render_closed(parser.read_events())
+                tail = window[-64:]
+        if empty:
+            return ""
+        if _special_markup(tail, final=True) or not _BODY_END_RE.search(tail):
+            return None
+        utf8.decode(b"", final=True)
+        document = parser.close()
+        _render_closed(parser.read_events())
+    except (etree.LxmlError, ValueError, _Unsupported, RecursionError):
+        return None
+    if document is None:
+        return None
+    return _markdown_from_document(document, parser.feed_error_log)
+
+def _render_closed(events: Any) -> None:
+    """Replaces each closed paragraph's content with its Markdown; rendering a subtree never depends on its siblings."""
+    from lxml import etree
+    for _, element in events:
+        tail = element.tail
+        markdown = _render(element, etree.Comment)
+        element.clear()
+        element.text, element.tail = markdown or None, tail
+        element.set(_RENDERED_ATTRIBUTE, "")
+
+def _is_utf8(data: bytes) -> bool:
+    # lxml would decode invalid bytes to U+FFFD; MarkItDown's caller gets a UnicodeDecodeError and returns "".
+    # Checked in slices so the decoded text is never held whole.
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    view = memoryview(data)
+    try:
+        for start in range(0, len(view), _UTF8_CHECK_CHUNK):
+            decoder.decode(view[start:start + _UTF8_CHECK_CHUNK])
+        decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+def _special_markup(window: bytes, final: bool) -> bool:
+    # A match too close to the end of a chunk may still turn out to be "<![endif]--"; the next window decides.
+    return any(final or len(window) - match.start() >= _SPECIAL_MARKUP_LOOKAHEAD
+               for match in _SPECIAL_MARKUP_RE.finditer(window))
+
+def _markdown_from_document(document: Any, error_log: Any) -> Optional[str]:
+    from lxml import etree
+    # libxml2 repairs misnested tags (e.g. <b><p>..</p></b>, nested anchors) differently from html.parser.
+    if any(error.type_name == "ERR_TAG_NAME_MISMATCH" for error in error_log):
+        return None
+    body = document.find("body")
+    if body is None:
+        return None
+    try:
+        markdown = _render(body, etree.Comment)
+    except (_Unsupported, RecursionError):
+        return None
+    # MarkItDown's normalization: strip, right-strip every line, at most one blank line in a row.
+    markdown = "\n".join(line.rstrip() for line in _LINE_SPLIT_RE.split(markdown.strip()))
+    return _EXCESS_NEWLINES_RE.sub("\n\n", markdown).strip()
+
+_local = threading.local()
+
+def _parser():
+    """lxml parsers are not thread-safe, so each conversion thread gets its own."""
+    parser = getattr(_local, "parser", None)
+    if parser is None:
+        from lxml import html
+        parser = _local.parser = html.HTMLParser(encoding="utf-8")
+    return parser
@@ -0,0 +1,141 @@
+# mevzuat_http.py
+"""
+HTTP connection pool construction and pool-level statistics for MevzuatApiClient.
+Statistics are gathered through httpx's per-request "trace" extension, so they cover
+connection acquisition, TCP connects and TLS handshakes without patching httpx internals.
+"""
+
+import logging
+import time
+from typing import Any, Dict, Mapping, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+def http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def resolve_http2(http2: Optional[bool]) -> bool:
+    """http2=None enables HTTP/2 when the optional 'h2' package is installed."""
+    if http2 is None:
+        return http2_available()
+    if http2 and not http2_available():
+        logger.warning("HTTP/2 requested but the 'h2' package is not installed; falling back to HTTP/1.1")
+        return False
+    return http2
+
+def build_http_client(
+    headers: Mapping[str, str],
+    connect_timeout: float = 5.0,
+    read_timeout: float = 30.0,
+    pool_timeout: float = 10.0,
+    max_connections: int = 100,
+    max_keepalive_connections: int = 20,
+    keepalive_expiry: float = 30.0,
+    http2: Optional[bool] = None,
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+) -> httpx.AsyncClient:
+    """Builds the shared AsyncClient with explicit pool limits and separate connect/read/pool timeouts."""
+    return httpx.AsyncClient(
+        headers=headers,
+        timeout=httpx.Timeout(read_timeout, connect=connect_timeout, pool=pool_timeout),
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        ),
+        http2=resolve_http2(http2),
+        follow_redirects=True,
+        transport=transport,
+    )
+
+class PoolMetrics:
+    """Aggregates per-request trace events into pool-level counters."""
+
+    def __init__(self, http_client: httpx.AsyncClient, http2: bool):
+        self._http_client = http_client
+        self.http2 = http2
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.tcp_connects = 0
+        self.tls_handshakes = 0
+        self.connect_failures = 0
+        self.total_acquire_seconds = 0.0
+        self.max_acquire_seconds = 0.0
+        self.total_connect_seconds = 0.0
+        self.total_tls_seconds = 0.0
+
+    def tracer(self) -> "_RequestTrace":
+        return _RequestTrace(self)
+
+    def request_started(self) -> None:
+        self.requests += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def request_finished(self) -> None:
+        self.in_flight -= 1
+
+    def _pool_connections(self) -> Dict[str, int]:
+        # httpcore does not expose a public API for this; degrade gracefully if internals change.
+        pool = getattr(getattr(self._http_client, "_transport", None), "_pool", None)
+        connections = getattr(pool, "connections", None)
+        if connections is None:
+            return {}
+        idle = sum(1 for conn in connections if conn.is_idle())
+        return {"open": len(connections), "idle": idle, "in_use": len(connections) - idle}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "http2": self.http2, "requests": self.requests,
+            "in_flight": self.in_flight, "max_in_flight": self.max_in_flight,
+            "connections": self._pool_connections(),
+            "tcp_connects": self.tcp_connects, "tls_handshakes": self.tls_handshakes,
+            "connect_failures": self.connect_failures,
+            "avg_acquire_ms": round(1000 * self.total_acquire_seconds / self.requests, 2) if self.requests else 0.0,
+            "max_acquire_ms": round(1000 * self.max_acquire_seconds, 2),
+            "avg_connect_ms": round(1000 * self.total_connect_seconds / self.tcp_connects, 2) if self.tcp_connects else 0.0,
+            "avg_tls_ms": round(1000 * self.total_tls_seconds / self.tls_handshakes, 2) if self.tls_handshakes else 0.0,
+        }
+
+class _RequestTrace:
+    """httpx 'trace' extension callback for a single request."""
+
+    def __init__(self, metrics: PoolMetrics):
+        self._metrics = metrics
+        self._started_at = time.perf_counter()
+        self._acquired = False
+        self._phase_started_at = 0.0
+
+    def _mark_acquired(self, now: float) -> None:
+        # The first connection-level event marks the end of waiting for a pool slot.
+        if not self._acquired:
+            self._acquired = True
+            wait = now - self._started_at
+            self._metrics.total_acquire_seconds += wait
+            self._metrics.max_acquire_seconds = max(self._metrics.max_acquire_seconds, wait)
+
+    async def __call__(self, event_name: str, info: Dict[str, Any]) -> None:
+        now = time.perf_counter()
+        metrics = self._metrics
+        if event_name in ("connection.connect_tcp.started", "connection.connect_unix_socket.started"):
+            self._mark_acquired(now)
+            self._phase_started_at = now
+        elif event_name == "connection.connect_tcp.complete":
+            metrics.tcp_connects += 1
+            metrics.total_connect_seconds += now - self._phase_started_at
+        elif event_name == "connection.connect_tcp.failed":
+            metrics.connect_failures += 1
+        elif event_name == "connection.start_tls.started":
+            self._phase_started_at = now
+        elif event_name == "connection.start_tls.complete":
+            metrics.tls_handshakes += 1
+            metrics.total_tls_seconds += now - self._phase_started_at
+        elif event_name.endswith("send_request_headers.started"):
+            self._mark_acquired(now)
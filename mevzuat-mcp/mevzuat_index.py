@@ -0,0 +1,296 @@
+# mevzuat_index.py
+"""
+Local Turkish full-text index (SQLite FTS5) over documents and articles fetched by MevzuatApiClient.
+Lets search_mevzuat answer from local data, either as the primary backend or as a fallback
+when the remote searchDocuments API is unavailable.
+
+Text is Turkish-casefolded (I→ı, İ→i) before it reaches FTS5; query terms are reduced to a stem
+by light suffix stripping and matched as prefixes, so "kanunun" finds "kanun", "kanunu", "kanunlar".
+"""
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from mevzuat_models import MevzuatDocument, MevzuatSearchRequest, MevzuatSearchResult
+from mevzuat_query import And, Node, Not, Or, Phrase, QuerySyntaxError, Regex, Required, Term, parse_query
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "index.sqlite3")
+
+MIN_STEM_LENGTH = 4
+
+# Inflectional suffixes only (plural, case, possessive); longest first.
+_SUFFIXES = sorted({
+    "lar", "ler", "ları", "leri",
+    "nın", "nin", "nun", "nün", "ın", "in", "un", "ün",
+    "yı", "yi", "yu", "yü", "ı", "i", "u", "ü",
+    "ya", "ye", "a", "e",
+    "nda", "nde", "da", "de", "ta", "te",
+    "ndan", "nden", "dan", "den", "tan", "ten",
+    "yla", "yle", "la", "le",
+    "sı", "si", "su", "sü",
+}, key=len, reverse=True)
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+def turkish_casefold(text: str) -> str:
+    """Lowercases with Turkish dotted/dotless I rules."""
+    return text.replace("I", "ı").replace("İ", "i").lower().replace("\u0307", "")
+
+def turkish_stem(word: str) -> str:
+    """Light suffix stripping; never shortens a word below MIN_STEM_LENGTH."""
+    stem = turkish_casefold(word)
+    for _ in range(3):
+        for suffix in _SUFFIXES:
+            if stem.endswith(suffix) and len(stem) - len(suffix) >= MIN_STEM_LENGTH:
+                stem = stem[:-len(suffix)]
+                break
+        else:
+            break
+    return stem
+
+def normalize_text(text: str) -> str:
+    """Text as stored in the FTS table: casefolded words separated by single spaces."""
+    return " ".join(_WORD_RE.findall(turkish_casefold(text or "")))
+
+class LocalQueryError(ValueError):
+    """The query uses syntax the local index cannot evaluate (e.g. arbitrary regex)."""
+
+def _fts_term(word: str, prefix: bool = True) -> str:
+    word = word.replace('"', '""')
+    return f'"{word}" *' if prefix else f'"{word}"'
+
+def _compile_node(node: Node) -> str:
+    """Compiles a query AST node to an FTS5 expression."""
+    if isinstance(node, Phrase):
+        words = _WORD_RE.findall(turkish_casefold(node.text))
+        if not words:
+            raise LocalQueryError(f"Empty phrase: {node.text}")
+        if node.slop is not None:
+            return f"NEAR({' '.join(_fts_term(turkish_stem(w)) for w in words)}, {node.slop})"
+        return '"' + " ".join(words) + '"'
+    if isinstance(node, Regex):
+        alternation = re.fullmatch(r"\(?([\w\s|]+?)\)?", node.pattern)
+        if not alternation:
+            raise LocalQueryError(f"Regex queries are not supported by the local index: /{node.pattern}/")
+        options = [o.strip() for o in alternation.group(1).split("|") if o.strip()]
+        return " OR ".join(f"({_compile_node(Phrase(o) if ' ' in o else Term(o))})" for o in options)
+    if isinstance(node, Term):
+        # Boosts do not change matching; fuzzy terms fall back to stem prefix matching.
+        if node.wildcard:
+            head = re.split(r"[*?]", turkish_casefold(node.text), 1)[0]
+            if not head:
+                raise LocalQueryError(f"Leading wildcards are not supported by the local index: {node.text}")
+            return _fts_term(head)
+        words = _WORD_RE.findall(turkish_casefold(node.text))
+        if not words:
+            raise LocalQueryError(f"Unsupported term: {node.text}")
+        return " ".join(_fts_term(turkish_stem(w)) for w in words)
+    if isinstance(node, Required):
+        return _compile_node(node.child)
+    if isinstance(node, Or):
+        if any(isinstance(child, Not) for child in node.children):
+            raise LocalQueryError("Negated operands of OR are not supported by the local index")
+        return " OR ".join(f"({_compile_node(child)})" for child in node.children)
+    # FTS5's NOT is binary, so prohibited operands are collected into one trailing NOT clause.
+    children = node.children if isinstance(node, And) else (node,)
+    positives = [f"({_compile_node(c)})" for c in children if not isinstance(c, Not)]
+    negatives = [f"({_compile_node(c.child)})" for c in children if isinstance(c, Not)]
+    if not positives:
+        raise LocalQueryError("The local index needs at least one positive term")
+    query = " AND ".join(positives)
+    if negatives:
+        query = f"({query}) NOT ({' OR '.join(negatives)})"
+    return query
+
+def compile_fts_query(phrase: str) -> str:
+    """
+    Translates the search_mevzuat operator set (AND/OR/NOT, +required, -prohibited, quoted phrases,
+    proximity "a b"~N, wildcards, fuzzy and boosts) into an FTS5 MATCH expression, via the same
+    AST that produces the remote Solr query.
+    """
+    try:
+        return _compile_node(parse_query(phrase or ""))
+    except QuerySyntaxError as e:
+        raise LocalQueryError(str(e)) from e
+
+class LocalIndex:
+    """SQLite FTS5 index of document titles and article texts, plus the document metadata needed to build results."""
+
+    SORT_COLUMNS = {
+        "RESMI_GAZETE_TARIHI": "d.resmi_gazete_tarihi",
+        "MEVZUAT_NUMARASI": "d.mevzuat_no",
+        "KAYIT_TARIHI": "d.kayit_tarihi",
+    }
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS documents (
+                mevzuat_id TEXT PRIMARY KEY,
+                mevzuat_no INTEGER,
+                tur_name TEXT,
+                resmi_gazete_tarihi TEXT,
+                resmi_gazete_sayisi TEXT,
+                kayit_tarihi TEXT,
+                indexed_at REAL NOT NULL,
+                doc_json TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS documents_no ON documents(mevzuat_no);
+            CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts USING fts5(
+                mevzuat_id UNINDEXED, madde_id UNINDEXED, text,
+                tokenize = "unicode61 remove_diacritics 0"
+            );
+            CREATE TABLE IF NOT EXISTS segment_rows (
+                segment_key TEXT PRIMARY KEY,
+                fts_rowid INTEGER NOT NULL
+            );
+        """)
+        self._migrate()
+        self.queries = 0
+        self.unsupported_queries = 0
+
+    def _migrate(self) -> None:
+        # Indexes created before kayit_tarihi had its own column: add it and fill it from the stored documents.
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(documents)")}
+        if "kayit_tarihi" not in columns:
+            self._conn.execute("ALTER TABLE documents ADD COLUMN kayit_tarihi TEXT")
+            for mevzuat_id, doc_json in self._conn.execute("SELECT mevzuat_id, doc_json FROM documents").fetchall():
+                kayit_tarihi = MevzuatDocument.model_validate_json(doc_json).kayit_tarihi
+                if kayit_tarihi:
+                    self._conn.execute("UPDATE documents SET kayit_tarihi = ? WHERE mevzuat_id = ?",
+                                       (kayit_tarihi.isoformat(), mevzuat_id))
+
+    @classmethod
+    def from_env(cls) -> Optional["LocalIndex"]:
+        """Opens the index at MEVZUAT_LOCAL_INDEX_PATH; it is only enabled when that is set or a local search backend is selected."""
+        path = os.environ.get("MEVZUAT_LOCAL_INDEX_PATH")
+        if path is None and os.environ.get("MEVZUAT_SEARCH_BACKEND", "remote") != "remote":
+            path = DEFAULT_INDEX_PATH
+        if not path:
+            return None
+        try:
+            return cls(path)
+        except sqlite3.Error as e:
+            logger.warning(f"Local index disabled, could not open {path}: {e}")
+            return None
+
+    def _put_segment(self, mevzuat_id: str, madde_id: str, text: str) -> None:
+        # Caller holds the lock and an open transaction.
+        key = f"{mevzuat_id}:{madde_id}"
+        row = self._conn.execute("SELECT fts_rowid FROM segment_rows WHERE segment_key = ?", (key,)).fetchone()
+        if row:
+            self._conn.execute("DELETE FROM segments_fts WHERE rowid = ?", (row[0],))
+        cursor = self._conn.execute(
+            "INSERT INTO segments_fts(mevzuat_id, madde_id, text) VALUES (?, ?, ?)",
+            (mevzuat_id, madde_id, normalize_text(text)),
+        )
+        self._conn.execute("INSERT OR REPLACE INTO segment_rows(segment_key, fts_rowid) VALUES (?, ?)", (key, cursor.lastrowid))
+
+    def add_documents(self, documents: Iterable[MevzuatDocument]) -> None:
+        """Indexes document metadata and titles (e.g. from search results)."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for doc in documents:
+                    self._conn.execute(
+                        "INSERT INTO documents(mevzuat_id, mevzuat_no, tur_name, resmi_gazete_tarihi, resmi_gazete_sayisi, kayit_tarihi, indexed_at, doc_json) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT(mevzuat_id) DO UPDATE SET "
+                        "mevzuat_no = excluded.mevzuat_no, tur_name = excluded.tur_name, resmi_gazete_tarihi = excluded.resmi_gazete_tarihi, "
+                        "resmi_gazete_sayisi = excluded.resmi_gazete_sayisi, kayit_tarihi = excluded.kayit_tarihi, doc_json = excluded.doc_json",
+                        (
+                            doc.mevzuat_id, doc.mevzuat_no, doc.mevzuat_tur.name,
+                            doc.resmi_gazete_tarihi.isoformat() if doc.resmi_gazete_tarihi else None,
+                            doc.resmi_gazete_sayisi, doc.kayit_tarihi.isoformat() if doc.kayit_tarihi else None,
+                            now, doc.model_dump_json(by_alias=True),
+                        ),
+                    )
+                    self._put_segment(doc.mevzuat_id, "", doc.mevzuat_adi)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def add_article(self, mevzuat_id: str, madde_id: str, markdown_content: str) -> None:
+        """Indexes the text of an article (or of a whole document when madde_id == mevzuat_id)."""
+        self.add_articles([(mevzuat_id, madde_id, markdown_content)])
+
+    def add_articles(self, articles: Iterable[Tuple[str, str, str]]) -> None:
+        """Indexes (mevzuat_id, madde_id, markdown) triples in a single transaction."""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for mevzuat_id, madde_id, markdown_content in articles:
+                    if markdown_content:
+                        self._put_segment(mevzuat_id, madde_id, markdown_content)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def search(self, request: MevzuatSearchRequest) -> MevzuatSearchResult:
+        """
+        Answers a search from local data. `request.phrase` must use the user-facing operator syntax
+        (not the Solr-rewritten form). Raises LocalQueryError for syntax the index cannot evaluate.
+        """
+        self.queries += 1
+        where, params = ["d.tur_name IN (%s)" % ",".join("?" * len(request.mevzuat_tur_list))], list(request.mevzuat_tur_list)
+        if request.phrase:
+            try:
+                match = compile_fts_query(request.phrase)
+            except LocalQueryError:
+                self.unsupported_queries += 1
+                raise
+            where.append("d.mevzuat_id IN (SELECT mevzuat_id FROM segments_fts WHERE segments_fts MATCH ?)")
+            params.append(match)
+        if request.mevzuat_no:
+            where.append("d.mevzuat_no = ?")
+            params.append(int(request.mevzuat_no) if request.mevzuat_no.strip().isdigit() else -1)
+        if request.resmi_gazete_sayisi:
+            where.append("d.resmi_gazete_sayisi = ?")
+            params.append(request.resmi_gazete_sayisi.strip())
+        where_sql = " AND ".join(where)
+        order_sql = f"{self.SORT_COLUMNS[request.sort_field]} {'DESC' if request.sort_direction == 'desc' else 'ASC'}"
+        offset = (request.page_number - 1) * request.page_size
+        with self._lock:
+            try:
+                total = self._conn.execute(f"SELECT COUNT(*) FROM documents d WHERE {where_sql}", params).fetchone()[0]
+                rows = self._conn.execute(
+                    f"SELECT d.doc_json FROM documents d WHERE {where_sql} ORDER BY {order_sql} LIMIT ? OFFSET ?",
+                    params + [request.page_size, offset],
+                ).fetchall()
+            except sqlite3.OperationalError as e:
+                self.unsupported_queries += 1
+                raise LocalQueryError(f"Local index could not evaluate the query: {e}") from e
+        return MevzuatSearchResult(
+            documents=[MevzuatDocument.model_validate_json(row[0]) for row in rows],
+            total_results=total, current_page=request.page_number, page_size=request.page_size,
+            total_pages=(total + request.page_size - 1) // request.page_size,
+            query_used={**request.model_dump(), "backend": "local"},
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            documents = self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+            segments = self._conn.execute("SELECT COUNT(*) FROM segment_rows").fetchone()[0]
+        return {
+            "path": self.path, "documents": documents, "segments": segments,
+            "queries": self.queries, "unsupported_queries": self.unsupported_queries,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,159 @@
+# mevzuat_logging.py
+"""
+Logging setup for the MCP server.
+
+In "queue" mode (the default) records are handed to a QueueHandler and written to the rotating log
+file and stderr by a QueueListener thread, so tool calls never block the event loop on disk or pipe
+writes. DEBUG records are sampled and rate-limited per call site before they are queued; records at
+INFO and above always pass. "sync" mode keeps the previous direct handlers (still with rotation).
+"""
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from typing import Dict, Optional, TextIO, Tuple
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(threadName)s - %(message)s'
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+class DebugSampler(logging.Filter):
+    """
+    Passes a `sample` fraction of DEBUG records, and at most `rate` per second (burst `rate`) from
+    each call site. The next DEBUG record that passes from a site reports how many were suppressed.
+    """
+
+    def __init__(self, rate: float = 20.0, sample: float = 1.0):
+        super().__init__()
+        self.rate = rate
+        self.sample = sample
+        self.suppressed = 0
+        self._sites: Dict[Tuple[str, int], list] = {}     # site -> [tokens, last refill, suppressed since last pass]
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG:
+            return True
+        decided = getattr(record, "_sampled", None)
+        if decided is not None:     # already decided by another handler sharing this sampler
+            return decided
+        record._sampled = self._decide(record)
+        return record._sampled
+
+    def _decide(self, record: logging.LogRecord) -> bool:
+        site = (record.pathname, record.lineno)
+        with self._lock:
+            state = self._sites.get(site)
+            now = time.monotonic()
+            if state is None:
+                state = self._sites[site] = [self.rate, now, 0]
+            if self.rate > 0:
+                state[0] = min(self.rate, state[0] + (now - state[1]) * self.rate)
+                state[1] = now
+            passed = (self.sample >= 1.0 or random.random() < self.sample) and (self.rate <= 0 or state[0] >= 1.0)
+            if not passed:
+                state[2] += 1
+                self.suppressed += 1
+                return False
+            if self.rate > 0:
+                state[0] -= 1.0
+            skipped, state[2] = state[2], 0
+        if skipped:
+            record.msg = f"{record.getMessage()} [{skipped} similar DEBUG records suppressed]"
+            record.args = None
+        return True
+
+def _file_handler(log_file: str, max_bytes: int, backup_count: int) -> logging.Handler:
+    os.makedirs(os.path.dirname(os.path.abspath(log_file)), exist_ok=True)
+    if max_bytes > 0:
+        return logging.handlers.RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+    return logging.FileHandler(log_file, mode='a', encoding='utf-8')
+
+def configure_logging(log_file: Optional[str], level: str = "DEBUG", mode: str = "queue",
+                      max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5,
+                      debug_rate: float = 20.0, debug_sample: float = 1.0,
+                      stream: Optional[TextIO] = None) -> Optional[logging.handlers.QueueListener]:
+    """
+    Replaces the root logger's handlers with a (rotating) file handler for `log_file` and a stderr
+    handler. Returns the QueueListener in "queue" mode; stop_logging() (also run at exit) flushes and stops it.
+    """
+    global _listener
+    if mode not in ("queue", "sync"):
+        raise ValueError(f"Unknown logging mode: {mode}")
+    stop_logging()
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = [logging.StreamHandler(stream or sys.stderr)]
+    if log_file:
+        handlers.insert(0, _file_handler(log_file, max_bytes, backup_count))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    root.setLevel(level.upper())
+    sampler = DebugSampler(rate=debug_rate, sample=debug_sample)
+
+    if mode == "sync":
+        for handler in handlers:
+            handler.addFilter(sampler)
+            root.addHandler(handler)
+        return None
+
+    queue_handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+    queue_handler.addFilter(sampler)
+    root.addHandler(queue_handler)
+    _listener = logging.handlers.QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+@atexit.register
+def stop_logging() -> None:
+    """Stops the background writer after it has written every queued record."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+def _after_fork_in_child() -> None:
+    """The listener thread does not exist in a forked child (e.g. a conversion worker); write directly instead."""
+    global _listener
+    if _listener is None:
+        return
+    root = logging.getLogger()
+    sampler = None
+    for handler in root.handlers[:]:
+        if isinstance(handler, logging.handlers.QueueHandler):
+            sampler = next((f for f in handler.filters if isinstance(f, DebugSampler)), None)
+            root.removeHandler(handler)
+    for handler in _listener.handlers:
+        if sampler is not None:
+            handler.addFilter(sampler)
+        root.addHandler(handler)
+    _listener = None
+
+os.register_at_fork(after_in_child=_after_fork_in_child)
+
+def configure_logging_from_env(log_file: Optional[str]) -> Optional[logging.handlers.QueueListener]:
+    """
+    MEVZUAT_LOG_LEVEL (DEBUG), MEVZUAT_LOG_MODE (queue|sync), MEVZUAT_LOG_MAX_MB (10; 0 disables
+    rotation), MEVZUAT_LOG_BACKUPS (5), MEVZUAT_LOG_DEBUG_RATE (20 per second per call site; 0 = unlimited)
+    and MEVZUAT_LOG_DEBUG_SAMPLE (1.0). MEVZUAT_LOG_FILE overrides `log_file`; an empty value disables it.
+    """
+    return configure_logging(
+        os.environ.get("MEVZUAT_LOG_FILE", log_file),
+        level=os.environ.get("MEVZUAT_LOG_LEVEL", "DEBUG"),
+        mode=os.environ.get("MEVZUAT_LOG_MODE", "queue"),
+        max_bytes=int(float(os.environ.get("MEVZUAT_LOG_MAX_MB", 10)) * 1024 * 1024),
+        backup_count=int(os.environ.get("MEVZUAT_LOG_BACKUPS", 5)),
+        debug_rate=float(os.environ.get("MEVZUAT_LOG_DEBUG_RATE", 20)),
+        debug_sample=float(os.environ.get("MEVZUAT_LOG_DEBUG_SAMPLE", 1.0)),
+    )
@@ -8,44 +8,189 @@ import asyncio
 import logging
 import os
 import json
+import weakref
+from contextlib import asynccontextmanager
 from pydantic import Field
 from typing import Optional, List, Dict, Any, Union
 
+from mevzuat_logging import configure_logging_from_env
+
 LOG_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs")
-if not os.path.exists(LOG_DIRECTORY):
-    os.makedirs(LOG_DIRECTORY)
 LOG_FILE_PATH = os.path.join(LOG_DIRECTORY, "mevzuat_mcp_server.log")
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(threadName)s - %(message)s',
-    handlers=[
-        logging.FileHandler(LOG_FILE_PATH, mode='a', encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
+# Rotating file + stderr, written from a background thread; see mevzuat_logging for MEVZUAT_LOG_* settings.
+configure_logging_from_env(LOG_FILE_PATH)
 logging.getLogger("httpx").setLevel(logging.WARNING)
 logger = logging.getLogger(__name__)
 
-from fastmcp import FastMCP
+from fastmcp import FastMCP, Context
 from fastmcp.exceptions import ToolError
 
 from mevzuat_client import MevzuatApiClient
+from mevzuat_cache import TTLCache
+from mevzuat_store import ContentStore
+from mevzuat_index import LocalIndex, LocalQueryError
+from mevzuat_query import QuerySyntaxError, compile_query, proximity_candidates
+from mevzuat_metrics import SEARCH_FALLBACKS, start_http_server
 from mevzuat_models import (
     MevzuatSearchRequest, MevzuatSearchResult,
     MevzuatTurEnum, SortFieldEnum, SortDirectionEnum,
-    MevzuatArticleNode, MevzuatArticleContent
+    MevzuatArticleNode, MevzuatArticleContent, MevzuatArticleTreePage
 )
 
+# Converters (markitdown, bs4/lxml) load on the first content request unless pre-warmed after startup.
+PREWARM_CONVERTERS = os.environ.get("MEVZUAT_PREWARM_CONVERTERS", "0") == "1"
+PREWARM_DELAY = float(os.environ.get("MEVZUAT_PREWARM_DELAY", 1.0))
+
+@asynccontextmanager
+async def _lifespan(server: FastMCP):
+    if PREWARM_CONVERTERS:
+        mevzuat_client.prewarm(PREWARM_DELAY)
+    yield
+
 app = FastMCP(
     name="MevzuatGovTrMCP",
+    lifespan=_lifespan,
     instructions="MCP server for Adalet Bakanlığı Mevzuat Bilgi Sistemi. Allows detailed searching of Turkish legislation and retrieving the content of specific articles.",
     dependencies=["httpx", "beautifulsoup4", "lxml", "markitdown", "pypdf"]
 )
 
-mevzuat_client = MevzuatApiClient()
+mevzuat_client = MevzuatApiClient(content_store=ContentStore.from_env(), local_index=LocalIndex.from_env())
+
+# "remote": bedesten only; "local": local index first, bedesten when it has no answer;
+# "fallback": bedesten first, local index when bedesten fails.
+SEARCH_BACKEND = os.environ.get("MEVZUAT_SEARCH_BACKEND", "remote")
+
+async def _search_local(search_req: MevzuatSearchRequest) -> Optional[MevzuatSearchResult]:
+    """Answers from the local index, or None when it is disabled, empty for this query or cannot parse it."""
+    if mevzuat_client.local_index is None:
+        return None
+    try:
+        result = await asyncio.to_thread(mevzuat_client.local_index.search, search_req)
+    except LocalQueryError as e:
+        logger.info(f"Local index skipped: {e}")
+        return None
+    return result if result.documents else None
+
+FALLBACK_CONCURRENCY = int(os.environ.get("MEVZUAT_FALLBACK_CONCURRENCY", 3))
+# Remembers, per phrase and filter set, which proximity rewrite worked ("" = none did).
+_fallback_cache = TTLCache(maxsize=2048, ttl=float(os.environ.get("MEVZUAT_FALLBACK_CACHE_TTL", 3600)))
+
+async def _proximity_fallback(search_req: MevzuatSearchRequest, phrase: str) -> Optional[MevzuatSearchResult]:
+    """
+    Runs the proximity candidates of the user's `phrase` concurrently (bounded by FALLBACK_CONCURRENCY).
+    The earliest candidate in priority order with hits wins; lower-priority attempts are cancelled
+    as soon as a higher-priority one succeeds.
+    """
+    cache_key = (
+        search_req.phrase.strip(), search_req.mevzuat_no, search_req.resmi_gazete_sayisi,
+        tuple(sorted(set(search_req.mevzuat_tur_list))),
+    )
+    cached_rewrite = _fallback_cache.get(cache_key)
+    if cached_rewrite == "":
+        logger.info("Proximity fallback skipped, no rewrite matched this query recently")
+        SEARCH_FALLBACKS.labels(kind="proximity", outcome="cached_miss").inc()
+        return None
+    if cached_rewrite is not None:
+        SEARCH_FALLBACKS.labels(kind="proximity", outcome="cached_hit").inc()
+        logger.info(f"Using cached proximity rewrite '{cached_rewrite}'")
+        return await mevzuat_client.search_documents(search_req.model_copy(update={"phrase": cached_rewrite}))
+
+    candidates = proximity_candidates(phrase)
+    if not candidates:
+        return None
+    logger.info(f"No results found, attempting proximity fallback with {len(candidates)} candidates")
+
+    semaphore = asyncio.Semaphore(FALLBACK_CONCURRENCY)
+    async def attempt(pair_query: str) -> MevzuatSearchResult:
+        async with semaphore:
+            logger.debug(f"Trying proximity pair: {pair_query}")
+            return await mevzuat_client.search_documents(search_req.model_copy(update={"phrase": pair_query}))
+
+    tasks = {asyncio.create_task(attempt(q)): i for i, q in enumerate(candidates)}
+    pending = set(tasks)
+    best_index, best_result = len(candidates), None
+    had_errors = False
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.cancelled():
+                    continue
+                if task.exception() is not None or task.result().error_message:
+                    had_errors = True
+                    continue
+                candidate_result = task.result()
+                if candidate_result.total_results > 0 and tasks[task] < best_index:
+                    best_index, best_result = tasks[task], candidate_result
+            # Anything ranked below the current winner can no longer matter.
+            for task in [t for t in pending if tasks[t] > best_index]:
+                task.cancel()
+                pending.discard(task)
+    finally:
+        for task in pending:
+            task.cancel()
+
+    SEARCH_FALLBACKS.labels(kind="proximity", outcome="miss" if best_result is None else "hit").inc()
+    if best_result is None:
+        # Only remember a negative outcome when every candidate genuinely returned nothing.
+        if not had_errors:
+            _fallback_cache.set(cache_key, "")
+        return None
+    _fallback_cache.set(cache_key, candidates[best_index])
+    logger.info(f"Proximity fallback successful with '{candidates[best_index]}': {best_result.total_results} results")
+    return best_result
+
+async def _run_search(search_req: MevzuatSearchRequest, local_req: MevzuatSearchRequest, phrase: Optional[str]) -> MevzuatSearchResult:
+    """Runs a search against the configured backend(s), with the proximity fallback for empty results."""
+    if SEARCH_BACKEND == "local":
+        local_result = await _search_local(local_req)
+        if local_result is not None:
+            return local_result
+
+    # First attempt: original query
+    result = await mevzuat_client.search_documents(search_req)
+
+    if result.error_message and SEARCH_BACKEND == "fallback":
+        local_result = await _search_local(local_req)
+        SEARCH_FALLBACKS.labels(kind="local", outcome="miss" if local_result is None else "hit").inc()
+        if local_result is not None:
+            logger.warning(f"Upstream search failed ({result.error_message}); answered from the local index")
+            return local_result
+    
+    # Smart proximity fallback: if no results and we have a phrase
+    if result.total_results == 0 and search_req.phrase and not result.error_message:
+        fallback_result = await _proximity_fallback(search_req, phrase)
+        if fallback_result is not None:
+            return fallback_result
+    
+    # Return original result if no fallback was needed or fallback didn't help
+    if not result.documents and not result.error_message:
+        result.error_message = "No legislation found matching the specified criteria."
+    return result
+
+# Sessions whose end already cancels their prefetches (see _prefetch_trees).
+_prefetch_sessions: "weakref.WeakSet[Any]" = weakref.WeakSet()
+
+def _prefetch_trees(ctx: Context, result: MevzuatSearchResult) -> None:
+    """
+    Speculatively fetches the article trees of the top hits (MEVZUAT_PREFETCH_TOP_K) into the client cache.
+    Prefetches belong to the MCP session and are cancelled when the session object goes away.
+    Best effort: a failure here is logged and never affects the search result.
+    """
+    if not result.documents or not mevzuat_client.prefetch_enabled:
+        return
+    try:
+        session = ctx.session
+        owner = id(session)
+        if mevzuat_client.prefetch_trees(result.documents, owner=owner) and session not in _prefetch_sessions:
+            _prefetch_sessions.add(session)
+            weakref.finalize(session, mevzuat_client.cancel_prefetch, owner)
+    except Exception:
+        logger.warning("Could not start article tree prefetch.", exc_info=True)
 
 @app.tool()
 async def search_mevzuat(
+    ctx: Context,
     # mevzuat_adi: Optional[str] = Field(None, description="Search in legislation titles/names only. Cannot be used together with 'phrase' parameter. For exact phrase search, enclose in double quotes."),
     phrase: Optional[str] = Field(None, description="Turkish full-text search phrase. Supports multiple search operators:\\n\\nBoolean operators: AND, OR, NOT (space between words = AND logic)\\nRequired/prohibited terms: +required -prohibited\\nExact phrases: \\\"exact phrase\\\"\\nProximity search: \\\"word1 word2\\\"~5\\nWildcard search: word* or w?rd\\nFuzzy search: word~ or word~0.8\\nTerm boosting: important^2\\nRegex patterns: /[a-z]+/ with full regex syntax\\n\\nExamples:\\n- Basic: mahkeme\\n- Space = AND: mahkeme karar (finds both)\\n- Boolean: mahkeme AND karar\\n- Required: +mahkeme -eski\\n- Fuzzy: mahkeme~\\n- Wildcard: mah*\\n- Regex: /(mahkeme|karar)/"),
     mevzuat_no: Optional[str] = Field(None, description="The specific number of the legislation, e.g., '5237' for the Turkish Penal Code."),
@@ -66,87 +211,11 @@ async def search_mevzuat(
     if not phrase and not mevzuat_no:
         raise ToolError("You must provide at least one of the following search criteria: 'phrase' or 'mevzuat_no'.")
 
-    # Convert boolean operators to Solr syntax
-    def convert_boolean_operators(phrase_text: str) -> str:
-        if not phrase_text:
-            return phrase_text
-        
-        import re
-        text = phrase_text
-        
-        # Convert AND to space (implicit AND works)
-        text = re.sub(r'\s+AND\s+', ' ', text)
-        
-        # Convert NOT to - (this works!)
-        text = re.sub(r'\s+NOT\s+', ' -', text)
-        
-        # Convert OR chains to regex
-        def replace_or_chain(text):
-            while 'OR' in text:
-                # Match quoted terms separated by OR
-                match = re.search(r'"([^"]+)"\s+OR\s+"([^"]+)"(?:\s+OR\s+"([^"]+)")*', text)
-                if match:
-                    # Extract all quoted terms in the OR chain
-                    full_match = match.group(0)
-                    terms = re.findall(r'"([^"]+)"', full_match)
-                    # Convert to regex alternation
-                    regex_pattern = f"/({'|'.join(terms)})/"
-                    text = text.replace(full_match, regex_pattern, 1)
-                else:
-                    # Handle simple word OR word
-                    simple_or = re.search(r'(\w+)\s+OR\s+(\w+)', text)
-                    if simple_or:
-                        word1, word2 = simple_or.groups()
-                        regex_pattern = f"/({word1}|{word2})/"
-                        text = text.replace(simple_or.group(0), regex_pattern, 1)
-                    else:
-                        break
-            return text
-        
-        text = replace_or_chain(text)
-        
-        return text
-    
-    # Convert query to proximity search for fallback
-    def convert_to_proximity(phrase_text: str) -> str:
-        if not phrase_text:
-            return phrase_text
-            
-        import re
-        text = phrase_text
-        
-        # Skip if already contains proximity operators
-        if '~' in text and '"' in text:
-            return text
-            
-        # Skip if it's a regex pattern
-        if text.startswith('/') and text.endswith('/'):
-            return text
-            
-        # Skip if it contains complex operators (+, -, quotes, etc.)
-        if any(op in text for op in ['+', '-', '"', '*', '?', '^']):
-            return text
-            
-        # Convert space-separated words to proximity search
-        # Split by spaces and boolean operators
-        words = re.split(r'\s+(?:AND|OR|NOT)\s+|\s+', text)
-        clean_words = [word.strip() for word in words if word.strip() and word not in ['AND', 'OR', 'NOT']]
-        
-        if len(clean_words) >= 2:
-            # For any multiple words, try adjacent pairs with proximity 5
-            # Use the pair that is most likely to match
-            pairs = []
-            for i in range(len(clean_words) - 1):
-                pairs.append(f'"{clean_words[i]} {clean_words[i+1]}"~10')
-            
-            # Try the last pair first (often more specific)
-            return pairs[-1] if pairs else text
-        else:
-            # Single word, just return as is
-            return text
-    
-    # Process phrase - only convert OR to regex, other operators work natively
-    processed_phrase = convert_boolean_operators(phrase) if phrase else phrase
+    # Parse once (memoized) and compile to bedesten's Solr syntax; OR chains become regex alternations
+    try:
+        processed_phrase = compile_query(phrase) if phrase else phrase
+    except QuerySyntaxError as e:
+        raise ToolError(f"Invalid search phrase. {e.describe()}")
 
     processed_turler = mevzuat_turleri
     if isinstance(mevzuat_turleri, str):
@@ -174,50 +243,10 @@ async def search_mevzuat(
     log_params = search_req.model_dump(exclude_defaults=True)
     logger.info(f"Tool 'search_mevzuat' called with parameters: {log_params}")
     
+    # The local index parses the user's phrase itself, not the Solr rewrite.
+    local_req = search_req.model_copy(update={"phrase": phrase})
     try:
-        # First attempt: original query
-        result = await mevzuat_client.search_documents(search_req)
-        
-        # Smart proximity fallback: if no results and we have a phrase
-        if result.total_results == 0 and processed_phrase and not result.error_message:
-            logger.info("No results found, attempting proximity fallback")
-            
-            # Try all proximity pairs until we find results
-            import re
-            words = re.split(r'\s+(?:AND|OR|NOT)\s+|\s+', processed_phrase)
-            clean_words = [word.strip() for word in words if word.strip() and word not in ['AND', 'OR', 'NOT']]
-            
-            if len(clean_words) >= 2:
-                # Generate all adjacent pairs
-                pairs = []
-                for i in range(len(clean_words) - 1):
-                    pairs.append(f'"{clean_words[i]} {clean_words[i+1]}"~10')
-                
-                # Try each pair until we find results
-                for pair_query in pairs:
-                    logger.info(f"Trying proximity pair: {pair_query}")
-                    
-                    proximity_req = MevzuatSearchRequest(
-                        phrase=pair_query,
-                        mevzuat_no=mevzuat_no,
-                        resmi_gazete_sayisi=resmi_gazete_sayisi,
-                        mevzuat_tur_list=processed_turler if processed_turler is not None else ["KANUN", "CB_KARARNAME", "YONETMELIK", "CB_YONETMELIK", "CB_KARAR", "CB_GENELGE", "KHK", "TUZUK", "KKY", "UY", "TEBLIGLER", "MULGA"],
-                        page_number=page_number,
-                        page_size=page_size,
-                        sort_field=sort_field,
-                        sort_direction=sort_direction
-                    )
-                    
-                    proximity_result = await mevzuat_client.search_documents(proximity_req)
-                    if proximity_result.total_results > 0:
-                        logger.info(f"Proximity fallback successful with '{pair_query}': {proximity_result.total_results} results")
-                        return proximity_result
-        
-        # Return original result if no fallback was needed or fallback didn't help
-        if not result.documents and not result.error_message:
-            result.error_message = "No legislation found matching the specified criteria."
-        return result
-        
+        result = await _run_search(search_req, local_req, phrase)
     except Exception as e:
         logger.exception("Error in tool 'search_mevzuat'.")
         return MevzuatSearchResult(
@@ -225,35 +254,55 @@ async def search_mevzuat(
             total_pages=0, query_used=log_params, 
             error_message=f"An unexpected error occurred in the tool: {str(e)}"
         )
+    _prefetch_trees(ctx, result)
+    return result
+
+ARTICLE_TREE_PAGE_SIZE = int(os.environ.get("MEVZUAT_ARTICLE_TREE_PAGE_SIZE", 200))
 
 @app.tool()
-async def get_mevzuat_article_tree(mevzuat_id: str = Field(..., description="The ID of the legislation, obtained from the 'search_mevzuat' tool. E.g., '343829'.")) -> List[MevzuatArticleNode]:
+async def get_mevzuat_article_tree(
+    mevzuat_id: str = Field(..., description="The ID of the legislation, obtained from the 'search_mevzuat' tool. E.g., '343829'."),
+    max_depth: Optional[int] = Field(None, ge=1, description="Only return this many levels below the root (or below 'subtree_root'). 1 = top-level sections only. Nodes with omitted children have child_count > len(children)."),
+    subtree_root: Optional[str] = Field(None, description="A madde_id from a previous tree response; only the nodes below it are returned."),
+    page_number: int = Field(1, ge=1, description="Page number. Pages are taken over the selected nodes in document order."),
+    page_size: int = Field(ARTICLE_TREE_PAGE_SIZE, ge=1, le=1000, description="Maximum number of nodes per page.")
+) -> MevzuatArticleTreePage:
     """
     Retrieves the table of contents (article tree) for a specific legislation.
     This shows the chapters, sections, and articles in a hierarchical structure.
+    For large codes, request max_depth=1 first and then expand a section with subtree_root.
     If the tree is empty, it means the document doesn't have a hierarchical structure - you can use the mevzuat_id directly as the madde_id for get_mevzuat_article_content.
     """
     logger.info(f"Tool 'get_mevzuat_article_tree' called for mevzuat_id: {mevzuat_id}")
     try:
-        article_tree = await mevzuat_client.get_article_tree(mevzuat_id)
-        if not article_tree:
+        page = await mevzuat_client.get_article_tree_page(
+            mevzuat_id, max_depth=max_depth, subtree_root=subtree_root, page_number=page_number, page_size=page_size
+        )
+        if page.total_nodes == 0 and not page.error_message:
             logger.info(f"Article tree is empty for mevzuat_id {mevzuat_id}. Document may not have hierarchical structure.")
-        return article_tree
+        return page
+    except ValueError as e:
+        raise ToolError(str(e))
     except Exception as e:
         logger.exception(f"Error in tool 'get_mevzuat_article_tree' for id {mevzuat_id}.")
         raise ToolError(f"Failed to retrieve article tree: {str(e)}")
 
 @app.tool()
-async def get_mevzuat_article_content(mevzuat_id: str = Field(..., description="The ID of the legislation, obtained from 'search_mevzuat' results."), madde_id: str = Field(..., description="The ID of the specific article (madde), obtained from the 'get_mevzuat_article_tree' tool. If article tree is empty, use the mevzuat_id as madde_id to get the full document content.")) -> MevzuatArticleContent:
+async def get_mevzuat_article_content(
+    mevzuat_id: str = Field(..., description="The ID of the legislation, obtained from 'search_mevzuat' results."),
+    madde_id: str = Field(..., description="The ID of the specific article (madde), obtained from the 'get_mevzuat_article_tree' tool. If article tree is empty, use the mevzuat_id as madde_id to get the full document content."),
+    page_range: Optional[str] = Field(None, description="Only for full documents delivered as PDF (madde_id == mevzuat_id): 1-based pages to extract, e.g. '1-3', '5', '10-' or '1-3,7'. The response reports page_count, so a first call can ask for '1' and later calls for further pages.")
+) -> MevzuatArticleContent:
     """
     Retrieves the full text content of a single article of a legislation and provides it as clean Markdown text.
     If the article tree is empty (no hierarchical structure), use the mevzuat_id as the madde_id parameter to get the full document content.
+    Long PDF documents (e.g. gazette annexes) can be read a few pages at a time with page_range.
     """
-    logger.info(f"Tool 'get_mevzuat_article_content' called for madde_id: {madde_id}")
+    logger.info(f"Tool 'get_mevzuat_article_content' called for madde_id: {madde_id}" + (f", pages {page_range}" if page_range else ""))
     try:
         # If madde_id equals mevzuat_id, try to get full document content
         if madde_id == mevzuat_id:
-            return await mevzuat_client.get_full_document_content(mevzuat_id)
+            return await mevzuat_client.get_full_document_content(mevzuat_id, page_range=page_range)
         else:
             return await mevzuat_client.get_article_content(madde_id, mevzuat_id)
     except Exception as e:
@@ -264,8 +313,97 @@ async def get_mevzuat_article_content(mevzuat_id: str = Field(..., description="
         )
 
 
+@app.tool()
+async def get_article_by_number(
+    mevzuat_no_or_id: str = Field(..., description="The legislation number (e.g. '5237' for the Turkish Penal Code) or a mevzuat_id from 'search_mevzuat'."),
+    madde_no: str = Field(..., description="The article number, e.g. '81', '5/A', 'geçici 1' (temporary article) or 'ek 3' (additional article)."),
+    mevzuat_tur: MevzuatTurEnum = Field("KANUN", description="The legislation type used to resolve a legislation number.")
+) -> MevzuatArticleContent:
+    """
+    Retrieves one article of a legislation by its number in a single call, e.g. article 81 of law 5237.
+    Prefer this over search_mevzuat + get_mevzuat_article_tree + get_mevzuat_article_content when the article number is known.
+    """
+    logger.info(f"Tool 'get_article_by_number' called for {mevzuat_no_or_id}, madde {madde_no}")
+    try:
+        return await mevzuat_client.get_article_by_number(mevzuat_no_or_id, madde_no, mevzuat_tur)
+    except Exception as e:
+        logger.exception(f"Error in tool 'get_article_by_number' for {mevzuat_no_or_id}, madde {madde_no}.")
+        return MevzuatArticleContent(
+            madde_id="", mevzuat_id=mevzuat_no_or_id,
+            markdown_content="", error_message=f"An unexpected error occurred: {str(e)}"
+        )
+
+
+ARTICLE_BATCH_MAX_SIZE = 50
+ARTICLE_BATCH_CONCURRENCY = int(os.environ.get("MEVZUAT_ARTICLE_BATCH_CONCURRENCY", 8))
+
+@app.tool()
+async def get_mevzuat_articles_batch(
+    mevzuat_id: str = Field(..., description="The ID of the legislation, obtained from 'search_mevzuat' results."),
+    madde_ids: Union[List[str], str] = Field(..., description=f"The IDs of the articles (madde) to retrieve, obtained from the 'get_mevzuat_article_tree' tool. At most {ARTICLE_BATCH_MAX_SIZE} per call. A JSON-formatted string of this list is also acceptable.")
+) -> List[MevzuatArticleContent]:
+    """
+    Retrieves the Markdown content of several articles of the same legislation in one call.
+    Results are returned in the same order as 'madde_ids'; an article that fails has its own 'error_message'.
+    Prefer this over calling get_mevzuat_article_content repeatedly when reading many articles.
+    """
+    if isinstance(madde_ids, str):
+        try:
+            parsed_list = json.loads(madde_ids)
+        except json.JSONDecodeError:
+            raise ToolError(f"madde_ids was provided as a string, but it is not valid JSON. Value: {madde_ids}")
+        if not isinstance(parsed_list, list):
+            raise ToolError(f"madde_ids was provided as a string, but it's not a JSON list. Value: {madde_ids}")
+        madde_ids = [str(madde_id) for madde_id in parsed_list]
+    if not madde_ids:
+        raise ToolError("madde_ids must contain at least one article ID.")
+    if len(madde_ids) > ARTICLE_BATCH_MAX_SIZE:
+        raise ToolError(f"Too many articles requested ({len(madde_ids)}); the limit is {ARTICLE_BATCH_MAX_SIZE} per call.")
+
+    logger.info(f"Tool 'get_mevzuat_articles_batch' called for mevzuat_id: {mevzuat_id} with {len(madde_ids)} articles")
+    try:
+        return await mevzuat_client.get_article_contents(mevzuat_id, madde_ids, concurrency=ARTICLE_BATCH_CONCURRENCY)
+    except Exception as e:
+        logger.exception(f"Error in tool 'get_mevzuat_articles_batch' for id {mevzuat_id}.")
+        raise ToolError(f"Failed to retrieve articles: {str(e)}")
+
+
+@app.tool()
+async def get_mevzuat_full_text_from_tree(
+    ctx: Context,
+    mevzuat_id: str = Field(..., description="The ID of the legislation, obtained from 'search_mevzuat' results.")
+) -> MevzuatArticleContent:
+    """
+    Retrieves the full text of a legislation by assembling it article by article from its table of contents.
+    Use this when get_mevzuat_article_content with madde_id == mevzuat_id fails or returns an unreadable PDF.
+    """
+    logger.info(f"Tool 'get_mevzuat_full_text_from_tree' called for mevzuat_id: {mevzuat_id}")
+    parts, failed = [], []
+    try:
+        async for section in mevzuat_client.iter_document_sections(mevzuat_id, concurrency=ARTICLE_BATCH_CONCURRENCY):
+            if section.error_message:
+                failed.append(section.madde_id)
+            text = section.to_markdown()
+            if text:
+                parts.append(text)
+            await ctx.report_progress(len(parts))
+    except Exception as e:
+        logger.exception(f"Error in tool 'get_mevzuat_full_text_from_tree' for id {mevzuat_id}.")
+        raise ToolError(f"Failed to assemble legislation text: {str(e)}")
+    return MevzuatArticleContent(
+        madde_id=mevzuat_id, mevzuat_id=mevzuat_id, markdown_content="\n\n".join(parts),
+        error_message=f"Could not retrieve {len(failed)} article(s): {', '.join(failed)}" if failed else None
+    )
+
+
 def main():
     logger.info(f"Starting {app.name} server...")
+    metrics_port = os.environ.get("MEVZUAT_METRICS_PORT")
+    if metrics_port:
+        # stdio has no HTTP surface, so Prometheus metrics are served on a side port.
+        start_http_server(int(metrics_port), host=os.environ.get("MEVZUAT_METRICS_HOST", "127.0.0.1"))
+    # Fork the conversion workers before the stdio transport starts reading stdin (see ConversionPool.start).
+    mevzuat_client.start_conversion_workers()
     try:
         app.run()
     except KeyboardInterrupt:
@@ -0,0 +1,258 @@
+# mevzuat_metrics.py
+"""
+Process-wide metrics in the Prometheus text exposition format (version 0.0.4).
+
+A small dependency-free registry of counters, gauges and histograms with labels, plus collectors
+that turn live client statistics (caches, pools, breakers) into samples at scrape time.
+mcp_server_web.py serves it on GET /metrics; the stdio MCP server can expose it on a side port
+(MEVZUAT_METRICS_PORT).
+"""
+
+import functools
+import logging
+import math
+import threading
+import time
+import weakref
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BYTES_BUCKETS = tuple(float(1024 * 4 ** i) for i in range(10))  # 1 KiB .. 256 MiB
+
+# (name, type, help, [(labels, value)]) as produced by collectors
+Family = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, **labels: Any) -> Any:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self) -> Any:
+        raise NotImplementedError
+
+    def _label_dict(self, key: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        with self._lock:
+            children = list(self._children.items())
+        for key, child in children:
+            lines.extend(child.render(self.name, self._label_dict(key)))
+        return lines
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def render(self, name: str, labels: Dict[str, str]) -> List[str]:
+        return [f"{name}{_format_labels(labels)} {_format_value(self.value)}"]
+
+class Counter(_Metric):
+    type = "counter"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+class _HistogramValue:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+    def render(self, name: str, labels: Dict[str, str]) -> List[str]:
+        lines, cumulative = [], 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{_format_labels({**labels, 'le': _format_value(bound)})} {cumulative}")
+        lines.append(f"{name}_bucket{_format_labels({**labels, 'le': '+Inf'})} {self.count}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(self.sum)}")
+        lines.append(f"{name}_count{_format_labels(labels)} {self.count}")
+        return lines
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets)
+
+class Registry:
+    """Holds metrics and scrape-time collectors; render() produces the exposition text."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Optional[Callable[[], Iterable[Family]]]]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> Any:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def register_collector(self, collect: Callable[[], Iterable[Family]]) -> None:
+        """Adds a scrape-time collector. Bound methods are held weakly so their owner can be garbage collected."""
+        ref = weakref.WeakMethod(collect) if hasattr(collect, "__self__") else (lambda: collect)
+        with self._lock:
+            self._collectors.append(ref)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        for ref in collectors:
+            collect = ref()
+            if collect is None:
+                with self._lock:
+                    self._collectors.remove(ref)
+                continue
+            try:
+                families = list(collect())
+            except Exception:
+                logger.exception("Metrics collector failed")
+                continue
+            for name, kind, documentation, samples in families:
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {kind}")
+                lines.extend(f"{name}{_format_labels(labels)} {_format_value(value)}" for labels, value in samples)
+        return "\n".join(lines) + "\n"
+
+REGISTRY = Registry()
+
+CLIENT_CALL_SECONDS = REGISTRY.histogram(
+    "mevzuat_client_call_seconds", "Latency of MevzuatApiClient calls.", ("method", "outcome"))
+CLIENT_IN_FLIGHT = REGISTRY.gauge(
+    "mevzuat_client_in_flight", "MevzuatApiClient calls currently running.", ("method",))
+UPSTREAM_SECONDS = REGISTRY.histogram(
+    "mevzuat_upstream_request_seconds", "Latency of single bedesten HTTP requests.", ("endpoint", "status"))
+UPSTREAM_RESPONSE_BYTES = REGISTRY.histogram(
+    "mevzuat_upstream_response_bytes", "Size of bedesten response bodies.", ("endpoint",), BYTES_BUCKETS)
+CONVERSION_SECONDS = REGISTRY.histogram(
+    "mevzuat_conversion_seconds", "Time to convert a content payload to Markdown, including conversion pool queueing.", ("kind",))
+CONVERSION_INPUT_BYTES = REGISTRY.histogram(
+    "mevzuat_conversion_input_bytes", "Decoded size of converted content payloads.", ("kind",), BYTES_BUCKETS)
+SEARCH_FALLBACKS = REGISTRY.counter(
+    "mevzuat_search_fallbacks_total", "search_mevzuat fallback attempts.", ("kind", "outcome"))
+
+def instrumented(method: str) -> Callable:
+    """
+    Decorator for async client methods: in-flight gauge and latency histogram. Calls that raise, or
+    return a result carrying an error_message, are recorded with outcome="error".
+    """
+    def decorate(fn: Callable) -> Callable:
+        in_flight = CLIENT_IN_FLIGHT.labels(method=method)
+        ok, error = CLIENT_CALL_SECONDS.labels(method=method, outcome="ok"), CLIENT_CALL_SECONDS.labels(method=method, outcome="error")
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            in_flight.inc()
+            started_at = time.perf_counter()
+            failed = True
+            try:
+                result = await fn(*args, **kwargs)
+                failed = getattr(result, "error_message", None) is not None
+                return result
+            finally:
+                in_flight.dec()
+                (error if failed else ok).observe(time.perf_counter() - started_at)
+        return wrapper
+    return decorate
+
+def start_http_server(port: int, host: str = "127.0.0.1", registry: Registry = REGISTRY) -> ThreadingHTTPServer:
+    """Serves GET /metrics from a daemon thread (for the stdio MCP server, which has no HTTP app)."""
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="mevzuat-metrics", daemon=True).start()
+    logger.info(f"Metrics available on http://{host}:{server.server_address[1]}/metrics")
+    return server
@@ -0,0 +1,385 @@
+# mevzuat_mirror.py
+"""
+Resumable crawler that mirrors the whole legislation corpus into a compact, append-only local store.
+The mirror can later be bulk-loaded into the ContentStore and LocalIndex, so warming them does not
+need any live requests.
+
+Usage:
+    python mevzuat_mirror.py crawl [--dir DIR] [--types KANUN,KHK] [--concurrency 4]
+    python mevzuat_mirror.py load [--dir DIR] [--content-store PATH] [--index PATH]
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import logging
+import os
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from mevzuat_client import MevzuatApiClient
+from mevzuat_index import LocalIndex
+from mevzuat_models import MevzuatArticleNode, MevzuatDocument, MevzuatSearchRequest, MevzuatTurEnum
+from mevzuat_store import ContentStore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIRROR_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "mirror")
+ALL_TYPES: Tuple[str, ...] = MevzuatTurEnum.__args__
+
+_HEADER = struct.Struct(">I")
+
+class MirrorError(Exception):
+    """Raised when the crawl cannot continue (e.g. upstream search keeps failing); progress so far is kept."""
+
+class MirrorStore:
+    """
+    Append-only segment files of length-prefixed, zlib-compressed JSON records.
+    Segments roll over at `segment_bytes`; a torn record at the end of the last segment
+    (from a crash mid-write) is truncated when the store is opened.
+    """
+
+    def __init__(self, directory: str, segment_bytes: int = 64 * 1024 * 1024):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        segments = self._segment_paths()
+        self._segment_no = len(segments) or 1
+        if segments:
+            self._repair_tail(segments[-1])
+        self._file = open(self._segment_path(self._segment_no), "ab")
+
+    def _segment_path(self, number: int) -> str:
+        return os.path.join(self.directory, f"segment-{number:06d}.bin")
+
+    def _segment_paths(self) -> List[str]:
+        return sorted(glob.glob(os.path.join(self.directory, "segment-*.bin")))
+
+    @staticmethod
+    def _read_segment(path: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Yields (end_offset, record) for every complete record in a segment."""
+        with open(path, "rb") as f:
+            offset = 0
+            while True:
+                header = f.read(_HEADER.size)
+                if len(header) < _HEADER.size:
+                    return
+                (length,) = _HEADER.unpack(header)
+                payload = f.read(length)
+                if len(payload) < length:
+                    return
+                try:
+                    record = json.loads(zlib.decompress(payload))
+                except (zlib.error, ValueError):
+                    return
+                offset += _HEADER.size + length
+                yield offset, record
+
+    def _repair_tail(self, path: str) -> None:
+        valid_end = 0
+        for valid_end, _record in self._read_segment(path):
+            pass
+        if valid_end < os.path.getsize(path):
+            logger.warning(f"Truncating torn record at the end of {path} ({os.path.getsize(path) - valid_end} bytes)")
+            with open(path, "r+b") as f:
+                f.truncate(valid_end)
+
+    def append(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Appends records contiguously and returns the number of bytes written."""
+        blob = b"".join(
+            _HEADER.pack(len(payload)) + payload
+            for payload in (zlib.compress(json.dumps(r, ensure_ascii=False).encode("utf-8"), 6) for r in records)
+        )
+        with self._lock:
+            if self._file.tell() and self._file.tell() + len(blob) > self.segment_bytes:
+                self._file.close()
+                self._segment_no += 1
+                self._file = open(self._segment_path(self._segment_no), "ab")
+            self._file.write(blob)
+            self._file.flush()
+        return len(blob)
+
+    def sync(self) -> None:
+        with self._lock:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        for path in self._segment_paths():
+            for _offset, record in self._read_segment(path):
+                yield record
+
+    def total_bytes(self) -> int:
+        return sum(os.path.getsize(path) for path in self._segment_paths())
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+def _leaf_ids(nodes: List[MevzuatArticleNode]) -> Iterator[str]:
+    for node in nodes:
+        if node.children:
+            yield from _leaf_ids(node.children)
+        else:
+            yield node.madde_id
+
+class CorpusMirror:
+    """
+    Pages through searchDocuments for each legislation type (sorted by KAYIT_TARIHI ascending, so
+    documents registered during a crawl are appended to the end instead of shifting pages) and mirrors
+    every document's article tree and article contents.
+
+    A document is written as its tree and content records followed by a "document" record, which
+    marks it complete; its id is then appended to the DONE_FILE sidecar, so a restart loads the set
+    of completed documents without reading the segments. The page cursor per type is checkpointed
+    after each page; on restart, completed documents are skipped and documents that failed are
+    retried first.
+    """
+
+    CHECKPOINT_FILE = "checkpoint.json"
+    DONE_FILE = "done.txt"
+
+    def __init__(self, client: MevzuatApiClient, directory: str = DEFAULT_MIRROR_DIR,
+                 types: Iterable[str] = ALL_TYPES, concurrency: int = 4, article_concurrency: int = 8,
+                 page_size: int = 20, progress_interval: float = 10.0):
+        self.client = client
+        self.directory = directory
+        self.types = list(types)
+        self.page_size = page_size
+        self.progress_interval = progress_interval
+        self.store = MirrorStore(directory)
+        self._document_slots = asyncio.Semaphore(max(1, concurrency))
+        self._article_slots = asyncio.Semaphore(max(1, article_concurrency))
+        self._checkpoint = self._load_checkpoint()
+        self._done: Set[str] = self._load_done()
+        self._done_file = open(os.path.join(self.directory, self.DONE_FILE), "a", encoding="utf-8")
+        self.documents = 0
+        self.articles = 0
+        self.failed_documents = 0
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+        self._started_at = time.monotonic()
+        self._last_report = self._started_at
+
+    @property
+    def _checkpoint_path(self) -> str:
+        return os.path.join(self.directory, self.CHECKPOINT_FILE)
+
+    def _load_checkpoint(self) -> Dict[str, Any]:
+        try:
+            with open(self._checkpoint_path, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"types": {}, "failed": {}}
+
+    def _load_done(self) -> Set[str]:
+        path = os.path.join(self.directory, self.DONE_FILE)
+        try:
+            with open(path, encoding="utf-8") as f:
+                return {line.strip() for line in f if line.strip()}
+        except FileNotFoundError:
+            pass
+        # Mirrors written before the sidecar existed: derive it from the segments once.
+        done = {r["document"]["mevzuatId"] for r in self.store.iter_records() if r["kind"] == "document"}
+        with open(path, "w", encoding="utf-8") as f:
+            f.writelines(f"{mevzuat_id}\n" for mevzuat_id in sorted(done))
+        return done
+
+    def _save_checkpoint(self) -> None:
+        # Segment data must be durable before the cursor and the done list that point past it.
+        self.store.sync()
+        self._done_file.flush()
+        os.fsync(self._done_file.fileno())
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".checkpoint-")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self._checkpoint, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._checkpoint_path)
+
+    async def _download(self, doc_id: str, mevzuat_id: str, document_type: str) -> Dict[str, Any]:
+        async with self._article_slots:
+            markdown, source_hash, error_message = await self.client.download_content(doc_id, document_type)
+        if error_message:
+            raise MirrorError(f"{document_type} {doc_id}: {error_message}")
+        return {
+            "kind": "content", "mevzuat_id": mevzuat_id, "madde_id": doc_id,
+            "document_type": document_type, "source_hash": source_hash, "markdown": markdown,
+        }
+
+    async def _mirror_document(self, doc: MevzuatDocument) -> None:
+        async with self._document_slots:
+            try:
+                compact = await self.client.get_compact_tree(doc.mevzuat_id)
+                if compact is None:
+                    # Not the same as an empty tree: downloading the whole document here would mark it done for good.
+                    raise MirrorError(f"article tree of {doc.mevzuat_id} could not be retrieved")
+                tree = compact.to_models(list(range(len(compact))))
+                if tree:
+                    downloads = [self._download(madde_id, doc.mevzuat_id, "MADDE") for madde_id in dict.fromkeys(_leaf_ids(tree))]
+                else:
+                    downloads = [self._download(doc.mevzuat_id, doc.mevzuat_id, "MEVZUAT")]
+                contents = await asyncio.gather(*downloads)
+            except Exception as e:
+                logger.warning(f"Could not mirror {doc.mevzuat_id}, will retry on the next run: {e}")
+                self.failed_documents += 1
+                self._checkpoint["failed"][doc.mevzuat_id] = doc.model_dump(mode="json", by_alias=True)
+                return
+            records = [
+                {"kind": "tree", "mevzuat_id": doc.mevzuat_id, "tree": [node.model_dump(mode="json", by_alias=True) for node in tree]},
+                *contents,
+                {"kind": "document", "document": doc.model_dump(mode="json", by_alias=True)},
+            ]
+            self.stored_bytes += await asyncio.to_thread(self.store.append, records)
+            self.raw_bytes += sum(len(c["markdown"].encode("utf-8")) for c in contents)
+            self.articles += len(contents)
+            self.documents += 1
+            self._done.add(doc.mevzuat_id)
+            self._done_file.write(f"{doc.mevzuat_id}\n")
+            self._checkpoint["failed"].pop(doc.mevzuat_id, None)
+            self._maybe_report()
+
+    def _maybe_report(self) -> None:
+        now = time.monotonic()
+        if now - self._last_report >= self.progress_interval:
+            self._last_report = now
+            stats = self.stats()
+            logger.info(
+                f"Mirrored {stats['documents']} documents / {stats['articles']} articles, "
+                f"{stats['docs_per_sec']} docs/s, {stats['bytes_per_sec']} B/s"
+            )
+
+    async def _crawl_type(self, mevzuat_type: str) -> None:
+        state = self._checkpoint["types"].setdefault(mevzuat_type, {"next_page": 1, "total_pages": None, "done": False})
+        while not state["done"]:
+            request = MevzuatSearchRequest(
+                mevzuat_tur_list=[mevzuat_type], page_number=state["next_page"], page_size=self.page_size,
+                sort_field="KAYIT_TARIHI", sort_direction="asc",
+            )
+            result = await self.client.search_documents(request)
+            if result.error_message:
+                raise MirrorError(f"Search for {mevzuat_type} page {request.page_number} failed: {result.error_message}")
+            pending = [doc for doc in result.documents if doc.mevzuat_id not in self._done]
+            await asyncio.gather(*(self._mirror_document(doc) for doc in pending))
+            state["total_pages"] = result.total_pages
+            state["next_page"] = request.page_number + 1
+            state["done"] = not result.documents or request.page_number >= result.total_pages
+            self._save_checkpoint()
+
+    async def run(self) -> Dict[str, Any]:
+        """Mirrors all configured types; safe to call again after a crash or a MirrorError."""
+        failed = [MevzuatDocument.model_validate(doc) for doc in self._checkpoint["failed"].values()]
+        if failed:
+            logger.info(f"Retrying {len(failed)} previously failed documents")
+            await asyncio.gather(*(self._mirror_document(doc) for doc in failed))
+            self._save_checkpoint()
+        for mevzuat_type in self.types:
+            await self._crawl_type(mevzuat_type)
+        return self.stats()
+
+    def stats(self) -> Dict[str, Any]:
+        elapsed = max(time.monotonic() - self._started_at, 1e-9)
+        return {
+            "documents": self.documents, "articles": self.articles, "failed_documents": self.failed_documents,
+            "mirrored_total": len(self._done), "pending_failed": len(self._checkpoint["failed"]),
+            "raw_bytes": self.raw_bytes, "stored_bytes": self.stored_bytes,
+            "elapsed_seconds": round(elapsed, 1),
+            "docs_per_sec": round(self.documents / elapsed, 2),
+            "bytes_per_sec": round(self.raw_bytes / elapsed),
+            "types": self._checkpoint["types"],
+        }
+
+    def close(self) -> None:
+        self._done_file.close()
+        self.store.close()
+
+def load_mirror(directory: str = DEFAULT_MIRROR_DIR, content_store: Optional[ContentStore] = None,
+                local_index: Optional[LocalIndex] = None, batch_size: int = 500) -> Dict[str, int]:
+    """Bulk-loads a mirror into a ContentStore and/or LocalIndex in batched transactions."""
+    store = MirrorStore(directory)
+    documents: List[MevzuatDocument] = []
+    contents: List[Dict[str, Any]] = []
+    counts = {"documents": 0, "contents": 0}
+
+    def flush() -> None:
+        if documents and local_index is not None:
+            local_index.add_documents(documents)
+        if contents:
+            if content_store is not None:
+                content_store.put_many(
+                    (ContentStore.make_key(c["document_type"], c["madde_id"]), c["source_hash"], c["markdown"]) for c in contents
+                )
+            if local_index is not None:
+                local_index.add_articles((c["mevzuat_id"], c["madde_id"], c["markdown"]) for c in contents)
+        counts["documents"] += len(documents)
+        counts["contents"] += len(contents)
+        documents.clear()
+        contents.clear()
+
+    try:
+        for record in store.iter_records():
+            if record["kind"] == "document":
+                documents.append(MevzuatDocument.model_validate(record["document"]))
+            elif record["kind"] == "content":
+                contents.append(record)
+            if len(documents) + len(contents) >= batch_size:
+                flush()
+        flush()
+    finally:
+        store.close()
+    return counts
+
+async def _crawl(args: argparse.Namespace) -> None:
+    client = MevzuatApiClient()
+    mirror = CorpusMirror(
+        client, directory=args.dir, types=args.types.split(",") if args.types else ALL_TYPES,
+        concurrency=args.concurrency, article_concurrency=args.article_concurrency,
+    )
+    try:
+        stats = await mirror.run()
+        logger.info(f"Mirror complete: {json.dumps(stats, ensure_ascii=False)}")
+    finally:
+        mirror.close()
+        await client.close()
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Mirror the Mevzuat corpus locally and bulk-load it into the caches.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    crawl = subparsers.add_parser("crawl", help="Download (or resume downloading) the corpus")
+    crawl.add_argument("--dir", default=os.environ.get("MEVZUAT_MIRROR_DIR", DEFAULT_MIRROR_DIR))
+    crawl.add_argument("--types", help="Comma-separated legislation types (default: all)")
+    crawl.add_argument("--concurrency", type=int, default=4, help="Documents mirrored in parallel")
+    crawl.add_argument("--article-concurrency", type=int, default=8, help="Article downloads in parallel")
+    load = subparsers.add_parser("load", help="Bulk-load a mirror into the content store and local index")
+    load.add_argument("--dir", default=os.environ.get("MEVZUAT_MIRROR_DIR", DEFAULT_MIRROR_DIR))
+    load.add_argument("--content-store", help="Content store path (default: MEVZUAT_CONTENT_STORE_PATH)")
+    load.add_argument("--index", help="Local index path (default: MEVZUAT_LOCAL_INDEX_PATH)")
+    args = parser.parse_args()
+
+    if args.command == "crawl":
+        try:
+            asyncio.run(_crawl(args))
+        except MirrorError as e:
+            logger.error(f"Crawl stopped, rerun to resume: {e}")
+            raise SystemExit(1)
+    else:
+        content_store = ContentStore(path=args.content_store) if args.content_store else ContentStore.from_env()
+        local_index = LocalIndex(args.index) if args.index else LocalIndex.from_env()
+        try:
+            counts = load_mirror(args.dir, content_store=content_store, local_index=local_index)
+            logger.info(f"Loaded {counts['documents']} documents and {counts['contents']} contents")
+        finally:
+            if content_store is not None:
+                content_store.close()
+            if local_index is not None:
+                local_index.close()
+
+if __name__ == "__main__":
+    main()
@@ -57,6 +57,7 @@ class MevzuatDocument(BaseModel):
     mevzuat_tur: MevzuatTur = Field(..., alias="mevzuatTur")
     resmi_gazete_tarihi: Optional[datetime.datetime] = Field(None, alias="resmiGazeteTarihi")
     resmi_gazete_sayisi: Optional[str] = Field(None, alias="resmiGazeteSayisi")
+    kayit_tarihi: Optional[datetime.datetime] = Field(None, alias="kayitTarihi")
     url: Optional[str] = None
 
 class MevzuatSearchResult(BaseModel):
@@ -77,12 +78,44 @@ class MevzuatArticleNode(BaseModel):
     description: Optional[str] = None
     children: List['MevzuatArticleNode'] = []
     mevzuat_id: str = Field(..., alias="mevzuatId")
+    child_count: Optional[int] = Field(None, description="Number of children in the full tree; more than len(children) when the response was depth-limited or paged.")
 
 MevzuatArticleNode.model_rebuild()
 
+class MevzuatArticleTreePage(BaseModel):
+    """A depth-limited, paged slice of an article tree. Pages are taken over the selected nodes in document order."""
+    mevzuat_id: str
+    subtree_root: Optional[str] = None
+    max_depth: Optional[int] = None
+    nodes: List[MevzuatArticleNode]
+    total_nodes: int
+    page_number: int
+    page_size: Optional[int] = None
+    total_pages: int
+    error_message: Optional[str] = None
+
 class MevzuatArticleContent(BaseModel):
     """Model for the content of a single legislation article."""
     madde_id: str
     mevzuat_id: str
     markdown_content: str
-    error_message: Optional[str] = None
\ No newline at end of file
+    error_message: Optional[str] = None
+    page_count: Optional[int] = Field(None, description="Total pages of the PDF document; set for page_range requests.")
+    pages: Optional[List[int]] = Field(None, description="The 1-based PDF pages included in markdown_content.")
+
+class MevzuatDocumentSection(BaseModel):
+    """One section of a legislation assembled from its article tree, emitted in document order."""
+    mevzuat_id: str
+    madde_id: str
+    madde_no: Optional[int] = None
+    title: Optional[str] = None
+    depth: int = 0
+    is_article: bool = Field(True, description="False for structural nodes (kısım, bölüm) that only carry a heading.")
+    markdown_content: str = ""
+    error_message: Optional[str] = None
+
+    def to_markdown(self) -> str:
+        if self.is_article:
+            return self.markdown_content
+        heading = self.title or ""
+        return f"{'#' * min(self.depth + 2, 6)} {heading}".rstrip() if heading else ""
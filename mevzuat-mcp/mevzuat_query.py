@@ -0,0 +1,325 @@
+# mevzuat_query.py
+"""
+Parser for the search_mevzuat phrase syntax.
+
+A phrase is tokenized and parsed into a small immutable AST, which is then compiled to the Solr syntax
+accepted by bedesten (mevzuat_query.compile_query), to proximity-fallback candidates
+(mevzuat_query.proximity_candidates) and, in mevzuat_index, to FTS5 expressions.
+
+Grammar (operators are case-sensitive, as in Solr):
+
+    query   := or_expr
+    or_expr := and_expr ("OR" and_expr)*
+    and_expr:= unary (["AND"] unary)*          space between operands = AND
+    unary   := "NOT" unary | "+" primary | "-" primary | primary
+    primary := "(" or_expr ")" | "phrase"[~N][^B] | /regex/ | term[~[F]][^B]
+
+Terms may contain the wildcards * and ?. Input a user is likely to type by accident is tolerated:
+a "+" or "-" not attached to a term, an unterminated or empty quote or regex, and an AND/OR/NOT
+missing an operand are dropped, and NOT NOT x is x. Parsed and compiled queries are memoized; what
+still cannot be parsed (e.g. unbalanced parentheses) raises QuerySyntaxError with the offending position.
+"""
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+QUERY_CACHE_SIZE = 2048
+PROXIMITY_SLOP = 10
+
+class QuerySyntaxError(ValueError):
+    """The phrase cannot be parsed. `position` is the 0-based character offset of the problem."""
+
+    def __init__(self, message: str, phrase: str, position: int):
+        super().__init__(f"{message} (at position {position})")
+        self.message = message
+        self.phrase = phrase
+        self.position = position
+
+    def describe(self) -> str:
+        """The error with the phrase and a caret under the offending position."""
+        return f"{self.message} at position {self.position}:\n{self.phrase}\n{' ' * self.position}^"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"message": self.message, "position": self.position, "phrase": self.phrase}
+
+@dataclass(frozen=True)
+class Term:
+    text: str
+    fuzzy: Optional[str] = None     # "" for a bare "~"
+    boost: Optional[str] = None
+
+    @property
+    def wildcard(self) -> bool:
+        return "*" in self.text or "?" in self.text
+
+    @property
+    def plain(self) -> bool:
+        return self.fuzzy is None and self.boost is None and not self.wildcard
+
+@dataclass(frozen=True)
+class Phrase:
+    text: str
+    slop: Optional[int] = None
+    boost: Optional[str] = None
+
+@dataclass(frozen=True)
+class Regex:
+    pattern: str
+
+@dataclass(frozen=True)
+class Required:
+    child: "Node"
+
+@dataclass(frozen=True)
+class Not:
+    child: "Node"
+
+@dataclass(frozen=True)
+class And:
+    children: Tuple["Node", ...]
+
+@dataclass(frozen=True)
+class Or:
+    children: Tuple["Node", ...]
+
+Node = Union[Term, Phrase, Regex, Required, Not, And, Or]
+
+# --- Tokenizer ---
+
+_PHRASE_SUFFIX_RE = re.compile(r"(?:~(\d+))?(?:\^(\d+(?:\.\d+)?))?")
+_TERM_RE = re.compile(r'[^\s()"]+')
+_TERM_PARTS_RE = re.compile(r"(?P<text>.*?)(?:~(?P<fuzzy>\d*(?:\.\d+)?))?(?:\^(?P<boost>\d+(?:\.\d+)?))?", re.DOTALL)
+_OPERATORS = ("AND", "OR", "NOT")
+
+@dataclass(frozen=True)
+class _Token:
+    kind: str      # "(", ")", "AND", "OR", "NOT", "+", "-", "term", "phrase", "regex", "end"
+    position: int
+    node: Optional[Node] = None
+
+def _tokenize(phrase: str) -> List[_Token]:
+    tokens: List[_Token] = []
+    i, length = 0, len(phrase)
+    while i < length:
+        char = phrase[i]
+        if char.isspace():
+            i += 1
+        elif char in "()":
+            tokens.append(_Token(char, i))
+            i += 1
+        elif char in "+-":
+            # Not attached to a term ("a - b", "a -"): a dash or plus sign, not an operator.
+            if i + 1 < length and not phrase[i + 1].isspace() and phrase[i + 1] != ")":
+                tokens.append(_Token(char, i))
+            i += 1
+        elif char == '"':
+            end = phrase.find('"', i + 1)
+            if end < 0:
+                i += 1      # stray or unterminated quote: the words after it are plain terms
+                continue
+            text = phrase[i + 1:end].strip()
+            suffix = _PHRASE_SUFFIX_RE.match(phrase, end + 1)
+            if not text:
+                i = suffix.end()
+                continue
+            slop, boost = suffix.group(1), suffix.group(2)
+            tokens.append(_Token("phrase", i, Phrase(text, int(slop) if slop is not None else None, boost)))
+            i = suffix.end()
+        elif char == "/":
+            end = i + 1
+            while end < length and phrase[end] != "/":
+                end += 2 if phrase[end] == "\\" else 1
+            if end >= length:
+                i += 1      # a lone slash, as in "81 / a"
+                continue
+            if end == i + 1:
+                i = end + 1
+                continue
+            tokens.append(_Token("regex", i, Regex(phrase[i + 1:end])))
+            i = end + 1
+        else:
+            text = _TERM_RE.match(phrase, i).group(0)
+            if text in _OPERATORS:
+                tokens.append(_Token(text, i))
+            else:
+                parts = _TERM_PARTS_RE.fullmatch(text)
+                if not parts.group("text") or parts.group("text")[0] in "~^":
+                    raise QuerySyntaxError(f"'{text[0]}' must follow a term", phrase, i)
+                tokens.append(_Token("term", i, Term(parts.group("text"), parts.group("fuzzy"), parts.group("boost"))))
+            i += len(text)
+    tokens.append(_Token("end", length))
+    return _drop_dangling(tokens)
+
+_NO_LEFT_OPERAND = {"(", "AND", "OR", "NOT", "+", "-"}
+_NO_RIGHT_OPERAND = {")", "AND", "OR", "end"}
+
+def _drop_dangling(tokens: List[_Token]) -> List[_Token]:
+    """Removes AND/OR without an operand on either side and NOT without one after it ("a AND", "OR b", "a NOT")."""
+    changed = True
+    while changed:
+        changed = False
+        for k, token in enumerate(tokens):
+            previous = tokens[k - 1].kind if k else "("
+            following = tokens[k + 1].kind if token.kind != "end" else None
+            if (token.kind in ("AND", "OR") and (previous in _NO_LEFT_OPERAND or following in _NO_RIGHT_OPERAND)) \
+                    or (token.kind == "NOT" and following in _NO_RIGHT_OPERAND):
+                del tokens[k]
+                changed = True
+                break
+    return tokens
+
+# --- Parser ---
+
+_OPERAND_START = {"(", "NOT", "+", "-", "term", "phrase", "regex"}
+
+class _Parser:
+    def __init__(self, phrase: str):
+        self.phrase = phrase
+        self.tokens = _tokenize(phrase)
+        self.index = 0
+
+    def peek(self) -> _Token:
+        return self.tokens[self.index]
+
+    def take(self) -> _Token:
+        token = self.tokens[self.index]
+        self.index += 1
+        return token
+
+    def error(self, message: str, token: _Token) -> QuerySyntaxError:
+        return QuerySyntaxError(message, self.phrase, token.position)
+
+    def parse(self) -> Node:
+        if self.peek().kind == "end":
+            raise self.error("Empty query", self.peek())
+        node = self.parse_or()
+        token = self.peek()
+        if token.kind == ")":
+            raise self.error("Unmatched ')'", token)
+        if token.kind != "end":
+            raise self.error(f"Unexpected '{token.kind}'", token)
+        return node
+
+    def parse_or(self) -> Node:
+        children = [self.parse_and()]
+        while self.peek().kind == "OR":
+            self.take()
+            children.append(self.parse_and())
+        return children[0] if len(children) == 1 else Or(tuple(children))
+
+    def parse_and(self) -> Node:
+        children = [self.parse_unary()]
+        while True:
+            kind = self.peek().kind
+            if kind == "AND":
+                self.take()
+            elif kind not in _OPERAND_START:
+                break
+            children.append(self.parse_unary())
+        return children[0] if len(children) == 1 else And(tuple(children))
+
+    def parse_unary(self) -> Node:
+        token = self.peek()
+        if token.kind == "NOT":
+            self.take()
+            child = self.parse_unary()
+            return child.child if isinstance(child, Not) else Not(child)     # NOT NOT a == a
+        if token.kind in ("+", "-"):
+            self.take()
+            child = self.parse_primary()
+            return Required(child) if token.kind == "+" else Not(child)
+        return self.parse_primary()
+
+    def parse_primary(self) -> Node:
+        token = self.take()
+        if token.kind in ("term", "phrase", "regex"):
+            return token.node
+        if token.kind == "(":
+            if self.peek().kind == ")":
+                raise self.error("Empty group", token)
+            node = self.parse_or()
+            if self.take().kind != ")":
+                raise self.error("Unmatched '('", token)
+            return node
+        if token.kind in ("AND", "OR"):
+            raise self.error(f"'{token.kind}' needs a term on its left", token)
+        if token.kind in ("NOT", "+", "-"):
+            raise self.error(f"'{token.kind}' cannot be applied twice", token)
+        if token.kind == "end":
+            raise self.error("Query ends where a term was expected", token)
+        raise self.error(f"Unexpected '{token.kind}'", token)
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def parse_query(phrase: str) -> Node:
+    """Parses a search phrase into its AST. Raises QuerySyntaxError."""
+    return _Parser(phrase).parse()
+
+# --- Solr compiler ---
+
+_ALTERNATION_SAFE_RE = re.compile(r"[\w ]+")
+
+def _alternative(node: Node) -> Optional[str]:
+    """The regex alternative for a plain word or exact phrase, or None if it needs native syntax."""
+    if isinstance(node, Term) and node.plain and _ALTERNATION_SAFE_RE.fullmatch(node.text):
+        return node.text
+    if isinstance(node, Phrase) and node.slop is None and node.boost is None and _ALTERNATION_SAFE_RE.fullmatch(node.text):
+        return " ".join(node.text.split())
+    return None
+
+def to_solr(node: Node, nested: bool = False) -> str:
+    """
+    Renders the AST in the syntax bedesten accepts. AND becomes juxtaposition and NOT becomes "-";
+    bedesten's native OR is unreliable, so an OR of plain words/exact phrases becomes a regex
+    alternation /(a|b)/. Any other OR falls back to native "(a OR b)".
+    """
+    if isinstance(node, Term):
+        return node.text + (f"~{node.fuzzy}" if node.fuzzy is not None else "") + (f"^{node.boost}" if node.boost else "")
+    if isinstance(node, Phrase):
+        return f'"{node.text}"' + (f"~{node.slop}" if node.slop is not None else "") + (f"^{node.boost}" if node.boost else "")
+    if isinstance(node, Regex):
+        return f"/{node.pattern}/"
+    if isinstance(node, Required):
+        return "+" + to_solr(node.child, nested=True)
+    if isinstance(node, Not):
+        return "-" + to_solr(node.child, nested=True)
+    if isinstance(node, And):
+        text = " ".join(to_solr(child, nested=True) for child in node.children)
+        return f"({text})" if nested else text
+    alternatives = [_alternative(child) for child in node.children]
+    if all(a is not None for a in alternatives):
+        return f"/({'|'.join(alternatives)})/"
+    text = " OR ".join(to_solr(child, nested=True) for child in node.children)
+    return f"({text})" if nested else text
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def compile_query(phrase: str) -> str:
+    """Parses and compiles a search phrase to bedesten's Solr syntax. Raises QuerySyntaxError."""
+    return to_solr(parse_query(phrase))
+
+# --- Proximity fallback ---
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def _proximity_candidates(phrase: str) -> Tuple[str, ...]:
+    node = parse_query(phrase)
+    if not isinstance(node, And):
+        return ()
+    words: List[str] = []
+    constraints: List[str] = []
+    for child in node.children:
+        inner = child.child if isinstance(child, Required) else child
+        if isinstance(inner, Term) and inner.plain:
+            words.append(inner.text)
+        else:
+            constraints.append(to_solr(child, nested=True))
+    rest = "".join(f" {c}" for c in constraints)
+    return tuple(f'"{a} {b}"~{PROXIMITY_SLOP}{rest}' for a, b in zip(words, words[1:]))
+
+def proximity_candidates(phrase: str) -> List[str]:
+    """
+    Proximity rewrites for a query that returned nothing: adjacent pairs of the plain words of a
+    top-level AND, in order, each as "w1 w2"~10 plus the query's remaining clauses (negations,
+    phrases, wildcards...). Queries that are not an AND of at least two plain words yield none.
+    """
+    return list(_proximity_candidates(phrase))
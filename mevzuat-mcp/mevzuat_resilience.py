@@ -0,0 +1,229 @@
+# mevzuat_resilience.py
+"""
+Upstream protection for MevzuatApiClient: an adaptive (AIMD) token-bucket rate limiter
+and a circuit breaker, kept per bedesten endpoint.
+"""
+
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream endpoint that is currently considered unhealthy."""
+
+    def __init__(self, endpoint: str, retry_after: float):
+        super().__init__(f"Upstream endpoint '{endpoint}' is temporarily unavailable (circuit open, retry in {retry_after:.0f}s)")
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+
+class AdaptiveTokenBucket:
+    """
+    Token bucket whose refill rate adapts to upstream health: every throttled/5xx response halves
+    the rate (down to `min_rate`), every success adds `increase_step` back (up to `max_rate`).
+    """
+
+    def __init__(self, rate: float = 10.0, burst: int = 20, min_rate: float = 0.5, max_rate: Optional[float] = None, increase_step: float = 0.1):
+        self.max_rate = max_rate or rate
+        self.min_rate = min(min_rate, self.max_rate)
+        self.rate = rate
+        self.burst = burst
+        self.increase_step = increase_step
+        self.tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+        self.throttled = 0
+        self.total_wait_seconds = 0.0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self) -> None:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        # The lock makes waiters queue up FIFO instead of racing for each new token.
+        async with self._lock:
+            self._refill(time.monotonic())
+            if self.tokens < 1:
+                wait = (1 - self.tokens) / self.rate
+                self.throttled += 1
+                self.total_wait_seconds += wait
+                await asyncio.sleep(wait)
+                self._refill(time.monotonic())
+            self.tokens -= 1
+
+    def available(self) -> float:
+        """Tokens available right now, without consuming any."""
+        self._refill(time.monotonic())
+        return self.tokens
+
+    def on_success(self) -> None:
+        self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def on_throttle(self) -> None:
+        self.rate = max(self.min_rate, self.rate / 2)
+
+    def stats(self) -> Dict[str, Any]:
+        self._refill(time.monotonic())
+        return {
+            "rate": round(self.rate, 3), "max_rate": self.max_rate, "burst": self.burst,
+            "tokens": round(self.tokens, 2), "throttled": self.throttled,
+            "total_wait_seconds": round(self.total_wait_seconds, 3),
+        }
+
+class CircuitBreaker:
+    """Opens after `failure_threshold` consecutive failures; after `recovery_timeout` lets one probe through."""
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+        self._probe_in_flight = False
+
+    def before_call(self, endpoint: str) -> None:
+        if self.state == self.CLOSED:
+            return
+        elapsed = time.monotonic() - self.opened_at
+        if self.state == self.OPEN and elapsed >= self.recovery_timeout:
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return
+        self.rejected += 1
+        raise CircuitOpenError(endpoint, max(0.0, self.recovery_timeout - elapsed))
+
+    def release_probe(self) -> None:
+        self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.times_opened += 1
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+        self._probe_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state, "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened, "rejected": self.rejected,
+        }
+
+class LatencyTracker:
+    """Sliding window of recent successful call latencies with cached percentiles."""
+
+    def __init__(self, window: int = 256, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._sorted: Optional[list] = None
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+        self._sorted = None
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Returns the q-quantile (0..1), or None until enough samples were observed."""
+        if len(self._samples) < self.min_samples:
+            return None
+        if self._sorted is None:
+            self._sorted = sorted(self._samples)
+        return self._sorted[min(len(self._sorted) - 1, int(q * len(self._sorted)))]
+
+    def stats(self) -> Dict[str, Any]:
+        p50, p95 = self.percentile(0.5), self.percentile(0.95)
+        return {
+            "samples": len(self._samples),
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+        }
+
+class RetryBudget:
+    """
+    Caps extra upstream load from retries and hedges: every primary request deposits `ratio` tokens,
+    every retry or hedge withdraws one. `min_tokens` keeps a small allowance for quiet periods.
+    """
+
+    def __init__(self, ratio: float = 0.1, min_tokens: float = 5.0, max_tokens: float = 50.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = min_tokens
+        self.exhausted = 0
+
+    def deposit(self) -> None:
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        self.exhausted += 1
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        return {"ratio": self.ratio, "tokens": round(self.tokens, 2), "exhausted": self.exhausted}
+
+def backoff_delay(attempt: int, base: float = 0.2, cap: float = 2.0) -> float:
+    """Exponential backoff with full jitter for the given (0-based) retry attempt."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+class UpstreamGuard:
+    """Limiter + breaker for a single upstream endpoint, with outcome counters."""
+
+    def __init__(self, endpoint: str, limiter: AdaptiveTokenBucket, breaker: CircuitBreaker):
+        self.endpoint = endpoint
+        self.limiter = limiter
+        self.breaker = breaker
+        self.latency = LatencyTracker()
+        self.successes = 0
+        self.failures = 0
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    async def acquire(self) -> None:
+        self.breaker.before_call(self.endpoint)
+        try:
+            await self.limiter.acquire()
+        except BaseException:
+            self.abandon()
+            raise
+
+    def has_headroom(self, reserve_ratio: float = 0.5) -> bool:
+        """True when the breaker is closed and more than `reserve_ratio` of the burst is unused; speculative calls check this."""
+        return self.breaker.state == CircuitBreaker.CLOSED and self.limiter.available() > self.limiter.burst * reserve_ratio
+
+    def abandon(self) -> None:
+        """Called when an admitted call ends without an outcome (e.g. cancellation); frees a half-open probe slot."""
+        self.breaker.release_probe()
+
+    def record(self, status_code: Optional[int]) -> None:
+        """Records an outcome; None means a transport error or timeout."""
+        if status_code is None or status_code == 429 or status_code >= 500:
+            self.failures += 1
+            self.limiter.on_throttle()
+            self.breaker.record_failure()
+        else:
+            self.successes += 1
+            self.limiter.on_success()
+            self.breaker.record_success()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "successes": self.successes, "failures": self.failures,
+            "retries": self.retries, "hedges": self.hedges, "hedge_wins": self.hedge_wins,
+            "latency": self.latency.stats(), "limiter": self.limiter.stats(), "breaker": self.breaker.stats(),
+        }
@@ -0,0 +1,202 @@
+# mevzuat_store.py
+"""
+Persistent, content-addressed on-disk store for converted legislation Markdown.
+Entries are keyed by document type and id; the Markdown itself is stored once per
+content hash so identical texts (e.g. repealed articles) share a single blob.
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "content.sqlite3")
+
+@dataclass
+class StoredContent:
+    key: str
+    source_hash: str
+    markdown: str
+    fetched_at: float
+
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+def content_hash(data: str) -> str:
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+class ContentStore:
+    """
+    SQLite-backed store with a byte-size cap (LRU eviction by last access).
+    Entries older than `fresh_for` seconds are still served but reported as stale,
+    so the caller can revalidate them in the background.
+    """
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH, max_bytes: int = 256 * 1024 * 1024, fresh_for: float = 7 * 24 * 3600):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.fresh_for = fresh_for
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS blobs (
+                hash TEXT PRIMARY KEY,
+                markdown TEXT NOT NULL,
+                size INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                source_hash TEXT NOT NULL,
+                blob_hash TEXT NOT NULL REFERENCES blobs(hash),
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS entries_accessed ON entries(accessed_at);
+            CREATE INDEX IF NOT EXISTS entries_blob ON entries(blob_hash);
+        """)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Running blob size total, so a put does not sum the whole table; re-read before evicting.
+        self._bytes = self._sum_bytes()
+
+    @classmethod
+    def from_env(cls) -> Optional["ContentStore"]:
+        """Builds a store from MEVZUAT_CONTENT_STORE_* variables; an empty path disables it."""
+        path = os.environ.get("MEVZUAT_CONTENT_STORE_PATH", DEFAULT_STORE_PATH)
+        if not path:
+            return None
+        try:
+            return cls(
+                path=path,
+                max_bytes=int(float(os.environ.get("MEVZUAT_CONTENT_STORE_MAX_MB", 256)) * 1024 * 1024),
+                fresh_for=float(os.environ.get("MEVZUAT_CONTENT_STORE_FRESH_SECONDS", 7 * 24 * 3600)),
+            )
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Content store disabled, could not open {path}: {e}")
+            return None
+
+    @staticmethod
+    def make_key(document_type: str, doc_id: str) -> str:
+        return f"{document_type}:{doc_id}"
+
+    def get(self, key: str) -> Optional[StoredContent]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT e.source_hash, b.markdown, e.fetched_at FROM entries e JOIN blobs b ON b.hash = e.blob_hash WHERE e.key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self.hits += 1
+        return StoredContent(key=key, source_hash=row[0], markdown=row[1], fetched_at=row[2])
+
+    def is_stale(self, entry: StoredContent) -> bool:
+        return entry.age() > self.fresh_for
+
+    def put(self, key: str, source_hash: str, markdown: str) -> None:
+        self.put_many([(key, source_hash, markdown)])
+
+    def put_many(self, items: Iterable[Tuple[str, str, str]]) -> None:
+        """Stores (key, source_hash, markdown) triples in a single transaction, e.g. for bulk loads."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            added = 0
+            try:
+                orphans = []
+                for key, source_hash, markdown in items:
+                    blob_hash = content_hash(markdown)
+                    previous = self._conn.execute("SELECT blob_hash FROM entries WHERE key = ?", (key,)).fetchone()
+                    size = len(markdown.encode("utf-8"))
+                    inserted = self._conn.execute(
+                        "INSERT OR IGNORE INTO blobs(hash, markdown, size) VALUES (?, ?, ?)",
+                        (blob_hash, markdown, size),
+                    ).rowcount
+                    added += size if inserted > 0 else 0
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO entries(key, source_hash, blob_hash, fetched_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                        (key, source_hash, blob_hash, now, now),
+                    )
+                    if previous and previous[0] != blob_hash:
+                        orphans.append(previous[0])
+                added -= self._delete_orphan_blobs(orphans)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._bytes += added
+            self._evict()
+
+    def touch(self, key: str) -> None:
+        """Marks an entry as freshly revalidated without rewriting its content."""
+        with self._lock:
+            self._conn.execute("UPDATE entries SET fetched_at = ? WHERE key = ?", (time.time(), key))
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return self._sum_bytes()
+
+    def _sum_bytes(self) -> int:
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    def _delete_orphan_blobs(self, hashes: List[str]) -> int:
+        """Deletes the given blobs that no entry references any more; returns the bytes freed."""
+        freed = 0
+        for blob_hash in set(hashes):
+            row = self._conn.execute(
+                "SELECT size FROM blobs WHERE hash = ? AND NOT EXISTS (SELECT 1 FROM entries WHERE blob_hash = ?)",
+                (blob_hash, blob_hash),
+            ).fetchone()
+            if row is not None:
+                self._conn.execute("DELETE FROM blobs WHERE hash = ?", (blob_hash,))
+                freed += row[0]
+        return freed
+
+    def _evict(self) -> None:
+        # Caller holds the lock.
+        if self._bytes <= self.max_bytes:
+            return
+        # Another process may share the file: confirm with the real total before evicting.
+        total = self._bytes = self._sum_bytes()
+        if total <= self.max_bytes:
+            return
+        # Drop least recently accessed entries down to 90% of the cap so we do not evict on every put.
+        target = int(self.max_bytes * 0.9)
+        victims = []
+        rows = self._conn.execute(
+            "SELECT e.key, e.blob_hash, b.size FROM entries e JOIN blobs b ON b.hash = e.blob_hash ORDER BY e.accessed_at"
+        )
+        for key, blob_hash, size in rows:
+            if total <= target:
+                break
+            victims.append((key, blob_hash))
+            total -= size
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", [(k,) for k, _ in victims])
+        self._bytes -= self._delete_orphan_blobs([h for _, h in victims])
+        self.evictions += len(victims)
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+        return {
+            "path": self.path, "entries": entries, "bytes": size, "max_bytes": self.max_bytes,
+            "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
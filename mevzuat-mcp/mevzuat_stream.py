@@ -0,0 +1,276 @@
+# mevzuat_stream.py
+"""
+Incremental decoding of getDocumentContent responses.
+
+A full-document response is a single JSON object whose data.content is the whole document as one
+base64 string, often tens of MB. read_content_stream() consumes the response body chunk by chunk:
+JsonStringExtractor finds data.content and passes its characters on as they arrive,
+Base64StreamDecoder decodes them in whole 4-character blocks, and the decoded bytes go to a
+SpooledPayload that stays in memory up to a threshold and is written to a temporary file beyond it.
+The rest of the object (metadata, mimeType) is kept and parsed at the end. The body, the base64 text
+and the decoded document are never held whole, so a download needs a few chunks of memory whatever
+the document size. The sha256 of the base64 text is computed on the way, so source hashes match
+mevzuat_store.content_hash() of the buffered path.
+"""
+
+import binascii
+import hashlib
+import json
+import os
+import tempfile
+import weakref
+from typing import Any, AsyncIterable, Dict, List, Optional, Tuple, Union
+
+_BASE64_WHITESPACE = b" \t\r\n"
+
+class JsonStringExtractor:
+    """
+    Incremental scanner for one JSON document that streams out the string value at `path` (a tuple of
+    object keys). feed() returns the decoded characters of that value contained in the chunk, UTF-8
+    encoded; document() parses everything else, with the value replaced by an empty string.
+    """
+
+    def __init__(self, path: Tuple[str, ...]):
+        self.path = path
+        self.found = False
+        self._rest = bytearray()
+        self._stack: List[list] = []        # [b"{" or b"[", current key] per open container
+        self._expect_key = False
+        self._string: Optional[str] = None  # inside a string: "key", "value" or "target"
+        self._key = bytearray()
+        self._pending = b""                 # an escape sequence cut off at the end of a chunk
+
+    def _at_path(self) -> bool:
+        return (len(self._stack) == len(self.path)
+                and all(kind == b"{" and key == name for (kind, key), name in zip(self._stack, self.path)))
+
+    def _open_string(self) -> None:
+        self._rest += b'"'
+        if self._stack and self._stack[-1][0] == b"{" and self._expect_key:
+            self._string = "key"
+            self._key.clear()
+        elif not self.found and self._at_path():
+            self._string = "target"
+        else:
+            self._string = "value"
+
+    def _close_string(self) -> None:
+        self._rest += b'"'
+        if self._string == "key":
+            self._stack[-1][1] = json.loads(b'"' + self._key + b'"')
+        elif self._string == "target":
+            self.found = True
+        self._string = None
+
+    def _string_bytes(self, data: bytes, out: bytearray) -> None:
+        if self._string == "target":
+            out += data
+            return
+        if self._string == "key":
+            self._key += data
+        self._rest += data
+
+    def _escape(self, sequence: bytes, out: bytearray) -> None:
+        if self._string == "target":
+            out += json.loads(b'"' + sequence + b'"').encode("utf-8")
+        else:
+            self._string_bytes(sequence, out)
+
+    def feed(self, chunk: bytes) -> bytes:
+        if self._pending:
+            chunk, self._pending = self._pending + chunk, b""
+        out = bytearray()
+        i, n = 0, len(chunk)
+        while i < n:
+            if self._string is not None:
+                # bytes.find is much faster than a regex over the megabytes of a base64 value.
+                quote = chunk.find(b'"', i)
+                stop = quote if quote >= 0 else n
+                backslash = chunk.find(b"\\", i, stop)
+                end = backslash if backslash >= 0 else stop
+                if end > i:
+                    self._string_bytes(chunk[i:end], out)
+                if end == n:
+                    break
+                if end == quote:            # closing quote
+                    self._close_string()
+                    i = end + 1
+                    continue
+                length = 6 if chunk[end + 1:end + 2] == b"u" else 2
+                if end + length > n:
+                    self._pending = chunk[end:]
+                    break
+                self._escape(chunk[end:end + length], out)
+                i = end + length
+                continue
+            char = chunk[i:i + 1]
+            if char == b'"':
+                self._open_string()
+                i += 1
+                continue
+            if char in (b"{", b"["):
+                self._stack.append([char, None])
+                self._expect_key = char == b"{"
+            elif char in (b"}", b"]"):
+                if not self._stack:
+                    raise ValueError("Malformed JSON response: unbalanced brackets")
+                self._stack.pop()
+            elif char == b":":
+                self._expect_key = False
+            elif char == b",":
+                self._expect_key = bool(self._stack) and self._stack[-1][0] == b"{"
+            self._rest += char
+            i += 1
+        return bytes(out)
+
+    def document(self) -> Dict[str, Any]:
+        if self._string is not None or self._stack or self._pending:
+            raise ValueError("Truncated JSON response")
+        return json.loads(self._rest)
+
+class Base64StreamDecoder:
+    """Decodes base64 text fed in arbitrary pieces, whole 4-character blocks at a time, and hashes the text."""
+
+    def __init__(self):
+        self._sha256 = hashlib.sha256()
+        self._tail = b""
+        self.length = 0
+
+    def feed(self, text: bytes) -> bytes:
+        self._sha256.update(text)
+        self.length += len(text)
+        text = self._tail + text.translate(None, _BASE64_WHITESPACE)
+        usable = len(text) - len(text) % 4
+        self._tail = text[usable:]
+        return binascii.a2b_base64(text[:usable])
+
+    def finish(self) -> bytes:
+        """Decodes what is left; raises binascii.Error (a ValueError) for truncated base64, like base64.b64decode."""
+        tail, self._tail = self._tail, b""
+        return binascii.a2b_base64(tail) if tail else b""
+
+    def hexdigest(self) -> str:
+        return self._sha256.hexdigest()
+
+def _remove(path: str) -> None:
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+class SpooledPayload:
+    """
+    Decoded payload bytes, held in memory up to `max_memory` bytes and in a named temporary file
+    beyond that, so conversion workers in other processes can read it by path. close() deletes the
+    file; it is also deleted when the object is garbage collected.
+    """
+
+    def __init__(self, max_memory: int = 1024 * 1024, directory: Optional[str] = None):
+        self.max_memory = max_memory
+        self.directory = directory
+        self.size = 0
+        self.head = b""
+        self._buffer = bytearray()
+        self._file = None
+        self._finalizer: Optional[weakref.finalize] = None
+
+    def write(self, data: bytes) -> None:
+        if not data:
+            return
+        if len(self.head) < 8:
+            self.head = (self.head + data)[:8]
+        self.size += len(data)
+        if self._file is None and self.size <= self.max_memory:
+            self._buffer += data
+            return
+        if self._file is None:
+            self._file = tempfile.NamedTemporaryFile(prefix="mevzuat-", suffix=".payload", dir=self.directory, delete=False)
+            self._finalizer = weakref.finalize(self, _remove, self._file.name)
+            self._file.write(self._buffer)
+            self._buffer = bytearray()
+        self._file.write(data)
+
+    def finish(self) -> None:
+        if self._file is not None:
+            self._file.close()
+
+    @property
+    def path(self) -> Optional[str]:
+        return self._file.name if self._file is not None else None
+
+    @property
+    def source(self) -> Union[bytes, str]:
+        """The bytes, or the path of the file holding them."""
+        return self._file.name if self._file is not None else bytes(self._buffer)
+
+    def read(self) -> bytes:
+        if self._file is None:
+            return bytes(self._buffer)
+        with open(self._file.name, "rb") as f:
+            return f.read()
+
+    def close(self) -> None:
+        self._buffer = bytearray()
+        if self._file is not None:
+            self._file.close()
+            self._finalizer()
+
+class StreamedContent:
+    """
+    A getDocumentContent response read by read_content_stream(): `document` is the response with
+    data.content emptied, `payload` the decoded content, and `source_hash` / `b64_length` describe the
+    base64 text it came from. Use it as a context manager (or call close()) to delete the spooled file.
+    """
+
+    def __init__(self, document: Dict[str, Any], payload: SpooledPayload, source_hash: str, b64_length: int):
+        self.document = document
+        self.payload = payload
+        self.source_hash = source_hash
+        self.b64_length = b64_length
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        return self.document.get("metadata") or {}
+
+    @property
+    def is_pdf(self) -> bool:
+        return self.payload.head.startswith(b"%PDF-")
+
+    @property
+    def size(self) -> int:
+        return self.payload.size
+
+    @property
+    def source(self) -> Union[bytes, str]:
+        return self.payload.source
+
+    def read(self) -> bytes:
+        return self.payload.read()
+
+    def close(self) -> None:
+        self.payload.close()
+
+    def __enter__(self) -> "StreamedContent":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+async def read_content_stream(chunks: AsyncIterable[bytes], max_memory: int = 1024 * 1024,
+                              directory: Optional[str] = None) -> StreamedContent:
+    """Reads a getDocumentContent response body, e.g. httpx's response.aiter_bytes(chunk_size)."""
+    extractor = JsonStringExtractor(("data", "content"))
+    decoder = Base64StreamDecoder()
+    payload = SpooledPayload(max_memory, directory)
+    try:
+        async for chunk in chunks:
+            text = extractor.feed(chunk)
+            if text:
+                payload.write(decoder.feed(text))
+        document = extractor.document()
+        payload.write(decoder.finish())
+        payload.finish()
+    except BaseException:
+        payload.close()
+        raise
+    return StreamedContent(document, payload, decoder.hexdigest(), decoder.length)
@@ -0,0 +1,211 @@
+# mevzuat_tree.py
+"""
+Compact representation of a legislation's article tree (mevzuatMaddeTree).
+
+The tree is flattened in pre-order (document order) into parallel arrays; a node is an index.
+`ends[i]` is the index just past the last descendant of node i, so a subtree is the contiguous
+range [i, ends[i]) and children are found by skipping from one sibling's end to the next.
+Pydantic MevzuatArticleNode models are built only for the nodes a caller actually returns.
+
+Each tree also carries a lazily built article-number index ("81", "81/a", "geçici 1", "ek 3")
+so an article can be resolved without walking the tree.
+"""
+
+import re
+from array import array
+from typing import Any, Dict, Iterator, List, Optional
+
+from pydantic import TypeAdapter
+
+from mevzuat_index import turkish_casefold
+from mevzuat_models import MevzuatArticleNode
+
+_FOREST = TypeAdapter(List[MevzuatArticleNode])
+_ARTICLE_KINDS = ("geçici", "ek", "mükerrer")
+_ARTICLE_TITLE_RE = re.compile(r"(?:(geçici|ek|mükerrer)\s+)?madde\s*(\d+)(?:\s*/\s*([a-zçğıöşü])(?![\w]))?")
+_ARTICLE_QUERY_RE = re.compile(r"(?:(geçici|ek|mükerrer)\s*)?(?:madde\s*)?(\d+)(?:\s*/?\s*([a-zçğıöşü]))?")
+
+def _key(kind: Optional[str], number: str, suffix: Optional[str]) -> str:
+    return f"{kind + ' ' if kind else ''}{int(number)}{'/' + suffix if suffix else ''}"
+
+def article_key(madde_no: Any) -> Optional[str]:
+    """
+    Normalizes a user-supplied article number: 81, "81", "Madde 81", "81/A", "Geçici Madde 1", "ek 3".
+    Returns None when it is not recognizable as an article number.
+    """
+    text = turkish_casefold(str(madde_no)).strip().rstrip(".-– ")
+    match = _ARTICLE_QUERY_RE.fullmatch(text)
+    return _key(*match.groups()) if match else None
+
+def _title_key(title: Optional[str]) -> Optional[str]:
+    """The article key of a tree node title such as "GEÇİCİ MADDE 1" or "Madde 5/A - ...", if any."""
+    match = _ARTICLE_TITLE_RE.match(turkish_casefold(title or "").strip())
+    return _key(*match.groups()) if match else None
+
+class TreeNode:
+    """Lightweight view of one node of an ArticleTree."""
+    __slots__ = ("index", "madde_id", "madde_no", "title", "parent", "depth", "is_leaf")
+
+    def __init__(self, index: int, madde_id: str, madde_no: Optional[int], title: Optional[str],
+                 parent: int, depth: int, is_leaf: bool):
+        self.index = index
+        self.madde_id = madde_id
+        self.madde_no = madde_no
+        self.title = title
+        self.parent = parent        # -1 for top-level nodes
+        self.depth = depth
+        self.is_leaf = is_leaf
+
+def _as_int(value: Any) -> Optional[int]:
+    if value is None or isinstance(value, int):
+        return value
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+class ArticleTree:
+    """An article tree as parallel pre-order arrays."""
+    __slots__ = ("mevzuat_id", "ids", "numbers", "titles", "descriptions", "parents", "depths", "ends", "_positions", "_articles")
+
+    def __init__(self, mevzuat_id: str):
+        self.mevzuat_id = mevzuat_id
+        self.ids: List[str] = []
+        self.numbers: List[Optional[int]] = []
+        self.titles: List[Optional[str]] = []
+        self.descriptions: List[Optional[str]] = []
+        self.parents = array("i")
+        self.depths = array("H")
+        self.ends = array("i")
+        self._positions: Optional[Dict[str, int]] = None
+        self._articles: Optional[Dict[str, int]] = None
+
+    @classmethod
+    def from_payload(cls, mevzuat_id: str, children: List[Dict[str, Any]]) -> "ArticleTree":
+        """Builds the tree from the raw `children` list of a mevzuatMaddeTree response, without recursion."""
+        tree = cls(mevzuat_id)
+        ids, numbers, titles, descriptions = tree.ids, tree.numbers, tree.titles, tree.descriptions
+        parents, depths, ends = tree.parents, tree.depths, tree.ends
+        # (node dict, parent index, depth); an int entry marks "close subtree i" once its children are done.
+        stack: List[Any] = [(node, -1, 0) for node in reversed(children or [])]
+        pop, push = stack.pop, stack.append
+        while stack:
+            item = pop()
+            if item.__class__ is int:
+                ends[item] = len(ids)
+                continue
+            node, parent, depth = item
+            index = len(ids)
+            ids.append(str(node["maddeId"]))
+            number = node.get("maddeNo")
+            numbers.append(number if number is None or number.__class__ is int else _as_int(number))
+            titles.append(node.get("title"))
+            descriptions.append(node.get("description"))
+            parents.append(parent)
+            depths.append(depth)
+            ends.append(index + 1)
+            kids = node.get("children")
+            if kids:
+                push(index)
+                depth += 1
+                for child in reversed(kids):
+                    push((child, index, depth))
+        return tree
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def is_leaf(self, index: int) -> bool:
+        return self.ends[index] == index + 1
+
+    def node(self, index: int) -> TreeNode:
+        return TreeNode(index, self.ids[index], self.numbers[index], self.titles[index],
+                        self.parents[index], self.depths[index], self.is_leaf(index))
+
+    def __iter__(self) -> Iterator[TreeNode]:
+        """All nodes in document order."""
+        return (self.node(i) for i in range(len(self.ids)))
+
+    def index_of(self, madde_id: str) -> Optional[int]:
+        if self._positions is None:
+            self._positions = {madde_id: i for i, madde_id in enumerate(self.ids)}
+        return self._positions.get(madde_id)
+
+    def article_index(self) -> Dict[str, int]:
+        """
+        Article key -> node index. Keys come from the node title ("Geçici Madde 1" -> "geçici 1");
+        leaves without a recognizable title fall back to maddeNo. The first occurrence of a key wins.
+        """
+        if self._articles is None:
+            articles: Dict[str, int] = {}
+            for i, title in enumerate(self.titles):
+                key = _title_key(title)
+                if key is None and self.is_leaf(i) and self.numbers[i] is not None:
+                    lowered = turkish_casefold(title or "")
+                    if not any(kind in lowered for kind in _ARTICLE_KINDS):
+                        key = str(self.numbers[i])
+                if key is not None:
+                    articles.setdefault(key, i)
+            self._articles = articles
+        return self._articles
+
+    def find_article(self, madde_no: Any) -> Optional[int]:
+        """Index of the article with the given number (see article_key), or None."""
+        key = article_key(madde_no)
+        return None if key is None else self.article_index().get(key)
+
+    def children(self, index: int) -> Iterator[int]:
+        """Direct children of `index`; -1 means the top-level nodes."""
+        child, end = (0, len(self.ids)) if index < 0 else (index + 1, self.ends[index])
+        while child < end:
+            yield child
+            child = self.ends[child]
+
+    def child_count(self, index: int) -> int:
+        return sum(1 for _ in self.children(index))
+
+    def select(self, subtree_root: Optional[str] = None, max_depth: Optional[int] = None) -> List[int]:
+        """
+        Indices of the nodes under `subtree_root` (the whole tree if None), in document order.
+        `max_depth` counts levels below the scope: 1 returns only its direct children.
+        Raises KeyError for an unknown subtree_root.
+        """
+        if subtree_root is None:
+            start, end, base = 0, len(self.ids), 0
+        else:
+            root = self.index_of(subtree_root)
+            if root is None:
+                raise KeyError(subtree_root)
+            start, end, base = root + 1, self.ends[root], self.depths[root] + 1
+        if max_depth is None:
+            return list(range(start, end))
+        limit = base + max_depth
+        selected, i = [], start
+        while i < end:
+            if self.depths[i] < limit:
+                selected.append(i)
+                i += 1
+            else:
+                i = self.ends[i]    # skip the whole subtree below the depth limit
+        return selected
+
+    def to_models(self, indices: List[int]) -> List[MevzuatArticleNode]:
+        """
+        Builds a nested MevzuatArticleNode forest for the given pre-order `indices` only.
+        A node whose parent is not among them becomes a top-level entry. `child_count` always reports
+        the node's real number of children, so callers can tell when children were left out.
+        """
+        counts = [0] * len(self.ids)
+        for parent in self.parents:
+            if parent >= 0:
+                counts[parent] += 1
+        built: Dict[int, Dict[str, Any]] = {}
+        forest: List[Dict[str, Any]] = []
+        for i in indices:
+            node = {"maddeId": self.ids[i], "maddeNo": self.numbers[i], "title": self.titles[i],
+                    "description": self.descriptions[i], "children": [], "mevzuatId": self.mevzuat_id,
+                    "child_count": counts[i]}
+            built[i] = node
+            parent = built.get(self.parents[i])
+            (parent["children"] if parent is not None else forest).append(node)
+        return _FOREST.validate_python(forest)
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kategorizasyon benchmark'ı: eski zincirleme `any(word in title_lower ...)` taraması ile
+mevzuat_categorizer.classify'ı aynı başlık kümesi üzerinde karşılaştırır.
+
+    python3 benchmarks/bench_categorizer.py --titles 50000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from mevzuat_categorizer import classify
+
+SUBJECTS = [
+    'İş', 'Türk Ceza', 'Türk Medeni', 'Gelir Vergisi', 'Katma Değer Vergisi', 'Türk Ticaret', 'Sağlık Hizmetleri',
+    'Milli Eğitim Temel', 'Çevre', 'Orman', 'Su Ürünleri', 'Elektrik Piyasası', 'Bankacılık', 'Vergi Usul',
+    'Siyasi Partiler', 'Seçimlerin Temel Hükümleri', 'İmar', 'Belediye', 'Kamu İhale', 'Yükseköğretim',
+    'Sosyal Sigortalar ve Genel Sağlık Sigortası', 'İcra ve İflas', 'Hukuk Muhakemeleri', 'Kooperatifler',
+]
+FORMS = ['{} Kanunu', '{} Kanununda Değişiklik Yapılmasına Dair Kanun', '{} Yönetmeliği', '{} Hakkında Tebliğ (Sıra No: {})']
+
+
+def legacy_categorize(title: str) -> str:
+    """Scriptlerdeki eski zincir (karşılaştırma için birebir korunmuştur)"""
+    title_lower = title.lower()
+    if any(word in title_lower for word in ['anayasa', 'seçim', 'parti']):
+        return 'Anayasa Hukuku'
+    elif any(word in title_lower for word in ['iş', 'çalışma', 'sosyal güvenlik', 'sgk']):
+        return 'İş Hukuku'
+    elif any(word in title_lower for word in ['ceza', 'suç', 'mahkeme']):
+        return 'Ceza Hukuku'
+    elif any(word in title_lower for word in ['medeni', 'aile', 'evlilik', 'miras']):
+        return 'Medeni Hukuk'
+    elif any(word in title_lower for word in ['vergi', 'gelir', 'kdv', 'stopaj']):
+        return 'Vergi Hukuku'
+    elif any(word in title_lower for word in ['ticaret', 'şirket', 'rekabet']):
+        return 'Ticaret Hukuku'
+    elif any(word in title_lower for word in ['sağlık', 'tıp', 'hastane']):
+        return 'Sağlık Hukuku'
+    elif any(word in title_lower for word in ['eğitim', 'okul', 'üniversite']):
+        return 'Eğitim Hukuku'
+    elif any(word in title_lower for word in ['çevre', 'orman', 'su']):
+        return 'Çevre Hukuku'
+    elif any(word in title_lower for word in ['enerji', 'elektrik', 'doğalgaz']):
+        return 'Enerji Hukuku'
+    elif any(word in title_lower for word in ['banka', 'kredi', 'finansal']):
+        return 'Bankacılık Hukuku'
+    else:
+        return 'İdare Hukuku'
+
+
+def make_titles(count: int, seed: int = 42):
+    rng = random.Random(seed)
+    return [rng.choice(FORMS).format(rng.choice(SUBJECTS), rng.randint(1, 500)) for _ in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--titles', type=int, default=50000)
+    args = parser.parse_args()
+    titles = make_titles(args.titles)
+
+    started = time.perf_counter()
+    legacy = [legacy_categorize(t) for t in titles]
+    legacy_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    compiled = classify(titles)
+    compiled_ms = (time.perf_counter() - started) * 1000
+
+    differing = sorted({(t, old, new) for t, old, new in zip(titles, legacy, compiled) if old != new})
+    print(f"  legacy: {len(titles)} başlık {legacy_ms:.1f} ms")
+    print(f"compiled: {len(titles)} başlık {compiled_ms:.1f} ms ({legacy_ms / compiled_ms:.1f}x)")
+    print(f"Farklı sınıflandırılan başlık: {sum(o != n for o, n in zip(legacy, compiled))} (örnekler aşağıda)")
+    for title, old, new in differing[:10]:
+        print(f"  {title!r}: {old} -> {new}")
+
+
+if __name__ == '__main__':
+    main()
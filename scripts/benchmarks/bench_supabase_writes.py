@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Supabase yazma yolu benchmark'ı: eski satır başına akış (select + kategori sorgusu + insert + madde insert)
+ile MevzuatBatchWriter'ın toplu akışını (tek `in_` + toplu upsert + parçalı madde insert) karşılaştırır.
+
+Gerçek bir PostgREST'e karşı (supabase-mevzuat-schema.sql ve supabase-mevzuat-upsert.sql uygulanmış):
+    docker run -p 3000:3000 -e PGRST_DB_URI=... -e PGRST_DB_ANON_ROLE=... postgrest/postgrest
+    python3 benchmarks/bench_supabase_writes.py --url http://localhost:3000
+
+--url verilmezse, her isteğe --rtt-ms gecikme ekleyen bellek içi bir PostgREST taklidi başlatılır.
+Bu durumda ölçülen fark ağ gidiş-dönüş sayısından gelir; veritabanı maliyetini içermez.
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from postgrest import SyncPostgrestClient
+from mevzuat_categorizer import categorize
+from mevzuat_db import MevzuatBatchWriter
+
+CATEGORIES = [
+    'Anayasa Hukuku', 'İş Hukuku', 'Ceza Hukuku', 'Medeni Hukuk', 'Vergi Hukuku', 'Ticaret Hukuku',
+    'Sağlık Hukuku', 'Eğitim Hukuku', 'Çevre Hukuku', 'Enerji Hukuku', 'Bankacılık Hukuku', 'İdare Hukuku',
+]
+
+
+class PostgrestStandIn:
+    """PostgREST'in scriptlerin kullandığı alt kümesi: eq/in filtreleri, insert, upsert ve (mevzuat_no, type) benzersizliği."""
+
+    def __init__(self, rtt_ms: float = 5.0):
+        self.rtt = rtt_ms / 1000
+        self.tables: Dict[str, List[Dict]] = {
+            'mevzuat_categories': [{'id': str(uuid.uuid4()), 'title': title} for title in CATEGORIES],
+            'mevzuat': [],
+            'mevzuat_articles': [],
+        }
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self._server.shutdown()
+
+    @staticmethod
+    def _matches(row: Dict, filters: List[Tuple[str, str]]) -> bool:
+        for column, expr in filters:
+            op, _, value = expr.partition('.')
+            cell = '' if row.get(column) is None else str(row.get(column))
+            if op == 'eq' and cell != value:
+                return False
+            if op == 'in' and cell not in {v.strip('"') for v in value.strip('()').split(',')}:
+                return False
+        return True
+
+    def _handler(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status: int, body=None):
+                payload = b'' if body is None else json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _parse(self):
+                time.sleep(standin.rtt)
+                url = urlsplit(self.path)
+                params = parse_qsl(url.query, keep_blank_values=True)
+                special = {k: v for k, v in params if k in ('select', 'columns', 'on_conflict')}
+                filters = [(k, v) for k, v in params if k not in special]
+                with standin._lock:
+                    standin.requests += 1
+                return url.path.strip('/'), special, filters
+
+            def do_GET(self):
+                table, special, filters = self._parse()
+                columns = [c for c in special.get('select', '*').split(',')]
+                with standin._lock:
+                    rows = [r for r in standin.tables[table] if standin._matches(r, filters)]
+                if columns != ['*']:
+                    rows = [{c: r.get(c) for c in columns} for r in rows]
+                if 'vnd.pgrst.object' in self.headers.get('Accept', ''):
+                    return self._reply(200, rows[0]) if len(rows) == 1 else self._reply(406, {'message': 'not a single row'})
+                self._reply(200, rows)
+
+            def do_POST(self):
+                table, _special, _filters = self._parse()
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'[]')
+                rows = body if isinstance(body, list) else [body]
+                prefer = self.headers.get('Prefer', '')
+                created = []
+                with standin._lock:
+                    existing = {(str(r['mevzuat_no']), r['type']) for r in standin.tables[table]} if table == 'mevzuat' else set()
+                    for row in rows:
+                        if table == 'mevzuat' and (str(row['mevzuat_no']), row['type']) in existing:
+                            if 'resolution=ignore-duplicates' in prefer:
+                                continue
+                            return self._reply(409, {'message': 'duplicate key value violates unique constraint "uq_mevzuat_no_type"'})
+                        row = {'id': str(uuid.uuid4()), **row}
+                        if table == 'mevzuat':
+                            existing.add((str(row['mevzuat_no']), row['type']))
+                        standin.tables[table].append(row)
+                        created.append(row)
+                self._reply(201, created if 'return=representation' in prefer else None)
+
+        return Handler
+
+
+def make_documents(prefix: str, count: int, articles_per_doc: int) -> List[Tuple[Dict, List[Dict]]]:
+    items = []
+    for i in range(count):
+        row = {
+            'mevzuat_no': f"{prefix}-{i}", 'title': f"{CATEGORIES[i % len(CATEGORIES)].split()[0]} Kanunu {i}", 'type': 'KANUN',
+            'article_count': articles_per_doc,
+            'full_text': 'Madde metni. ' * 20, 'keywords': ['benchmark'],
+        }
+        articles = [{'article_no': str(n + 1), 'title': f"Madde {n + 1}", 'content': 'Madde metni. ' * 10} for n in range(articles_per_doc)]
+        items.append((row, articles))
+    return items
+
+
+def legacy_save(client, items: List[Tuple[Dict, List[Dict]]]) -> None:
+    """Eski akış: mevzuat başına varlık kontrolü, kategori sorgusu, tek satır insert ve madde insert'i."""
+    for row, articles in items:
+        if client.table('mevzuat').select('id').eq('mevzuat_no', row['mevzuat_no']).execute().data:
+            continue
+        row = dict(row)
+        category = client.table('mevzuat_categories').select('id').eq('title', categorize(row['title'])).single().execute()
+        row['category_id'] = category.data['id'] if category.data else None
+        mevzuat_id = client.table('mevzuat').insert(row).execute().data[0]['id']
+        if articles:
+            client.table('mevzuat_articles').insert([
+                {**a, 'mevzuat_id': mevzuat_id, 'article_order': order} for order, a in enumerate(articles, start=1)
+            ]).execute()
+
+
+def run(name: str, fn, items, articles_per_doc: int, standin=None) -> Dict:
+    requests_before = standin.requests if standin else None
+    started = time.perf_counter()
+    fn(items)
+    elapsed = time.perf_counter() - started
+    rows = len(items) * (1 + articles_per_doc)
+    result = {
+        'path': name, 'documents': len(items), 'rows': rows, 'seconds': round(elapsed, 3),
+        'rows_per_sec': round(rows / elapsed, 1), 'docs_per_sec': round(len(items) / elapsed, 1),
+    }
+    if standin:
+        result['requests'] = standin.requests - requests_before
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help='PostgREST adresi (verilmezse bellek içi taklit kullanılır)')
+    parser.add_argument('--documents', type=int, default=500)
+    parser.add_argument('--articles', type=int, default=10, help='Mevzuat başına madde sayısı')
+    parser.add_argument('--rtt-ms', type=float, default=5.0, help='Taklit için istek başına gecikme')
+    parser.add_argument('--json', action='store_true', help='Sonuçları JSON olarak yazdır')
+    args = parser.parse_args()
+
+    standin = None if args.url else PostgrestStandIn(rtt_ms=args.rtt_ms)
+    client = SyncPostgrestClient(args.url or standin.url)
+    run_id = uuid.uuid4().hex[:6]
+    writer = MevzuatBatchWriter(client)
+    try:
+        results = [
+            run('legacy', lambda items: legacy_save(client, items),
+                make_documents(f"BL{run_id}", args.documents, args.articles), args.articles, standin),
+            run('batched', writer.save_batch,
+                make_documents(f"BB{run_id}", args.documents, args.articles), args.articles, standin),
+        ]
+    finally:
+        if args.url:
+            client.table('mevzuat').delete().like('mevzuat_no', f"B%{run_id}-%").execute()
+        else:
+            standin.close()
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+    for r in results:
+        extra = f", {r['requests']} istek" if 'requests' in r else ''
+        print(f"{r['path']:>8}: {r['rows']} satır {r['seconds']} sn -> {r['rows_per_sec']} satır/sn{extra}")
+    print(f"Hızlanma: {results[1]['rows_per_sec'] / results[0]['rows_per_sec']:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -6,125 +6,64 @@ MCP sunucusu kullanarak mevzuat.gov.tr'den veri çeker ve Supabase'e yükler
 """
 
 import os
+import sys
 import json
-import time
+import asyncio
+import tempfile
+from contextlib import aclosing
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from dotenv import load_dotenv
 from supabase import create_client, Client
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'mevzuat-mcp'))
+from mevzuat_client import MevzuatApiClient
+from mevzuat_models import MevzuatDocument, MevzuatSearchRequest
+from mevzuat_db import MevzuatBatchWriter
+
 # Load environment variables
 load_dotenv()
 
+WATERMARK_FILE = os.getenv(
+    'MEVZUAT_WATERMARK_FILE',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.mevzuat-watermark.json')
+)
+
 class MevzuatMCPUpdater:
     def __init__(self):
         # Supabase bağlantısı
         self.supabase_url = os.getenv('SUPABASE_URL')
         self.supabase_key = os.getenv('SUPABASE_ANON_KEY')
         self.supabase: Client = create_client(self.supabase_url, self.supabase_key)
+        self.writer = MevzuatBatchWriter(self.supabase)
         
         print(f"🔄 Supabase bağlantısı kuruldu: {self.supabase_url}")
 
-    def categorize_mevzuat(self, title: str, type_name: str) -> str:
-        """Mevzuatı kategoriye göre sınıflandırır"""
-        title_lower = title.lower()
-        
-        # Kategori eşleştirme kuralları
-        if any(word in title_lower for word in ['anayasa', 'seçim', 'parti']):
-            return 'Anayasa Hukuku'
-        elif any(word in title_lower for word in ['iş', 'çalışma', 'sosyal güvenlik', 'sgk']):
-            return 'İş Hukuku'
-        elif any(word in title_lower for word in ['ceza', 'suç', 'mahkeme']):
-            return 'Ceza Hukuku'
-        elif any(word in title_lower for word in ['medeni', 'aile', 'evlilik', 'miras']):
-            return 'Medeni Hukuk'
-        elif any(word in title_lower for word in ['vergi', 'gelir', 'kdv', 'stopaj']):
-            return 'Vergi Hukuku'
-        elif any(word in title_lower for word in ['ticaret', 'şirket', 'rekabet']):
-            return 'Ticaret Hukuku'
-        elif any(word in title_lower for word in ['sağlık', 'tıp', 'hastane']):
-            return 'Sağlık Hukuku'
-        elif any(word in title_lower for word in ['eğitim', 'okul', 'üniversite']):
-            return 'Eğitim Hukuku'
-        elif any(word in title_lower for word in ['çevre', 'orman', 'su']):
-            return 'Çevre Hukuku'
-        elif any(word in title_lower for word in ['enerji', 'elektrik', 'doğalgaz']):
-            return 'Enerji Hukuku'
-        elif any(word in title_lower for word in ['banka', 'kredi', 'finansal']):
-            return 'Bankacılık Hukuku'
-        else:
-            return 'İdare Hukuku'  # Default
-
-    def save_to_supabase(self, mevzuat_data: Dict) -> Optional[str]:
-        """Mevzuatı Supabase'e kaydeder"""
-        try:
-            # Kategori ID'sini bul
-            category_name = self.categorize_mevzuat(
-                mevzuat_data.get('title', ''), 
-                mevzuat_data.get('type', '')
-            )
-            
-            # Kategori ID'sini al
-            try:
-                category_result = self.supabase.table('mevzuat_categories').select('id').eq('title', category_name).single().execute()
-                category_id = category_result.data['id'] if category_result.data else None
-            except:
-                category_id = None
-                print(f"⚠️ Kategori bulunamadı: {category_name}")
-            
-            # Mevzuat verisini hazırla
-            mevzuat_insert = {
-                'mevzuat_no': mevzuat_data.get('number'),
-                'title': mevzuat_data.get('title'),
-                'type': mevzuat_data.get('type'),
-                'category_id': category_id,
-                'publication_date': mevzuat_data.get('publication_date'),
-                'gazette_no': mevzuat_data.get('gazette_no'),
-                'gazette_date': mevzuat_data.get('gazette_date'),
-                'summary': mevzuat_data.get('summary'),
-                'full_text': mevzuat_data.get('full_text'),
-                'article_count': mevzuat_data.get('article_count', 0),
-                'url': mevzuat_data.get('url'),
-                'keywords': self.extract_keywords(mevzuat_data.get('title', ''))
+    def build_rows(self, mevzuat_data: Dict):
+        """Mevzuatı ve maddelerini MevzuatBatchWriter'ın beklediği satırlara çevirir"""
+        mevzuat_row = {
+            'mevzuat_no': mevzuat_data.get('number'),
+            'title': mevzuat_data.get('title'),
+            'type': mevzuat_data.get('type'),
+            'publication_date': mevzuat_data.get('publication_date'),
+            'gazette_no': mevzuat_data.get('gazette_no'),
+            'gazette_date': mevzuat_data.get('gazette_date'),
+            'summary': mevzuat_data.get('summary'),
+            'full_text': mevzuat_data.get('full_text'),
+            'article_count': mevzuat_data.get('article_count', 0),
+            'url': mevzuat_data.get('url'),
+            'keywords': self.extract_keywords(mevzuat_data.get('title', ''))
+        }
+        article_rows = [
+            {
+                'article_no': article.get('number') or str(i+1),
+                'title': article.get('title'),
+                'content': article.get('content'),
+                'html_content': article.get('html_content'),
             }
-            
-            # Mevzuatı ekle
-            result = self.supabase.table('mevzuat').insert(mevzuat_insert).execute()
-            mevzuat_id = result.data[0]['id']
-            
-            print(f"✅ Mevzuat kaydedildi: {mevzuat_data.get('title')}")
-            
-            # Eğer maddeler varsa kaydet
-            if 'articles' in mevzuat_data and mevzuat_data['articles']:
-                self.save_articles(mevzuat_id, mevzuat_data['articles'])
-                
-            return mevzuat_id
-            
-        except Exception as e:
-            print(f"❌ Kaydetme hatası: {str(e)}")
-            return None
-
-    def save_articles(self, mevzuat_id: str, articles: List[Dict]):
-        """Mevzuat maddelerini kaydeder"""
-        try:
-            article_inserts = []
-            for i, article in enumerate(articles):
-                article_insert = {
-                    'mevzuat_id': mevzuat_id,
-                    'article_no': article.get('number', str(i+1)),
-                    'title': article.get('title'),
-                    'content': article.get('content'),
-                    'html_content': article.get('html_content'),
-                    'article_order': i + 1
-                }
-                article_inserts.append(article_insert)
-            
-            if article_inserts:
-                self.supabase.table('mevzuat_articles').insert(article_inserts).execute()
-                print(f"✅ {len(article_inserts)} madde kaydedildi")
-                
-        except Exception as e:
-            print(f"❌ Madde kaydetme hatası: {str(e)}")
+            for i, article in enumerate(mevzuat_data.get('articles') or [])
+        ]
+        return mevzuat_row, article_rows
 
     def extract_keywords(self, title: str) -> List[str]:
         """Başlıktan anahtar kelimeler çıkarır"""
@@ -136,91 +75,206 @@ class MevzuatMCPUpdater:
         keywords = [word for word in words if len(word) > 2 and word not in stop_words]
         return keywords[:10]  # Max 10 anahtar kelime
 
-    def search_recent_mevzuat(self, days: int = 7) -> List[Dict]:
-        """Son X günlük mevzuat listesini getirir (şimdilik mock data)"""
-        print(f"📅 Son {days} günün mevzuatları aranıyor...")
-        
-        # Mock data - gerçek MCP entegrasyonu için güncelleneeck
-        mock_mevzuat = [
-            {
-                'title': '7504 Sayılı İş Kanununda Değişiklik Yapan Kanun',
-                'number': '7504',
-                'type': 'KANUN',
-                'publication_date': (datetime.now() - timedelta(days=2)).strftime('%Y-%m-%d'),
-                'gazette_no': '32145',
-                'gazette_date': (datetime.now() - timedelta(days=2)).strftime('%Y-%m-%d'),
-                'summary': 'İş hukuku alanında düzenlemeler',
-                'url': 'https://www.mevzuat.gov.tr/mevzuat?MevzuatNo=7504',
-                'article_count': 12,
-                'articles': [
-                    {
-                        'number': '1',
-                        'title': 'Amaç',
-                        'content': 'Bu Kanunun amacı...',
-                    },
-                    {
-                        'number': '2', 
-                        'title': 'Kapsam',
-                        'content': 'Bu Kanun kapsamında...',
-                    }
-                ]
-            },
-            {
-                'title': 'Çevre Koruma Yönetmeliği',
-                'number': 'YN-2024-15',
-                'type': 'YÖNETMELIK',
-                'publication_date': (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d'),
-                'gazette_no': '32146',
-                'gazette_date': (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d'),
-                'summary': 'Çevre koruma tedbirleri',
-                'url': 'https://www.mevzuat.gov.tr/mevzuat?MevzuatNo=YN-2024-15',
-                'article_count': 8,
-                'articles': [
-                    {
-                        'number': '1',
-                        'title': 'Tanımlar',
-                        'content': 'Bu Yönetmelikte geçen terimler...',
-                    }
-                ]
-            }
-        ]
-        
-        print(f"✅ {len(mock_mevzuat)} mevzuat bulundu")
-        return mock_mevzuat
+    def load_watermark(self) -> Optional[Dict]:
+        """
+        Son başarılı senkronizasyonun filigranını okur: {'kayit_tarihi': ISO, 'mevzuat_ids': [...]}.
+        Sayfa sınırında yarım kalan bir tarama varsa 'resume' anahtarı da bulunur (bkz. _search_recent_mevzuat).
+        """
+        try:
+            with open(WATERMARK_FILE, encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def save_watermark(self, watermark: Dict):
+        """Filigranı atomik olarak yazar (geçici dosya + os.replace), yarım kalan yazma eski değeri bozmaz"""
+        directory = os.path.dirname(os.path.abspath(WATERMARK_FILE))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.watermark-')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(watermark, f, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, WATERMARK_FILE)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @staticmethod
+    def _is_known(doc: MevzuatDocument, watermark: Dict) -> bool:
+        """Belge filigranda veya ondan eski mi? (Aynı kayıt tarihli belgeler mevzuatId ile ayırt edilir)"""
+        if doc.mevzuat_id in watermark.get('mevzuat_ids', []):
+            return True
+        if doc.kayit_tarihi is None or not watermark.get('kayit_tarihi'):
+            return False
+        return doc.kayit_tarihi.isoformat() < watermark['kayit_tarihi']
+
+    @staticmethod
+    def _next_watermark(docs: List[MevzuatDocument], previous: Optional[Dict]) -> Optional[Dict]:
+        """Yeni belgelerin en güncel kayıt tarihi ve o tarihteki mevzuatId'lerden filigran oluşturur"""
+        dated = [doc for doc in docs if doc.kayit_tarihi is not None]
+        if not dated:
+            return previous
+        newest = max(doc.kayit_tarihi for doc in dated).isoformat()
+        ids = [doc.mevzuat_id for doc in dated if doc.kayit_tarihi.isoformat() == newest]
+        if previous and previous.get('kayit_tarihi') == newest:
+            ids = list(dict.fromkeys(previous.get('mevzuat_ids', []) + ids))
+        return {'kayit_tarihi': newest, 'mevzuat_ids': ids}
+
+    async def _fetch_new_documents(self, client: MevzuatApiClient, watermark: Optional[Dict], cutoff: str,
+                                   start_page: int = 1, page_size: int = 20,
+                                   max_pages: int = 50) -> Tuple[List[MevzuatDocument], Optional[int]]:
+        """
+        KAYIT_TARIHI'ne göre yeniden eskiye, `start_page`'den başlayarak sayfalar ve filigrana ulaşınca durur.
+        Filigran yoksa (ilk çalıştırma) `cutoff`'tan sonra kaydedilenleri alır.
+        (belgeler, devam sayfası) döndürür; devam sayfası yalnızca `max_pages` sınırına ulaşıldıysa doludur.
+        """
+        new_docs: List[MevzuatDocument] = []
+        for page in range(start_page, start_page + max_pages):
+            result = await client.search_documents(MevzuatSearchRequest(
+                page_number=page, page_size=page_size,
+                sort_field='KAYIT_TARIHI', sort_direction='desc'
+            ))
+            if result.error_message:
+                raise RuntimeError(f"Arama başarısız (sayfa {page}): {result.error_message}")
+            reached_end = False
+            for doc in result.documents:
+                if watermark:
+                    if self._is_known(doc, watermark):
+                        # Aynı kayıt tarihindeki diğer belgeler de bilinen olabilir; daha eskiye inince dur
+                        if doc.kayit_tarihi is None or doc.kayit_tarihi.isoformat() < watermark.get('kayit_tarihi', ''):
+                            reached_end = True
+                            break
+                        continue
+                elif doc.kayit_tarihi is None or doc.kayit_tarihi.isoformat() < cutoff:
+                    reached_end = True
+                    break
+                new_docs.append(doc)
+            if reached_end or page >= result.total_pages:
+                return new_docs, None
+        print(f"⚠️ {max_pages} sayfa sınırına ulaşıldı, kalan belgeler bir sonraki çalıştırmada "
+              f"{start_page + max_pages}. sayfadan devam edilerek alınacak")
+        return new_docs, start_page + max_pages
+
+    @staticmethod
+    def _doc_key(doc: MevzuatDocument) -> Tuple[str, str]:
+        return (str(doc.mevzuat_no) if doc.mevzuat_no is not None else doc.mevzuat_id, doc.mevzuat_tur.name)
+
+    async def _document_to_mevzuat_data(self, client: MevzuatApiClient, doc: MevzuatDocument) -> Dict:
+        """
+        API belgesini save_to_supabase'in beklediği sözlüğe çevirir, maddeleri madde ağacından alır.
+        Bir bölüm alınamazsa RuntimeError yükseltir; eksik maddeli belge başarılı sayılıp kaydedilmez.
+        """
+        articles = []
+        # aclosing: erken çıkışta bekleyen madde istekleri hemen iptal edilir
+        async with aclosing(client.iter_document_sections(doc.mevzuat_id)) as sections:
+            async for section in sections:
+                if section.error_message:
+                    raise RuntimeError(f"{doc.mevzuat_adi}: {section.madde_id} alınamadı: {section.error_message}")
+                if section.is_article:
+                    articles.append({
+                        'number': str(section.madde_no) if section.madde_no is not None else None,
+                        'title': section.title,
+                        'content': section.markdown_content,
+                    })
+        gazette_date = doc.resmi_gazete_tarihi.strftime('%Y-%m-%d') if doc.resmi_gazete_tarihi else None
+        return {
+            'title': doc.mevzuat_adi,
+            'number': self._doc_key(doc)[0],
+            'type': self._doc_key(doc)[1],
+            'publication_date': gazette_date,
+            'gazette_no': doc.resmi_gazete_sayisi,
+            'gazette_date': gazette_date,
+            'summary': None,
+            'full_text': "\n\n".join(article['content'] for article in articles) or None,
+            'url': doc.url or f"https://www.mevzuat.gov.tr/mevzuat?MevzuatNo={doc.mevzuat_no}",
+            'article_count': len(articles),
+            'articles': articles,
+        }
+
+    async def _search_recent_mevzuat(self, days: int) -> Tuple[List[Dict], Optional[Dict]]:
+        """
+        Sayfa sınırına ulaşılırsa filigran ilerletilmez: dönen değer eski filigranı ve bir 'resume'
+        imleci taşır ({'page', 'target', 'cutoff'}). Sonraki çalıştırma aynı sınıra kadar o sayfadan devam
+        eder; tarama tamamlanınca ilk çalıştırmada görülen en yeni belgeler ('target') filigran olur.
+        Yeni kayıtlar sonuçları yalnızca ileri kaydırır, bu yüzden aynı sayfadan devam etmek belge atlamaz
+        (tekrar görülenler existing_keys ile elenir).
+        Maddeleri alınamayan belge varsa yeni filigran None olur; kayıtlı filigran ve imleç değişmez.
+        """
+        state = dict(self.load_watermark() or {})
+        resume = state.pop('resume', None)
+        watermark = state or None
+        if watermark:
+            print(f"📌 Son filigran: {watermark['kayit_tarihi']} ({len(watermark.get('mevzuat_ids', []))} belge)")
+        else:
+            print(f"📅 Filigran yok, son {days} günün mevzuatları aranıyor...")
+        cutoff = (datetime.now() - timedelta(days=days)).isoformat()
+        start_page = 1
+        if resume:
+            cutoff, start_page = resume['cutoff'], resume['page']
+            print(f"⏩ Yarım kalan tarama {start_page}. sayfadan sürdürülüyor")
+        client = MevzuatApiClient()
+        try:
+            docs, next_page = await self._fetch_new_documents(client, watermark, cutoff, start_page)
+            # Var olanları tek sorguyla ele; maddeler yalnızca yeni mevzuatlar için indirilir
+            existing = self.writer.existing_keys([self._doc_key(doc) for doc in docs])
+            if existing:
+                print(f"⚠️ {len(existing)} mevzuat zaten mevcut")
+            mevzuat_list = []
+            fetch_failed = 0
+            for doc in docs:
+                if self._doc_key(doc) in existing:
+                    continue
+                try:
+                    mevzuat_list.append(await self._document_to_mevzuat_data(client, doc))
+                except RuntimeError as e:
+                    print(f"❌ Madde alma hatası: {str(e)}")
+                    fetch_failed += 1
+        finally:
+            await client.close()
+        if fetch_failed:
+            # Alınamayan belgeler bir sonraki çalıştırmada yeniden denenir
+            print(f"⚠️ {fetch_failed} mevzuatın maddeleri alınamadı, filigran güncellenmeyecek")
+            return mevzuat_list, None
+        # Sürdürülen taramadaki belgeler ilk sayfalardakilerden eskidir; hedef ilk çalıştırmada belirlenir
+        target = resume['target'] if resume else self._next_watermark(docs, watermark)
+        if next_page is None:
+            return mevzuat_list, target
+        return mevzuat_list, {**(watermark or {}), 'resume': {'page': next_page, 'target': target, 'cutoff': cutoff}}
+
+    def search_recent_mevzuat(self, days: int = 7) -> Tuple[List[Dict], Optional[Dict]]:
+        """Son filigrandan bu yana kaydedilen mevzuatları ve kaydedilecek yeni filigranı döndürür"""
+        mevzuat_list, new_watermark = asyncio.run(self._search_recent_mevzuat(days))
+        print(f"✅ {len(mevzuat_list)} yeni mevzuat bulundu")
+        return mevzuat_list, new_watermark
 
     def update_database(self, days: int = 7):
         """Veritabanını günceller"""
         print("🚀 Mevzuat MCP güncelleme başlatıldı...")
         print("=" * 50)
         
-        # Son X günün mevzuatlarını al
-        recent_mevzuat = self.search_recent_mevzuat(days)
+        # Son filigrandan bu yana kaydedilen mevzuatları al
+        recent_mevzuat, new_watermark = self.search_recent_mevzuat(days)
         
         if not recent_mevzuat:
             print("📭 Yeni mevzuat bulunamadı")
+            # Bulunanların hepsi zaten kayıtlıysa da filigran ilerletilir
+            if new_watermark and new_watermark != self.load_watermark():
+                self.save_watermark(new_watermark)
             return
         
-        updated_count = 0
+        # Tek toplu upsert + parçalı madde insert'leri
+        updated_count, failed_count = self.writer.save_batch([self.build_rows(m) for m in recent_mevzuat])
         
-        for mevzuat in recent_mevzuat:
-            try:
-                # Zaten var mı kontrol et
-                existing = self.supabase.table('mevzuat').select('id').eq('mevzuat_no', mevzuat.get('number')).execute()
-                
-                if existing.data:
-                    print(f"⚠️ Zaten mevcut: {mevzuat.get('title')}")
-                    continue
-                
-                # Kaydet
-                if self.save_to_supabase(mevzuat):
-                    updated_count += 1
-                
-                # Rate limiting
-                time.sleep(0.5)
-                
-            except Exception as e:
-                print(f"❌ İşlem hatası: {str(e)}")
-                continue
+        # Hata varsa filigranı ilerletme; bir sonraki çalıştırma aynı belgeleri tekrar dener
+        if failed_count == 0 and new_watermark:
+            self.save_watermark(new_watermark)
+            if 'resume' in new_watermark:
+                print(f"📌 Devam imleci kaydedildi: sayfa {new_watermark['resume']['page']}")
+            else:
+                print(f"📌 Filigran güncellendi: {new_watermark['kayit_tarihi']}")
+        elif failed_count:
+            print(f"⚠️ {failed_count} mevzuat kaydedilemedi, filigran güncellenmedi")
         
         print("=" * 50)
         print(f"🎉 Güncelleme tamamlandı! {updated_count} yeni mevzuat eklendi")
@@ -232,7 +286,7 @@ def main():
     
     updater = MevzuatMCPUpdater()
     
-    # Son 7 günün mevzuatlarını al (test için)
+    # Filigrandan bu yana kaydedilenleri al (ilk çalıştırmada son 7 gün)
     updater.update_database(days=7)
 
 if __name__ == "__main__":
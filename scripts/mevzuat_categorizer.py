@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+Güncelleme scriptlerinin ortak mevzuat kategorizasyonu.
+Anahtar kelime kuralları tek bir regex'te derlenir; başlık tek geçişte taranır ve eşleşen
+en öncelikli kategori seçilir. Kategori id'leri veritabanından bir kez yüklenip bellekte tutulur.
+"""
+
+import re
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Optional
+
+DEFAULT_CATEGORY = 'İdare Hukuku'
+
+# Öncelik sırasıyla (ilk eşleşen kazanır). Kelimeler kelime başında eşleşir ve Türkçe ekleri kabul eder
+# ('vergi' -> 'vergisi'); WHOLE_WORDS ise yalnızca tam kelime olarak eşleşir ('iş' 'işlem' içinde,
+# 'su' 'usul' veya 'sulh' içinde eşleşmez).
+CATEGORY_RULES = [
+    ('Anayasa Hukuku', ['anayasa', 'seçim', 'parti']),
+    ('İş Hukuku', ['iş', 'işçi', 'işveren', 'çalışma', 'sosyal güvenlik', 'sgk']),
+    ('Ceza Hukuku', ['ceza', 'suç', 'mahkeme']),
+    ('Medeni Hukuk', ['medeni', 'aile', 'evlilik', 'miras']),
+    ('Vergi Hukuku', ['vergi', 'gelir', 'kdv', 'stopaj']),
+    ('Ticaret Hukuku', ['ticaret', 'şirket', 'rekabet']),
+    ('Sağlık Hukuku', ['sağlık', 'tıp', 'tıbbi', 'hastane']),
+    ('Eğitim Hukuku', ['eğitim', 'öğretim', 'yükseköğretim', 'okul', 'üniversite']),
+    ('Çevre Hukuku', ['çevre', 'orman', 'su', 'suyu', 'sular']),
+    ('Enerji Hukuku', ['enerji', 'elektrik', 'doğalgaz', 'doğal gaz']),
+    ('Bankacılık Hukuku', ['banka', 'kredi', 'finansal']),
+]
+
+WHOLE_WORDS = {'iş', 'su', 'tıp', 'kdv', 'sgk'}
+
+def turkish_lower(text: str) -> str:
+    """str.lower() 'İ' harfini 'i̇' (noktalı birleşik karakter) yapar; Türkçe kurallarıyla küçültür"""
+    return text.replace('I', 'ı').replace('İ', 'i').lower()
+
+
+def _trie_pattern(words: List[str]) -> str:
+    """Kelimeleri ortak önekleri paylaşan bir regex'e çevirir ('su|suyu|sular' -> 'su(?:lar|yu)?')"""
+    root: Dict[str, dict] = {}
+    for word in words:
+        node = root
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def emit(node: Dict[str, dict]) -> str:
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return f"(?:{body})?" if '' in node else body
+
+    return emit(root)
+
+
+def _compile(rules):
+    """Kategori başına bir yakalama grubu; grup numarası kategorinin önceliğidir"""
+    groups = []
+    for _category, words in rules:
+        branches = []
+        prefix_words = [w for w in words if w not in WHOLE_WORDS]
+        whole_words = [w for w in words if w in WHOLE_WORDS]
+        if prefix_words:
+            branches.append(_trie_pattern(prefix_words) + r'\w*+')
+        if whole_words:
+            branches.append(_trie_pattern(whole_words) + r'(?!\w)')
+        groups.append('(' + '|'.join(branches) + ')')
+    # Kelime başı + ilk harf ön kontrolü, motorun her konumda tüm dalları denemesini önler
+    first_chars = re.escape(''.join(sorted({w[0] for _, words in rules for w in words})))
+    return re.compile(rf"\b(?=[{first_chars}])(?:" + '|'.join(groups) + ')')
+
+
+_PATTERN = _compile(CATEGORY_RULES)
+_CATEGORIES = [category for category, _ in CATEGORY_RULES]
+
+
+def categorize(title: Optional[str]) -> str:
+    """Başlığı tek geçişte tarar; eşleşme yoksa DEFAULT_CATEGORY döner"""
+    best = len(_CATEGORIES)
+    for match in _PATTERN.finditer(turkish_lower(title or '')):
+        best = min(best, match.lastindex - 1)
+        if best == 0:
+            break
+    return _CATEGORIES[best] if best < len(_CATEGORIES) else DEFAULT_CATEGORY
+
+
+def classify(titles: Iterable[Optional[str]]) -> List[str]:
+    """
+    Toplu sınıflandırma. Başlıklar satır satır birleştirilip regex tüm metin üzerinde tek seferde
+    çalıştırılır; Python tarafında yalnızca eşleşme başına iş yapılır.
+    """
+    titles = [(title or '').replace('\n', ' ') for title in titles]
+    text = turkish_lower('\n'.join(titles))
+    starts, offset = [], 0
+    for title in titles:
+        starts.append(offset)
+        offset += len(title) + 1
+    no_match = len(_CATEGORIES)
+    best = [no_match] * len(titles)
+    for match in _PATTERN.finditer(text):
+        index = bisect_right(starts, match.start()) - 1
+        priority = match.lastindex - 1
+        if priority < best[index]:
+            best[index] = priority
+    return [_CATEGORIES[p] if p < no_match else DEFAULT_CATEGORY for p in best]
+
+
+class CategoryResolver:
+    """`mevzuat_categories` tablosunu ilk kullanımda tek sorguyla yükler ve kategori adı -> id eşlemesini önbellekte tutar"""
+
+    def __init__(self, client):
+        self.client = client
+        self._ids: Optional[Dict[str, str]] = None
+
+    def _load(self) -> Dict[str, str]:
+        if self._ids is None:
+            result = self.client.table('mevzuat_categories').select('id,title').execute()
+            self._ids = {row['title']: row['id'] for row in result.data or []}
+            missing = set(_CATEGORIES + [DEFAULT_CATEGORY]) - set(self._ids)
+            if missing:
+                print(f"⚠️ Kategori bulunamadı: {', '.join(sorted(missing))}")
+        return self._ids
+
+    def id_for(self, category: Optional[str]) -> Optional[str]:
+        return self._load().get(category)
+
+    def refresh(self) -> None:
+        self._ids = None
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+Güncelleme scriptleri için toplu Supabase yazma yolu.
+Satır başına select + insert yerine sayfa başına tek `in_` sorgusu, (mevzuat_no, type)
+üzerinde toplu upsert ve parçalı madde insert'leri kullanır.
+
+Upsert, supabase-mevzuat-upsert.sql ile oluşturulan benzersiz indekse ihtiyaç duyar.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from mevzuat_categorizer import CategoryResolver, classify
+
+MevzuatKey = Tuple[str, str]  # (mevzuat_no, type)
+
+
+def chunked(items: List[Any], size: int) -> Iterable[List[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class MevzuatBatchWriter:
+    """`mevzuat` ve `mevzuat_articles` tablolarına toplu yazar. `client`, `.table()` sunan bir Supabase/PostgREST istemcisidir."""
+
+    def __init__(self, client, chunk_size: int = 200, article_chunk_size: int = 1000,
+                 categories: Optional[CategoryResolver] = None):
+        self.client = client
+        self.categories = categories or CategoryResolver(client)
+        self.chunk_size = chunk_size
+        self.article_chunk_size = article_chunk_size
+
+    @staticmethod
+    def key_of(row: Dict) -> MevzuatKey:
+        return (str(row.get('mevzuat_no')), row.get('type'))
+
+    def existing_keys(self, keys: List[MevzuatKey]) -> Set[MevzuatKey]:
+        """Veritabanında zaten bulunan (mevzuat_no, type) çiftlerini parça başına tek sorguyla bulur"""
+        numbers = sorted({no for no, _ in keys if no})
+        found: Set[MevzuatKey] = set()
+        for chunk in chunked(numbers, self.chunk_size):
+            result = self.client.table('mevzuat').select('mevzuat_no,type').in_('mevzuat_no', chunk).execute()
+            found.update((str(row['mevzuat_no']), row['type']) for row in result.data or [])
+        return found & set(keys)
+
+    def save_batch(self, items: List[Tuple[Dict, List[Dict]]]) -> Tuple[int, int]:
+        """
+        `items`: (mevzuat satırı, madde satırları) çiftleri. `category_id` başlıklardan toplu olarak
+        sınıflandırılıp önbellekteki kategori id'lerinden doldurulur; madde satırlarına `mevzuat_id`
+        ve `article_order` eklenir.
+        Zaten var olan mevzuatlar atlanır. (eklenen, başarısız) sayılarını döndürür.
+        """
+        if not items:
+            return 0, 0
+        existing = self.existing_keys([self.key_of(row) for row, _ in items])
+        pending: Dict[MevzuatKey, Tuple[Dict, List[Dict]]] = {}
+        for row, articles in items:
+            key = self.key_of(row)
+            if key in existing:
+                print(f"⚠️ Zaten mevcut: {row.get('title')}")
+            else:
+                pending.setdefault(key, (row, articles))
+        if not pending:
+            return 0, 0
+
+        categories = classify(row.get('title') for row, _ in pending.values())
+        category_ids = [self.categories.id_for(category) for category in categories]
+        inserted = failed = 0
+        pending_items = list(pending.values())
+        for start in range(0, len(pending_items), self.chunk_size):
+            chunk = pending_items[start:start + self.chunk_size]
+            rows = [
+                {**row, 'category_id': category_id}
+                for (row, _), category_id in zip(chunk, category_ids[start:start + self.chunk_size])
+            ]
+            try:
+                # ignore_duplicates: eşzamanlı bir çalıştırmanın eklediği satırlar hata değil, yalnızca atlanır
+                result = self.client.table('mevzuat').upsert(
+                    rows, on_conflict='mevzuat_no,type', ignore_duplicates=True
+                ).execute()
+            except Exception as e:
+                print(f"❌ Toplu kaydetme hatası ({len(rows)} mevzuat): {str(e)}")
+                failed += len(rows)
+                continue
+            ids = {self.key_of(row): row['id'] for row in result.data or []}
+            inserted += len(ids)
+            article_rows = [
+                {**article, 'mevzuat_id': ids[self.key_of(row)], 'article_order': order}
+                for row, articles in chunk if self.key_of(row) in ids
+                for order, article in enumerate(articles, start=1)
+            ]
+            failed_ids = self.insert_articles(article_rows)
+            if failed_ids:
+                # Maddeleri eksik kalan mevzuat geri alınır; yoksa sonraki çalıştırma onu "zaten mevcut" sayıp atlar
+                self.delete_mevzuat(failed_ids)
+            inserted -= len(failed_ids)
+            failed += len(failed_ids)
+        print(f"✅ {inserted} mevzuat toplu olarak kaydedildi")
+        return inserted, failed
+
+    def insert_articles(self, article_rows: List[Dict]) -> Set[str]:
+        """Maddeleri parçalar halinde ekler; maddeleri eklenemeyen mevzuat id'lerini döndürür"""
+        failed_ids: Set[str] = set()
+        saved = 0
+        for chunk in chunked(article_rows, self.article_chunk_size):
+            try:
+                self.client.table('mevzuat_articles').insert(chunk, returning='minimal').execute()
+                saved += len(chunk)
+            except Exception as e:
+                print(f"❌ Madde kaydetme hatası ({len(chunk)} madde): {str(e)}")
+                failed_ids.update(row['mevzuat_id'] for row in chunk)
+        if saved:
+            print(f"✅ {saved} madde kaydedildi")
+        return failed_ids
+
+    def delete_mevzuat(self, mevzuat_ids: Set[str]):
+        """Mevzuat satırlarını ve eklenmiş maddelerini siler (madde insert'i yarım kalan mevzuat için)"""
+        ids = sorted(mevzuat_ids)
+        for chunk in chunked(ids, self.chunk_size):
+            try:
+                self.client.table('mevzuat_articles').delete().in_('mevzuat_id', chunk).execute()
+                self.client.table('mevzuat').delete().in_('id', chunk).execute()
+            except Exception as e:
+                print(f"❌ Geri alma hatası ({len(chunk)} mevzuat): {str(e)}")
+        print(f"↩️ Maddeleri kaydedilemeyen {len(ids)} mevzuat geri alındı")
@@ -15,6 +15,8 @@ import os
 from typing import Dict, List, Optional
 from dotenv import load_dotenv
 
+from mevzuat_db import MevzuatBatchWriter
+
 # Load environment variables
 load_dotenv()
 
@@ -24,6 +26,7 @@ class MevzuatUpdater:
         self.supabase_url = os.getenv('SUPABASE_URL')
         self.supabase_key = os.getenv('SUPABASE_ANON_KEY')
         self.supabase: Client = create_client(self.supabase_url, self.supabase_key)
+        self.writer = MevzuatBatchWriter(self.supabase)
         
         # mevzuat.gov.tr API endpoints
         self.base_url = "https://www.mevzuat.gov.tr"
@@ -125,103 +128,31 @@ class MevzuatUpdater:
             print(f"❌ Madde hatası: {str(e)}")
             return []
 
-    def categorize_mevzuat(self, title: str, type_name: str) -> str:
-        """Mevzuatı kategoriye göre sınıflandırır"""
-        title_lower = title.lower()
-        type_lower = type_name.lower()
-        
-        # Kategori eşleştirme kuralları
-        if any(word in title_lower for word in ['anayasa', 'seçim', 'parti']):
-            return 'Anayasa Hukuku'
-        elif any(word in title_lower for word in ['iş', 'çalışma', 'sosyal güvenlik', 'sgk']):
-            return 'İş Hukuku'
-        elif any(word in title_lower for word in ['ceza', 'suç', 'mahkeme']):
-            return 'Ceza Hukuku'
-        elif any(word in title_lower for word in ['medeni', 'aile', 'evlilik', 'miras']):
-            return 'Medeni Hukuk'
-        elif any(word in title_lower for word in ['vergi', 'gelir', 'kdv', 'stopaj']):
-            return 'Vergi Hukuku'
-        elif any(word in title_lower for word in ['ticaret', 'şirket', 'rekabet']):
-            return 'Ticaret Hukuku'
-        elif any(word in title_lower for word in ['sağlık', 'tıp', 'hastane']):
-            return 'Sağlık Hukuku'
-        elif any(word in title_lower for word in ['eğitim', 'okul', 'üniversite']):
-            return 'Eğitim Hukuku'
-        elif any(word in title_lower for word in ['çevre', 'orman', 'su']):
-            return 'Çevre Hukuku'
-        elif any(word in title_lower for word in ['enerji', 'elektrik', 'doğalgaz']):
-            return 'Enerji Hukuku'
-        elif any(word in title_lower for word in ['banka', 'kredi', 'finansal']):
-            return 'Bankacılık Hukuku'
-        else:
-            return 'İdare Hukuku'  # Default
-
-    def save_to_supabase(self, mevzuat_data: Dict, articles: List[Dict] = None):
-        """Mevzuatı Supabase'e kaydeder"""
-        try:
-            # Kategori ID'sini bul
-            category_name = self.categorize_mevzuat(
-                mevzuat_data.get('adi', ''), 
-                mevzuat_data.get('turu', '')
-            )
-            
-            # Kategori ID'sini al
-            category_result = self.supabase.table('mevzuat_categories').select('id').eq('title', category_name).single().execute()
-            category_id = category_result.data['id'] if category_result.data else None
-            
-            # Mevzuat verisini hazırla
-            mevzuat_insert = {
-                'mevzuat_no': mevzuat_data.get('no'),
-                'title': mevzuat_data.get('adi'),
-                'type': mevzuat_data.get('turu'),
-                'category_id': category_id,
-                'publication_date': mevzuat_data.get('yayimTarihi'),
-                'gazette_no': mevzuat_data.get('resmigNo'),
-                'gazette_date': mevzuat_data.get('resmigTarihi'),
-                'summary': mevzuat_data.get('ozet'),
-                'full_text': mevzuat_data.get('metnin_tamami'),
-                'article_count': len(articles) if articles else 0,
-                'url': f"https://www.mevzuat.gov.tr/mevzuat?MevzuatNo={mevzuat_data.get('no')}",
-                'keywords': self.extract_keywords(mevzuat_data.get('adi', ''))
+    def build_rows(self, mevzuat_data: Dict, articles: List[Dict] = None):
+        """Mevzuatı ve maddelerini MevzuatBatchWriter'ın beklediği satırlara çevirir"""
+        mevzuat_row = {
+            'mevzuat_no': mevzuat_data.get('no'),
+            'title': mevzuat_data.get('adi'),
+            'type': mevzuat_data.get('turu'),
+            'publication_date': mevzuat_data.get('yayimTarihi'),
+            'gazette_no': mevzuat_data.get('resmigNo'),
+            'gazette_date': mevzuat_data.get('resmigTarihi'),
+            'summary': mevzuat_data.get('ozet'),
+            'full_text': mevzuat_data.get('metnin_tamami'),
+            'article_count': len(articles) if articles else 0,
+            'url': f"https://www.mevzuat.gov.tr/mevzuat?MevzuatNo={mevzuat_data.get('no')}",
+            'keywords': self.extract_keywords(mevzuat_data.get('adi', ''))
+        }
+        article_rows = [
+            {
+                'article_no': article.get('maddeNo', str(i+1)),
+                'title': article.get('baslik'),
+                'content': article.get('metin'),
+                'html_content': article.get('htmlMetin'),
             }
-            
-            # Mevzuatı ekle
-            result = self.supabase.table('mevzuat').insert(mevzuat_insert).execute()
-            mevzuat_id = result.data[0]['id']
-            
-            print(f"✅ Mevzuat kaydedildi: {mevzuat_data.get('adi')}")
-            
-            # Maddeleri ekle
-            if articles:
-                self.save_articles(mevzuat_id, articles)
-                
-            return mevzuat_id
-            
-        except Exception as e:
-            print(f"❌ Kaydetme hatası: {str(e)}")
-            return None
-
-    def save_articles(self, mevzuat_id: str, articles: List[Dict]):
-        """Mevzuat maddelerini kaydeder"""
-        try:
-            article_inserts = []
-            for i, article in enumerate(articles):
-                article_insert = {
-                    'mevzuat_id': mevzuat_id,
-                    'article_no': article.get('maddeNo', str(i+1)),
-                    'title': article.get('baslik'),
-                    'content': article.get('metin'),
-                    'html_content': article.get('htmlMetin'),
-                    'article_order': i + 1
-                }
-                article_inserts.append(article_insert)
-            
-            if article_inserts:
-                self.supabase.table('mevzuat_articles').insert(article_inserts).execute()
-                print(f"✅ {len(article_inserts)} madde kaydedildi")
-                
-        except Exception as e:
-            print(f"❌ Madde kaydetme hatası: {str(e)}")
+            for i, article in enumerate(articles or [])
+        ]
+        return mevzuat_row, article_rows
 
     def extract_keywords(self, title: str) -> List[str]:
         """Başlıktan anahtar kelimeler çıkarır"""
@@ -241,17 +172,16 @@ class MevzuatUpdater:
             print("📭 Yeni mevzuat bulunamadı")
             return
         
-        updated_count = 0
+        # Var olanları tek sorguyla ele; detay ve maddeler yalnızca yeni mevzuatlar için çekilir
+        existing = self.writer.existing_keys([(str(m.get('no')), m.get('turu')) for m in recent_mevzuat])
+        new_mevzuat = [m for m in recent_mevzuat if (str(m.get('no')), m.get('turu')) not in existing]
+        print(f"⚠️ {len(recent_mevzuat) - len(new_mevzuat)} mevzuat zaten mevcut")
         
-        for mevzuat in recent_mevzuat:
+        # Her chunk_size belgede bir yazılır: uzun bir çalıştırma yarıda kesilirse yalnızca son parça kaybolur
+        batch = []
+        updated_count = 0
+        for mevzuat in new_mevzuat:
             try:
-                # Zaten var mı kontrol et
-                existing = self.supabase.table('mevzuat').select('id').eq('mevzuat_no', mevzuat.get('no')).execute()
-                
-                if existing.data:
-                    print(f"⚠️ Zaten mevcut: {mevzuat.get('adi')}")
-                    continue
-                
                 # Detayları al
                 details = self.get_mevzuat_details(mevzuat.get('id'))
                 if details:
@@ -259,18 +189,21 @@ class MevzuatUpdater:
                 
                 # Maddeleri al
                 articles = self.get_mevzuat_articles(mevzuat.get('id'))
+                batch.append(self.build_rows(mevzuat, articles))
+                if len(batch) >= self.writer.chunk_size:
+                    updated_count += self.writer.save_batch(batch)[0]
+                    batch = []
                 
-                # Kaydet
-                if self.save_to_supabase(mevzuat, articles):
-                    updated_count += 1
-                
-                # Rate limiting
+                # mevzuat.gov.tr için rate limiting
                 time.sleep(1)
                 
             except Exception as e:
                 print(f"❌ İşlem hatası: {str(e)}")
                 continue
         
+        # Kalan belgeler: toplu upsert + parçalı madde insert'leri
+        updated_count += self.writer.save_batch(batch)[0]
+        
         print(f"🎉 Güncelleme tamamlandı! {updated_count} yeni mevzuat eklendi")
 
 def main():
@@ -130,6 +130,70 @@ class MevzuatMCPAPI {
     }
   }
 
+  // NDJSON akışını okuyup her olayı geldikçe onEvent'e iletir
+  async streamEvents(path, body, onEvent, { signal } = {}) {
+    const response = await fetch(`${this.mcpServerUrl}${path}`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+        'Accept': 'application/x-ndjson',
+      },
+      body: JSON.stringify(body),
+      signal
+    })
+
+    if (!response.ok) {
+      throw new Error(`MCP Server error: ${response.status}`)
+    }
+
+    const reader = response.body.getReader()
+    const decoder = new TextDecoder()
+    let buffer = ''
+
+    while (true) {
+      const { done, value } = await reader.read()
+      buffer += decoder.decode(value || new Uint8Array(), { stream: !done })
+      const lines = buffer.split('\n')
+      buffer = done ? '' : lines.pop()
+      for (const line of lines) {
+        if (!line.trim()) continue
+        const event = JSON.parse(line)
+        if (event.type === 'error') {
+          throw new Error(event.detail)
+        }
+        onEvent(event)
+      }
+      if (done) break
+    }
+  }
+
+  // Madde ağacını düğüm düğüm getirir (onNode her düğüm için çağrılır)
+  async streamMevzuatArticleTree(mevzuatId, onNode, options) {
+    try {
+      await this.streamEvents('/article-tree/stream', { mevzuat_id: mevzuatId }, event => {
+        if (event.type === 'node') onNode(event.data, event.depth, event.parent_id)
+      }, options)
+      return { success: true }
+    } catch (error) {
+      console.error('MCP Article tree stream error:', error)
+      return { success: false, error: error.message }
+    }
+  }
+
+  // Madde içeriğini parça parça getirir (onChunk her metin parçası için çağrılır)
+  async streamMevzuatArticleContent(mevzuatId, maddeId, onChunk, options) {
+    try {
+      await this.streamEvents('/article-content/stream', { mevzuat_id: mevzuatId, madde_id: maddeId }, event => {
+        if (event.type === 'meta' && event.error_message) throw new Error(event.error_message)
+        if (event.type === 'chunk') onChunk(event.data)
+      }, options)
+      return { success: true }
+    } catch (error) {
+      console.error('MCP Article content stream error:', error)
+      return { success: false, error: error.message }
+    }
+  }
+
   // Mevzuatı kategoriye göre sınıflandır
   categorizeMevzuat(title, type) {
     const titleLower = title.toLowerCase()
@@ -0,0 +1,7 @@
+-- Güncelleme scriptlerinin toplu upsert yolu için benzersiz anahtar
+-- (scripts/mevzuat_db.py: upsert(..., on_conflict='mevzuat_no,type'))
+
+-- Varsa önce yinelenen kayıtları kontrol edin; indeks oluşturma bunlar varken başarısız olur:
+-- SELECT mevzuat_no, type, COUNT(*) FROM mevzuat GROUP BY mevzuat_no, type HAVING COUNT(*) > 1;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_mevzuat_no_type ON mevzuat(mevzuat_no, type);